@@ -25,7 +25,7 @@ import tempfile
 import shutil
 import logging
 
-from openglider.utils.cache import HashedList
+from openglider.utils.cache import HashedList, cached_property
 from openglider.utils.distribution import Distribution
 from openglider.vector.functions import norm_squared
 from openglider.vector.polygon import Polygon2D
@@ -46,43 +46,64 @@ class Profile2D(Polygon2D):
         return super(Profile2D, self).__imul__(fakt)
 
     def __call__(self, xval):
-        xval = float(xval)
-        if xval < 0.:       # LOWER
-            i = 1
-            xval = -xval
-            while self[i][0] >= xval and i < len(self):
-                i += 1
-            i -= 1
-        elif xval == 0:     # NOSE
-            i = self.noseindex - 1
-        else:               # UPPER
-            i = len(self) - 2
-            while self[i][0] > xval and i > 1:
-                i -= 1
-                # Determine k-value
-        k = -(self[i][0] - xval) / (self[i + 1][0] - self[i][0])
-
-        return i + k
+        """
+        Get the index (float) of x-values (<0: upper side, >0: lower side).
+        Accepts scalars and arrays.
+        """
+        xval = np.asarray(xval, dtype=float)
+        upper_min, lower_min = self._x_search_arrays
+        x = np.abs(xval)
+        x_data = self.data[:, 0]
+
+        # UPPER: (first index >=1 with data[i][0] < x) - 1
+        i_upper = len(upper_min) - np.searchsorted(upper_min[::-1], x, side="left")
+        i_upper = np.minimum(i_upper, len(self) - 2)
+        # LOWER: last index (1 <= i <= len-2) with data[i][0] <= x
+        i_lower = np.maximum(np.searchsorted(lower_min, x, side="right"), 1)
+
+        i = np.where(xval < 0, i_upper, i_lower)
+        i = np.where(xval == 0, self.noseindex - 1, i)
+        # Determine k-value
+        k = -(x_data[i] - x) / (x_data[i + 1] - x_data[i])
+
+        return (i + k)[()]
+
+    @cached_property('self')
+    def _x_search_arrays(self):
+        """
+        Monotone x-arrays to search indices with np.searchsorted:
+            - running minimum of x from the start (upper side)
+            - running minimum of x from the end (lower side)
+        """
+        x_data = self.data[:, 0]
+        upper_min = np.minimum.accumulate(x_data[1:])
+        lower_min = np.minimum.accumulate(x_data[1:-1][::-1])[::-1]
+
+        return upper_min, lower_min
 
     def align(self, p):
-        """Align a point (x, y) on the airfoil. x: (0,1), y: (-1,1)"""
-        x, y = p
-        upper = self[self(-x)]
-        lower = self[self(x)]
+        """Align a point (x, y) on the airfoil. x: (0,1), y: (-1,1). Accepts arrays of points"""
+        p = np.asarray(p, dtype=float)
+        x, y = p[..., 0], p[..., 1]
+        upper = self.point_many(self(-x))
+        lower = self.point_many(self(x))
 
-        return lower + (upper-lower) * (y + 1)/2
+        return lower + (upper-lower) * ((y + 1)/2)[..., np.newaxis]
 
     def profilepoint(self, xval, h=-1.):
         """
         Get airfoil Point for x-value (<0:upper side)
         optional: height (-1:lower,1:upper)
+        Accepts scalars and arrays.
         """
-        if not h == -1:  # middlepoint
-            p1 = self[self(xval)]
-            p2 = self[self(-xval)]
-            return p1 + (1. + h) / 2 * (p2 - p1)
+        xval = np.asarray(xval, dtype=float)
+        h = np.asarray(h, dtype=float)
+        p1 = self.point_many(self(xval))
+        if not np.all(h == -1):  # middlepoint
+            p2 = self.point_many(self(-xval))
+            return p1 + ((1. + h) / 2)[..., np.newaxis] * (p2 - p1)
         else:  # Main Routine
-            return self[self(xval)]
+            return p1
 
     def normalize(self):
         """
@@ -130,13 +151,9 @@ class Profile2D(Polygon2D):
         return first
 
     def __iadd__(self, other):
-        for i, point in enumerate(self.data):
-            if i > self.noseindex:
-                x = point[0]
-            else:
-                x = -point[0]
-
-            point[1] += other[other(x)][1]
+        sign = np.where(np.arange(len(self)) > self.noseindex, 1., -1.)
+        self.data[:, 1] += other.profilepoint(sign * self.data[:, 0])[:, 1]
+        self.update_version()
         return self
 
     _re_number = r"([-+]?\d*\.\d*(?:[eE][+-]?\d+)?|\d+)"
@@ -261,14 +278,14 @@ class Profile2D(Polygon2D):
     def x_values(self):
         """Get XValues of airfoil. upper side neg, lower positive"""
         i = self.noseindex
-        return [-vector[0] for vector in self.data[:i]] + \
-               [vector[0] for vector in self.data[i:]]
+        return np.concatenate([-self.data[:i, 0], self.data[i:, 0]]).tolist()
 
     @x_values.setter
     def x_values(self, xval):
         """Set X-Values of airfoil to defined points."""
-        data = [(abs(x), self[self(x)][1]) for x in xval]
-        self.data = np.array(data)
+        xval = np.asarray(xval, dtype=float)
+        data = np.array([np.abs(xval), self.profilepoint(xval)[:, 1]]).T
+        self.data = data
 
     @property
     def numpoints(self):
@@ -283,8 +300,8 @@ class Profile2D(Polygon2D):
     @property
     def thickness(self):
         """return the maximum sickness (Sic!) of an airfoil"""
-        xvals = sorted(set(map(abs, self.x_values)))
-        return max([self[self(-i)][1] - self[self(i)][1] for i in xvals])
+        xvals = np.unique(np.abs(self.x_values))
+        return max(self.profilepoint(-xvals)[:, 1] - self.profilepoint(xvals)[:, 1])
 
     @thickness.setter
     def thickness(self, newthick):
@@ -297,8 +314,8 @@ class Profile2D(Polygon2D):
 
     @property
     def camber_line(self):
-        xvals = sorted(set(map(abs, self.x_values)))
-        return np.array([self.profilepoint(i, 0.) for i in xvals])
+        xvals = np.unique(np.abs(self.x_values))
+        return self.profilepoint(xvals, 0.)
 
     #@cached_property('self')
     @property
@@ -357,9 +374,9 @@ class Profile2D(Polygon2D):
         ik = self(pos)
         diff = ik % 1.
         if diff < 0.5:
-            self.data[int(ik)] = self.profilepoint(pos)
+            self[int(ik)] = self.profilepoint(pos)
         else:
-            self.data[int(ik) + 1] = self.profilepoint(pos)
+            self[int(ik) + 1] = self.profilepoint(pos)
 
     def nearest_x_value(self, x):
         min_x_value = None
@@ -7,6 +7,10 @@ from openglider.utils import Config
 class GlobalConfig(Config):
     asinc_interpolation_points = 2000
     caching = True
+    cache_maxsize = 128  # results per cached function and instance (None: unbounded)
+    cache_maxbytes = 64 * 2**20
+    cache_property_maxsize = None  # instances per cached property
+    cache_property_maxbytes = 512 * 2**20
     debug = False
     json_allowed_modules = [r"openglider\..*"]
     json_forbidden_modules = [r".*eval", r".*subprocess.*"]
@@ -34,6 +34,9 @@ class ArcSinc:
         self.arsinc = None
 
     def __call__(self, val):
+        """
+        phi for sinc(phi) = val (a value or an array)
+        """
         if self.arsinc is None:
             self.interpolate(openglider.config['asinc_interpolation_points'])
         return self.arsinc(val)
@@ -79,16 +82,17 @@ class Ballooning(object):
             raise ValueError("Value {} not between -1 and 1".format(xval))
 
     def __call__(self, xval):
-        """Get Ballooning Arc (phi) for a certain XValue"""
+        """Get Ballooning Arc (phi) for a certain XValue (or an array of XValues)"""
+        if np.ndim(xval):
+            return self.phi(1. / (self.mapx(xval) + 1))
         return self.phi(1. / (self[xval] + 1))
 
     def get_tension_factor(self, xval):
-        """Get the tension due to ballooning"""
-        value =  2. * np.tan(self(xval))
-        if 0. in value:
-            return value
-        else:
-            return 1. / value
+        """Get the tension due to ballooning (0 without ballooning)"""
+        value = np.asarray(2. * np.tan(self(xval)))
+        factor = np.zeros_like(value)
+        np.divide(1., value, out=factor, where=value != 0)
+        return factor[()]
 
 
     def __add__(self, other):
@@ -119,15 +123,24 @@ class Ballooning(object):
         return copy.deepcopy(self)
 
     @classmethod
-    def phi(cls, *baloon):
+    def phi(cls, baloon):
         """
-        Return the angle of the piece of cake.
+        Return the angle of the piece of cake (for a value or an array).
         b/l=R*phi/(R*Sin(phi)) -> Phi=arsinc(l/b)
         """
         return cls.arcsinc(baloon)
 
     def mapx(self, xvals):
-        return [self[i] for i in xvals]
+        """Get Ballooning Values (%) for many XValues (array)"""
+        xvals = np.asarray(xvals, dtype=float)
+        if np.any((xvals < -1) | (xvals > 1)):
+            raise ValueError("Values {} not between -1 and 1".format(xvals[(xvals < -1) | (xvals > 1)]))
+
+        upper = xvals < 0
+        values = np.empty(xvals.shape)
+        values[upper] = self.upper(-xvals[upper])
+        values[~upper] = self.lower(xvals[~upper])
+        return values
 
     @property
     def amount_maximal(self):
@@ -262,6 +275,13 @@ class BallooningBezierNeu(Ballooning):
         else:
             raise ValueError("Value {} not between -1 and 1".format(xval))
 
+    def mapx(self, xvals):
+        """Get Ballooning Values (%) for many XValues (array)"""
+        xvals = np.asarray(xvals, dtype=float)
+        if np.any((xvals < -1) | (xvals > 1)):
+            raise ValueError("Values {} not between -1 and 1".format(xvals[(xvals < -1) | (xvals > 1)]))
+        return self.interpolation(xvals)
+
     @classmethod
     def from_classic(cls, ballooning, numpoints=14):
         upper = ballooning.upper.data
@@ -1,9 +1,8 @@
 from __future__ import division
 import copy
-import math
 import numpy as np
 from openglider.airfoil import Profile3D
-from openglider.utils.cache import CachedObject, cached_property
+from openglider.utils.cache import CachedObject, cached_function, cached_property
 from openglider.vector import normalize, norm
 
 
@@ -24,53 +23,66 @@ class BasicCell(CachedObject):
         return self.midrib(y).point(ik)
 
     def midrib(self, y_value, ballooning=True, arc_argument=True, with_numpy=True, close_trailing_edge=False):
+        """
+        Get a single midrib (Profile3D), see midribs.
+        with_numpy: always the ballooned arc (ballooning, arc_argument and close_trailing_edge are ignored)
+        """
         if y_value == 0:              # left side
             return self.prof1
         elif y_value == 1:            # right side
             return self.prof2
         else:                   # somewhere else
-            #self._checkxvals()
-            midrib = []
-
-            # Ballooning is considered to be arcs, following 2 (two!) simple rules:
-            # 1: x1 = x*d
-            # 2: x2 = R*normvekt*(cos(phi2)-cos(phi)
-            # 3: norm(d)/r*(1-x) = 2*sin(phi(2))
             if with_numpy:
-                l_phi = np.array(self.ballooning_phi)
-                l_n = np.array(self.normvectors)
-                l_r = np.array(self.ballooning_radius)
-                l_diff = self.prof1.data - self.prof2.data
-
-                l_phi = l_phi  + (1e-10 - l_phi) * (l_phi <= 0.)
-                l_psi = l_phi * 2 * y_value
-                l_h = np.cos(l_phi - l_psi) - np.cos(l_phi)
-                l_d = 0.5 * (1 - np.sin(l_phi - l_psi) / np.sin(l_phi))
-                l_r = l_r * (l_r > 0.)
-                l_midrib = self.prof1.data.T - l_d * l_diff.T + (l_h * l_r) * l_n.T
-                return Profile3D(l_midrib.T)
-
-            for i, _ in enumerate(self.prof1.data):  # Arc -> phi(bal) -> r  # oder so...
-                diff = self.prof1[i] - self.prof2[i]
-                if close_trailing_edge and i in (0, len(self.prof1.data)-1):
-                    d = y_value
-                    h = 0.
-                elif ballooning and self.ballooning_radius[i] > 0.:
-                    phi = self.ballooning_phi[i]    # phi is half only the half
-                    if arc_argument:
-                        psi = phi * 2 * y_value         # psi [-phi:phi]
-                        d = 0.5 - 0.5 * math.sin(phi - psi) / math.sin(phi)
-                        h = math.cos(phi - psi) - math.cos(phi)
-                    else:
-                        d = y_value
-                        h = math.cos(math.asin((2 * d - 1) * math.sin(phi))) -  math.cos(phi)
-                else:  # Without ballooning
-                    d = y_value
-                    h = 0.
-                midrib.append(self.prof1[i] - diff * d +
-                              self.normvectors[i] * h * self.ballooning_radius[i])
-
-            return Profile3D(midrib)
+                ballooning, arc_argument, close_trailing_edge = True, True, False
+            midribs = self.midribs([y_value], ballooning=ballooning, arc_argument=arc_argument,
+                                   close_trailing_edge=close_trailing_edge)
+            return Profile3D(midribs[0])
+
+    @cached_function('prof1', 'prof2', 'ballooning_phi')
+    def midribs(self, y_values, ballooning=True, arc_argument=True, close_trailing_edge=False):
+        """
+        Get the midribs for many y-values at once (broadcast over the ballooning arrays)
+        :param y_values: list/array of spanwise positions [0-1]
+        :param ballooning: calculate ballooned midribs
+        :param arc_argument: y is the position on the arc (otherwise on the straight line between the ribs)
+        :param close_trailing_edge: no ballooning for the first and last point
+        :return: (len(y_values), numpoints, 3)-array (read-only)
+        """
+        # Ballooning is considered to be arcs, following 2 (two!) simple rules:
+        # 1: x1 = x*d
+        # 2: x2 = R*normvekt*(cos(phi2)-cos(phi)
+        # 3: norm(d)/r*(1-x) = 2*sin(phi(2))
+        y_values = np.asarray(y_values, dtype=float)
+        prof1 = self.prof1.data
+        prof2 = self.prof2.data
+        diff = prof1 - prof2
+
+        d = np.repeat(y_values[:, np.newaxis], len(prof1), axis=1)
+        ribs = prof1 - diff * d[:, :, np.newaxis]
+
+        if ballooning:
+            radius = np.asarray(self.ballooning_radius)
+            balloon = radius > 0.
+            if close_trailing_edge:
+                balloon[[0, -1]] = False
+
+            phi = np.asarray(self.ballooning_phi)[balloon]  # phi is only the half
+            if arc_argument:
+                psi = phi * 2 * y_values[:, np.newaxis]         # psi [-phi:phi]
+                d = 0.5 - 0.5 * np.sin(phi - psi) / np.sin(phi)
+                h = np.cos(phi - psi) - np.cos(phi)
+            else:
+                d = d[:, balloon]
+                h = np.cos(np.arcsin((2 * d - 1) * np.sin(phi))) - np.cos(phi)
+
+            ribs[:, balloon] = (prof1[balloon] - diff[balloon] * d[:, :, np.newaxis] +
+                                self.normvectors[balloon] * h[:, :, np.newaxis] * radius[balloon, np.newaxis])
+
+        ribs[y_values == 0] = prof1
+        ribs[y_values == 1] = prof2
+        ribs.flags.writeable = False
+
+        return ribs
 
     @cached_property('prof1', 'prof2')
     def normvectors(self, j=None):
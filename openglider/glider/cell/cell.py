@@ -11,7 +11,7 @@ import openglider.utils
 from openglider.airfoil import Profile3D
 from openglider.glider.ballooning import Ballooning
 from openglider.glider.cell import BasicCell
-from openglider.glider.cell.elements import Panel
+from openglider.glider.cell.elements import Panel, integrate_3d_shaping
 from openglider.mesh import Mesh, Polygon, Vertex
 from openglider.utils import consistent_value, linspace
 from openglider.utils.cache import (
@@ -161,22 +161,20 @@ class Cell(CachedObject):
         if not self.miniribs:
             return cells
 
-        for index, xvalue in enumerate(self.x_values):
-            left_point = self.rib1.profile_3d.data[index]
-            right_point = self.rib2.profile_3d.data[index]
-            bl = self.ballooning[xvalue]
-
-            l = norm(right_point - left_point)  # L
-            lnew = sum([norm(c.prof1.data[index] - c.prof2.data[index]) for c in cells])  # L-NEW
-
-            for c in cells:
-                if bl > 0:
-                    newval = l / lnew * (bl+1/2) - 1/2
-                    #newval = l/lnew / bl
-                    #newval = lnew / l / bl if bl != 0 else 1
-                    c.ballooning_phi.append(Ballooning.arcsinc(1/(1+newval)))  # B/L NEW 1 / (bl * l / lnew)
-                else:
-                    c.ballooning_phi.append(0.)
+        bl = self.ballooning.mapx(self.x_values)
+        l = np.linalg.norm(self.rib2.profile_3d.data - self.rib1.profile_3d.data, axis=1)  # L
+        lnew = sum([np.linalg.norm(c.prof1.data - c.prof2.data, axis=1) for c in cells])  # L-NEW
+
+        phi = np.zeros(len(bl))
+        balloon = bl > 0
+        newval = l[balloon] / lnew[balloon] * (bl[balloon]+1/2) - 1/2
+        #newval = l/lnew / bl
+        #newval = lnew / l / bl if bl != 0 else 1
+        phi[balloon] = Ballooning.arcsinc(1/(1+newval))  # B/L NEW 1 / (bl * l / lnew)
+
+        for c in cells:
+            c.ballooning_phi = phi.tolist()
+
         return cells
 
     @property
@@ -222,9 +220,37 @@ class Cell(CachedObject):
         else:
             return self.basic_cell.midrib(y, ballooning=False)
 
+    @cached_function("rib1.profile_3d", "rib2.profile_3d", "ballooning_phi", "miniribs")
+    def midribs(self, y_values, ballooning=True, arc_argument=True, close_trailing_edge=False):
+        """
+        Get the midribs for many y-values at once, see BasicCell.midribs
+        :return: (len(y_values), numpoints, 3)-array (read-only)
+        """
+        kwargs = {
+            "arc_argument": arc_argument,
+            "close_trailing_edge": close_trailing_edge
+        }
+        y_values = np.asarray(y_values, dtype=float)
+        if len(self._child_cells) == 1:
+            return self.basic_cell.midribs(y_values, ballooning=ballooning, **kwargs)
+        if not ballooning:
+            return self.basic_cell.midribs(y_values, ballooning=False)
+
+        y_ribs = np.array(self._yvalues, dtype=float)
+        cell_indices = np.searchsorted(y_ribs[1:], y_values).clip(max=len(self._child_cells) - 1)
+        ribs = np.empty((len(y_values), len(self.prof1.data), 3))
+
+        for i in np.unique(cell_indices):
+            selection = cell_indices == i
+            y_new = (y_values[selection] - y_ribs[i]) / (y_ribs[i + 1] - y_ribs[i])
+            ribs[selection] = self._child_cells[i].midribs(y_new, **kwargs)
+
+        ribs.flags.writeable = False
+        return ribs
+
     def get_midribs(self, numribs):
         y_values = linspace(0, 1, numribs)
-        return [self.midrib(y) for y in y_values]
+        return [Profile3D(rib) for rib in self.midribs(y_values)]
 
     def get_spline(self, numribs, u_poles=20, v_poles=4, u_degree=3, v_degree=3):
         try:
@@ -264,9 +290,10 @@ class Cell(CachedObject):
 
     @cached_property('ballooning', 'rib1.profile_2d.numpoints', 'rib2.profile_2d.numpoints')
     def ballooning_phi(self):
-        x_values = self.rib1.profile_2d.x_values
-        balloon = [self.ballooning[i] for i in x_values]
-        return HashedList([Ballooning.arcsinc(1. / (1+bal)) if bal > 0 else 0 for bal in balloon])
+        balloon = self.ballooning.mapx(self.rib1.profile_2d.x_values)
+        phi = np.zeros(len(balloon))
+        phi[balloon > 0] = Ballooning.arcsinc(1. / (1+balloon[balloon > 0]))
+        return HashedList(phi)
 
     @property
     def span(self):
@@ -324,9 +351,10 @@ class Cell(CachedObject):
             panel.mirror()
 
     def mean_rib(self, num_midribs=8) -> Profile2D:
-        mean_rib = self.midrib(0).flatten().normalize()
-        for y in np.linspace(0, 1, num_midribs)[1:]:
-            mean_rib += self.midrib(y).flatten().normalize()
+        midribs = self.midribs(np.linspace(0, 1, num_midribs))
+        mean_rib = Profile3D(midribs[0]).flatten().normalize()
+        for rib in midribs[1:]:
+            mean_rib += Profile3D(rib).flatten().normalize()
         return mean_rib * (1. / num_midribs)
 
     def get_mesh_grid(self, numribs=0, with_numpy=False, half_cell=False):
@@ -337,15 +365,12 @@ class Cell(CachedObject):
         """
         numribs += 1
 
-        grid = []
         rib_indices = range(numribs + 1)
         if half_cell:
             rib_indices = rib_indices[(numribs) // 2:]
-        for rib_no in rib_indices:
-            y = rib_no / max(numribs, 1)
-            rib = self.midrib(y, with_numpy=with_numpy).data
-            grid.append(Vertex.from_vertices_list(rib[:-1]))
-        return grid
+        y_values = np.array(rib_indices) / max(numribs, 1)
+
+        return [Vertex.from_vertices_list(rib[:-1]) for rib in self.midribs(y_values)]
 
     def get_mesh(self, numribs=0, with_numpy=False, half_cell=False):
         """
@@ -426,83 +451,53 @@ class Cell(CachedObject):
 
     @cached_function("self")
     def get_flattened_cell(self, numribs=50):
-        midribs = self.get_midribs(numribs)
-        numpoints = len(midribs[0])
-
-        len_dct = {}
-        def get_length(ik1, ik2):
-            index_str = f"{ik1}:{ik2}"
-            if index_str not in len_dct:
-                points = []
-                for i, rib in enumerate(midribs):
-                    x = ik1 + i/(numribs-1) * (ik2-ik1)
-                    points.append(rib[x])
-                
-                line = openglider.vector.PolyLine(points)
-
-                len_dct[index_str] = line.get_length()
-
-            return len_dct[index_str]
-
-        l_0 = get_length(0, 0)
-
-        left_bal = [np.array([0, 0])]
-        right_bal = [np.array([l_0, 0])]
-
-        def get_point(p1, p2, l_0, l_l, l_r, left=True):
-            lx = (l_0**2 + l_l**2 - l_r**2) / (2*l_0)
-            ly_sq = l_l**2 - lx**2
-            if ly_sq > 0:
-                ly = math.sqrt(ly_sq)
-            else:
-                ly = 0
-            diff = openglider.vector.normalize(p2 - p1)
-            if left:
-                diff_y = diff.dot([[0, 1], [-1, 0]])
-            else:
-                diff_y = diff.dot([[0, -1], [1, 0]])
-
-            return p1 + lx * diff + ly * diff_y
-
+        """
+        Unfold the ballooned cell into the plane (triangle by triangle along the profile).
+        :param numribs: number of midribs to measure the ballooned lengths
+        :return: {"inner": [PolyLine2D,..], "inner_grid": (numribs+2, numpoints, 2)-array, "ballooned": [left, right]}
+        """
+        midribs = self.midribs(linspace(0, 1, numribs))
+        numpoints = midribs.shape[1]
 
-        for i in range(numpoints-1):
-            p1 = left_bal[-1]
-            p2 = right_bal[-1]
+        # lengths across the cell (over all midribs): at every point (i -> i) and diagonal (i -> i+1)
+        t = np.arange(numribs)[:, np.newaxis] / (numribs - 1)
+        x_values = np.arange(numpoints, dtype=float)
+        lengths = _get_span_lengths(midribs, x_values + 0. * t)
+        lengths_diagonal = _get_span_lengths(midribs, x_values[:-1] + t)
 
+        # lengths along the left and right rib
+        d_left = np.linalg.norm(np.diff(midribs[0], axis=0), axis=1)
+        d_right = np.linalg.norm(np.diff(midribs[-1], axis=0), axis=1)
 
-            d_l = openglider.vector.norm(midribs[0][i] - midribs[0][i+1])
-            d_r = openglider.vector.norm(midribs[-1][i] - midribs[-1][i+1])
-            l_0 = get_length(i, i)
+        # triangle solutions (in the local frame of the previous segment):
+        # right: p2 -> p1, sides: lengths[i], d_right, lengths_diagonal
+        # left: p1 -> right, sides: lengths_diagonal, d_left, lengths[i+1]
+        right_x, right_y = _solve_triangles(lengths[:-1], d_right, lengths_diagonal)
+        left_x, left_y = _solve_triangles(lengths_diagonal, d_left, lengths[1:])
 
-            if False:
-                pl_2 = get_point(p1, p2, l_0, d_l, get_length(i+1, i))
-                pr_2 = get_point(p2, pl_2, get_length(i+1, i), d_r, get_length(i+1, i+1), left=False)
-            else:
-                pr_2 = get_point(p2, p1, l_0, d_r, get_length(i, i+1), left=False)
-                pl_2 = get_point(p1, pr_2, get_length(i, i+1), d_l, get_length(i+1, i+1))
+        left_bal = np.zeros((numpoints, 2))
+        right_bal = np.zeros((numpoints, 2))
+        right_bal[0] = [lengths[0], 0]
 
-            left_bal.append(pl_2)
-            right_bal.append(pr_2)
-            #right_bal.append(get_point(p2, p1, l_0, d_r, get_length(i, i+1), left=False))
+        for i in range(numpoints - 1):
+            p1 = left_bal[i]
+            p2 = right_bal[i]
 
-        ballooned = [
-            PolyLine2D(left_bal),
-            PolyLine2D(right_bal)
-        ]
+            diff = normalize(p1 - p2)
+            right_bal[i+1] = p2 + right_x[i] * diff + right_y[i] * np.array([diff[1], -diff[0]])
 
-        inner = []
-        for x in openglider.utils.linspace(0, 1, numribs + 2):
-            l1 = ballooned[0] * (1-x)
-            l2 = ballooned[1] * x
-            inner.append(l1.add(l2))
+            diff = normalize(right_bal[i+1] - p1)
+            left_bal[i+1] = p1 + left_x[i] * diff + left_y[i] * np.array([-diff[1], diff[0]])
 
-        #ballooned = [left_bal, right_bal]
+        y_values = np.array(linspace(0, 1, numribs + 2))[:, np.newaxis, np.newaxis]
+        inner_grid = left_bal * (1 - y_values) + right_bal * y_values
 
         return {
-            "inner": inner,
-            "ballooned": ballooned
+            "inner": [PolyLine2D(line) for line in inner_grid],
+            "inner_grid": inner_grid,
+            "ballooned": [PolyLine2D(left_bal), PolyLine2D(right_bal)]
             }
-    
+
     def calculate_3d_shaping(self, panels=None, numribs=10):
         if panels is None:
             panels = self.panels
@@ -518,26 +513,35 @@ class Cell(CachedObject):
         def add_amount(cut, amount):
             cut_key = cut_hash(cut)
 
-            for key in cuts_3d:
-                if key == cut_key:
-                    old = cuts_3d[key]
-
-                    cuts_3d[key] = [(x1+x2)/2 for x1, x2 in zip(old, amount)]
-                    return
-
-            cuts_3d[cut_key] = amount
+            if cut_key in cuts_3d:
+                cuts_3d[cut_key] = (cuts_3d[cut_key] + amount) / 2
+            else:
+                cuts_3d[cut_key] = amount
 
         def get_amount(cut):
             cut_key = cut_hash(cut)
             data = cuts_3d[cut_key]
             # TODO: Investigate
-            return [max(0, x) for x in data]
+            return [max(0, x) for x in data.tolist()]
 
+        # all panels at once
+        ribs = [self.prof1] + self.get_midribs(numribs) + [self.prof2]
+        lengths_2d = []
+        lengths_3d = []
         for panel in panels:
-            amount_front, amount_back = panel.integrate_3d_shaping(self, self.sigma_3d_cut, inner)
+            panel_lengths_2d, panel_lengths_3d = panel._get_3d_shaping_lengths(self, inner, ribs)
+            lengths_2d += panel_lengths_2d
+            lengths_3d += panel_lengths_3d
+
+        front, back, total = integrate_3d_shaping(lengths_2d, lengths_3d, self.sigma_3d_cut)
 
-            add_amount(panel.cut_front, amount_front)
-            add_amount(panel.cut_back, amount_back)
+        for i, panel in enumerate(panels):
+            rib_range = slice(i * len(inner), (i + 1) * len(inner))
+            amount_front, amount_back = panel._normalize_3d_shaping(
+                front[rib_range], back[rib_range], total[rib_range])
+
+            add_amount(panel.cut_front, np.array(amount_front))
+            add_amount(panel.cut_back, np.array(amount_back))
 
         cut_3d_types = ["cut_3d"]
         for panel in panels:
@@ -550,3 +554,28 @@ class Cell(CachedObject):
             else:
                 panel.cut_back["amount_3d"] = [0] * (numribs+2)
 
+
+def _get_span_lengths(ribs, x_values):
+    """
+    Length of the lines through the points ribs[j][x_values[j, i]] (j: rib-index) for every i
+    """
+    length = ribs.shape[1]
+    floor = np.floor(x_values)
+    i = np.minimum(floor, length - 2).astype(int)
+    k = x_values - floor + np.maximum(0, floor - length + 2)
+
+    rib_indices = np.arange(len(ribs))[:, np.newaxis]
+    points = ribs[rib_indices, i] + k[:, :, np.newaxis] * (ribs[rib_indices, i + 1] - ribs[rib_indices, i])
+    segment_lengths = np.linalg.norm(np.diff(points, axis=0), axis=2)
+
+    return np.cumsum(segment_lengths, axis=0)[-1]
+
+
+def _solve_triangles(l_0, l_l, l_r):
+    """
+    Position of the third triangle point relative to the base l_0 (sides l_l, l_r), clipped to the base-line.
+    :return: lx (along the base), ly (normal to the base)
+    """
+    lx = (l_0**2 + l_l**2 - l_r**2) / (2*l_0)
+    ly = np.sqrt(np.maximum(l_l**2 - lx**2, 0))
+    return lx, ly
@@ -24,7 +24,7 @@ import numpy as np
 import math
 
 import openglider.vector
-from openglider.airfoil import get_x_value
+from openglider.airfoil import Profile3D, get_x_value
 from openglider.mesh import Mesh, triangulate
 from openglider.utils.cache import cached_function, hash_list
 from openglider.vector import norm, PolyLine
@@ -372,13 +372,12 @@ class Panel(object):
         """
         xvalues = cell.rib1.profile_2d.x_values
         ribs = []
+        if midribs is None:
+            midribs = [Profile3D(rib) for rib in cell.midribs(np.arange(numribs + 1) / numribs)]
+
         for i in range(numribs + 1):
             y = i / numribs
-
-            if midribs is None:
-                midrib = cell.midrib(y, with_numpy)
-            else:
-                midrib = midribs[i]
+            midrib = midribs[i]
 
             x1 = self.cut_front["left"] + y * (self.cut_front["right"] -
                                                self.cut_front["left"])
@@ -406,6 +405,7 @@ class Panel(object):
         points = []
         nums = []
         count = 0
+        midribs = cell.midribs(np.arange(numribs + 1) / max(numribs, 1))
         for rib_no in range(numribs + 1):
             y = rib_no / max(numribs, 1)
             x1 = self.cut_front["left"] + y * (self.cut_front["right"] -
@@ -415,7 +415,7 @@ class Panel(object):
             x2 = self.cut_back["left"] + y * (self.cut_back["right"] -
                                               self.cut_back["left"])
             back = get_x_value(xvalues, x2)
-            midrib = cell.midrib(y, with_numpy=with_numpy)
+            midrib = Profile3D(midribs[rib_no])
             ribs.append([x for x in midrib.get_positions(front, back)])
             points += list(midrib[front:back])
             nums.append([i + count for i, _ in enumerate(ribs[-1])])
@@ -583,86 +583,88 @@ class Panel(object):
 
         ribs = [cell.prof1] + midribs + [cell.prof2]
 
-        # ! vorn + hinten < gesamt !
+        lengths_2d, lengths_3d = self._get_3d_shaping_lengths(cell, inner_2d, ribs)
+        front, back, total = integrate_3d_shaping(lengths_2d, lengths_3d, sigma)
 
-        positions = self._get_ik_values(cell, numribs, exact=True)
+        return self._normalize_3d_shaping(front, back, total)
 
-        front = []
-        back = []
-
-        ff = math.sqrt(math.pi/2)*sigma
+    def _get_3d_shaping_lengths(self, cell, inner_2d, ribs):
+        """
+        segment lengths of the panel, flat and 3d, for every (mid-)rib
+        """
+        numribs = len(inner_2d) - 2
+        positions = self._get_ik_values(cell, numribs, exact=True)
 
+        lengths_2d = []
+        lengths_3d = []
         for rib_no in range(numribs + 2):
             x1, x2 = positions[rib_no]
-            rib_2d = inner_2d[rib_no][x1:x2]
-            rib_3d = ribs[rib_no][x1:x2]
-
-            lengthes_2d = rib_2d.get_segment_lengthes()
-            lengthes_3d = rib_3d.get_segment_lengthes()
+            lengths_2d.append(inner_2d[rib_no].get_segment_lengthes(x1, x2))
+            lengths_3d.append(ribs[rib_no].get_segment_lengthes(x1, x2))
 
-            distance = 0
-            amount_front = 0
-            # influence factor: e^-(x^2/(2*sigma^2))
-            # -> sigma = einflussfaktor [m]
-            # integral = sqrt(pi/2)*sigma * [ erf(x / (sqrt(2)*sigma) ) ]
+        return lengths_2d, lengths_3d
 
-            def integrate(lengths_2d, lengths_3d):
-                amount = 0
-                distance = 0
+    def _normalize_3d_shaping(self, front, back, total):
+        # ! vorn + hinten < gesamt !
+        front = np.array(front)
+        back = np.array(back)
+        if self.cut_front["type"] != "cut_3d" and self.cut_back["type"] != "cut_3d":
+            amount = front + back
+            normalize = np.abs(amount) > np.abs(total)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                normalization = np.abs(total / amount)
+            front = np.where(normalize, front * normalization, front)
+            back = np.where(normalize, back * normalization, back)
 
-                for l2d, l3d in zip(lengths_2d, lengths_3d):
-                    if l3d > 0:
-                        factor = (l3d - l2d) / l3d
-                        x = math.erf( (distance + l3d) / (sigma*math.sqrt(2))) - math.erf(distance / (sigma*math.sqrt(2)))
+        front[[0, -1]] = 0
+        back[[0, -1]] = 0
 
-                        amount += factor * x
-                    distance += l3d
-            
-                return amount
+        return front.tolist(), back.tolist()
 
-            amount_back = integrate(lengthes_2d, lengthes_3d)
-            amount_front = integrate(lengthes_2d[::-1], lengthes_3d[::-1])
 
-            for l2d, l3d in zip(lengthes_2d, lengthes_3d):
-                if l3d > 0:
-                    factor = (l3d - l2d) / l3d
-                    x = math.erf( (distance + l3d) / (sigma*math.sqrt(2))) - math.erf(distance / (sigma*math.sqrt(2)))
+def integrate_3d_shaping(lengths_2d, lengths_3d, sigma):
+    """
+    Integrate the length differences (3d - flat) of many lines, weighted with a gaussian distribution
+    from the front and back end: influence factor: e^-(x^2/(2*sigma^2)) -> sigma = einflussfaktor [m]
+    integral = sqrt(pi/2)*sigma * [ erf(x / (sqrt(2)*sigma) ) ]
+    :param lengths_2d: list of segment-lengths (flat)
+    :param lengths_3d: list of segment-lengths (3d)
+    :return: front, back, total (arrays, one value per line)
+    """
+    num_segments = max([1] + [len(lengths) for lengths in lengths_3d])
+    l_2d = np.zeros((len(lengths_2d), num_segments))
+    l_3d = np.zeros((len(lengths_3d), num_segments))
+    for i, (line_2d, line_3d) in enumerate(zip(lengths_2d, lengths_3d)):
+        l_2d[i, :len(line_2d)] = line_2d
+        l_3d[i, :len(line_3d)] = line_3d
 
-                    amount_front += factor * x
-                distance += l3d
+    # zero-padded segments don't add anything (skipped as l3d == 0)
+    amount_back = _integrate_erf(l_2d[:, ::-1], l_3d[:, ::-1], sigma)
+    amount_front = _integrate_erf(l_2d, l_3d, sigma, amount_back)
+    total = np.cumsum(l_3d - l_2d, axis=1)[:, -1]
 
-            distance = 0
-            amount_back = 0
+    ff = math.sqrt(math.pi/2)*sigma
 
-            for l2d, l3d in zip(lengthes_2d[::-1], lengthes_3d[::-1]):
-                if l3d > 0:
-                    factor = (l3d - l2d) / l3d
-                    x = math.erf( (distance + l3d) / (sigma*math.sqrt(2))) - math.erf(distance / (sigma*math.sqrt(2)))
-                    amount_back += factor * x
-                distance += l3d
+    return amount_front * ff, amount_back * ff, total
 
-            total = 0
-            for l2d, l3d in zip(lengthes_2d, lengthes_3d):
-                total += l3d - l2d
 
+_erf = np.frompyfunc(math.erf, 1, 1)
 
-            amount_front *= ff
-            amount_back *= ff
 
-            if self.cut_front["type"] != "cut_3d" and self.cut_back["type"] != "cut_3d":
-                if abs(amount_front + amount_back) > abs(total):
-                    normalization = abs(total / (amount_front + amount_back))
-                    amount_front *= normalization
-                    amount_back *= normalization
+def _integrate_erf(l_2d, l_3d, sigma, start=0.):
+    """
+    sum of (l3d - l2d) / l3d * [erf(x / (sqrt(2)*sigma))] over every segment (summed up in order)
+    """
+    distance = np.cumsum(l_3d, axis=1)
+    erf = _erf(np.concatenate([np.zeros((len(l_3d), 1)), distance], axis=1) / (sigma*math.sqrt(2)))
+    x = np.diff(erf.astype(float), axis=1)
 
-            if rib_no == 0 or rib_no == numribs+1:
-                amount_front = 0
-                amount_back = 0
-                
-            front.append(amount_front)
-            back.append(amount_back)
+    valid = l_3d > 0
+    factor = (l_3d - l_2d) / np.where(valid, l_3d, 1)
+    amounts = np.where(valid, factor * x, 0)
 
-        return front, back
+    start = np.zeros((len(l_3d), 1)) + np.reshape(start, (-1, 1))
+    return np.cumsum(np.concatenate([start, amounts], axis=1), axis=1)[:, -1]
 
 
 class PanelRigidFoil():
@@ -707,8 +709,7 @@ class PanelRigidFoil():
     def get_flattened(self, cell):
         line, ik_front, ik_back = self._get_flattened_line(cell)
 
-        left = line.copy().add_stuff(-self.channel_width/2)
-        right = line.copy().add_stuff(self.channel_width/2)
+        left, right = PolyLine2D.add_stuff_many([line, line], [-self.channel_width/2, self.channel_width/2])
 
         contour = left[ik_front:ik_back] + right[ik_back:ik_front]
         contour.close()
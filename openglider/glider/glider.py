@@ -30,7 +30,7 @@ import openglider
 from openglider.glider.cell.cell import Cell
 from openglider.glider.in_out import IMPORT_GEOMETRY, EXPORT_3D
 from openglider.glider.shape import Shape
-from openglider.mesh import Mesh
+from openglider.mesh import Mesh, MeshArrays
 from openglider.utils import consistent_value
 from openglider.utils.distribution import Distribution
 from openglider.vector.functions import norm, rotation_2d
@@ -155,6 +155,28 @@ class Glider(object):
 
         return mesh
 
+    def get_mesh_arrays(self, midribs=0):
+        """
+        Same as get_mesh, but as an array-backed MeshArrays.
+        The hull (the largest part) is built from arrays without creating Vertex objects.
+        """
+        meshes = []
+        for rib in self.ribs:
+            if not rib.profile_2d.has_zero_thickness:
+                meshes.append(rib.get_mesh(filled=True, glider=self))
+
+        for cell in self.cells:
+            for diagonal in cell.diagonals:
+                meshes.append(diagonal.get_mesh(cell))
+
+        meshes.append(self.lineset.get_mesh())
+        meshes.append(self.get_mesh_panels(num_midribs=midribs))
+
+        meshes = [mesh.get_arrays() for mesh in meshes]
+        meshes.append(MeshArrays.from_indexed(*self._get_mesh_hull_indexed(midribs)))
+
+        return MeshArrays.join(meshes)
+
     def get_mesh_panels(self, num_midribs=0):
         mesh = Mesh(name="panels")
         for cell in self.cells:
@@ -164,49 +186,55 @@ class Glider(object):
         return mesh
 
     def get_mesh_hull(self, num_midribs=0, ballooning=True):
+        return Mesh.from_indexed(*self._get_mesh_hull_indexed(num_midribs, ballooning))
+
+    def _get_mesh_hull_indexed(self, num_midribs=0, ballooning=True):
         ribs = self.return_ribs(num=num_midribs, ballooning=ballooning)
+        polygons, boundary = self.get_hull_indices(len(ribs), ribs.shape[1], num_midribs)
+
+        return ribs.reshape(-1, 3), {"hull": polygons}, boundary
+
+    @staticmethod
+    def get_hull_indices(num_ribs, numpoints, num_midribs=0):
+        """
+        Quad-topology of the hull for the flattened (num_ribs*numpoints, 3) rib-points.
+        The last point of every rib is joined with the first one (closed trailing edge).
+        :return: (num_quads, 4)-array, {"ribs": indices, "trailing_edge": indices}
+        """
+        rib_start = np.arange(num_ribs - 1, dtype=np.int32)[:, np.newaxis] * numpoints
+        k = np.arange(numpoints - 1, dtype=np.int32)
+        kplus = (k + 1) % (numpoints - 1)
 
-        num = len(ribs)
-        numpoints = len(ribs[0])  # points per rib
+        polygons = np.stack([
+            rib_start + k,
+            rib_start + kplus,
+            rib_start + numpoints + kplus,
+            rib_start + numpoints + k
+        ], axis=-1).reshape(-1, 4)
 
-        polygons = []
         boundary = {
-            "ribs": [],
-            "trailing_edge": []
+            "ribs": (rib_start[::num_midribs + 1] + k).reshape(-1),
+            "trailing_edge": rib_start.reshape(-1)
         }
-        for i in range(num-1):  # because we use i+1 below
-            boundary["trailing_edge"].append(i*numpoints)
-            if not i % (num_midribs+1):
-                boundary["ribs"] += [i*numpoints+k for k in range(numpoints-1)]
-
-            for k in range(numpoints - 1):  # same reason as above
-                kplus = (k+1) % (numpoints-1)
-                polygons.append([
-                    i * numpoints + k,
-                    i * numpoints + kplus,
-                    (i + 1) * numpoints + kplus,
-                    (i + 1) * numpoints + k
-                ])
-
-        return Mesh.from_indexed(np.concatenate(ribs), {"hull": polygons}, boundary)
+
+        return polygons, boundary
 
     def return_ribs(self, num=0, ballooning=True):
         """
-        Get a list of rib-curves
+        Get all rib-curves (ribs and midribs)
         :param num: number of midribs per cell
         :param ballooning: calculate ballooned cells
-        :return: nested list of ribs [[[x,y,z],p2,p3...],rib2,rib3,..]
+        :return: (num_ribs, numpoints, 3)-array [[[x,y,z],p2,p3...],rib2,rib3,..]
         """
         num += 1
         if not self.cells:
             return np.array([])
-        #will hold all the points
-        ribs = []
-        for cell in self.cells:
-            for y in range(num):
-                ribs.append(cell.midrib(y * 1. / num, ballooning=ballooning).data)
-        ribs.append(self.cells[-1].midrib(1.).data)
-        return ribs
+
+        y_values = np.arange(num) / num
+        ribs = [cell.midribs(y_values, ballooning=ballooning) for cell in self.cells]
+        ribs.append([self.cells[-1].midrib(1.).data])
+
+        return np.concatenate(ribs)
 
     def apply_mean_ribs(self, num_mean=8):
         """
@@ -2,6 +2,7 @@ import math
 import numpy as np
 
 # from openglider.graphics import Graphics3D, Line
+from openglider.mesh.export import export_obj as export_mesh_obj
 from openglider.vector.functions import norm, normalize
 from openglider.utils.distribution import Distribution
 
@@ -11,8 +12,10 @@ def export_obj(glider, path, midribs=0, numpoints=None, floatnum=6, copy=True):
     if numpoints:
         other.profile_numpoints = numpoints
 
-    mesh = other.get_mesh(midribs=midribs)
-    mesh.export_obj(path)
+    mesh = other.get_mesh_arrays(midribs=midribs)
+    # p.e. the last points of a closed trailing edge
+    mesh.delete_unused_vertices()
+    return export_mesh_obj(mesh, path, floatnum=floatnum)
 
 
 
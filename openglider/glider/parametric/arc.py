@@ -32,11 +32,11 @@ class ArcCurve(object):
         :return: [p0, p1,...]
         """
         # Symmetric-Bezier-> start from 0.5
-        arc_curve = PolyLine2D([self.curve(i) for i in np.linspace(0.5, 1, self.num_interpolation_points)])
+        arc_curve = PolyLine2D(self.curve(np.linspace(0.5, 1, self.num_interpolation_points)))
         arc_curve_length = arc_curve.get_length()
         scale_factor = arc_curve_length / x_values[-1]
-        _positions = [arc_curve.walk(0, x * scale_factor) for x in x_values]
-        positions = PolyLine2D([arc_curve[p] for p in _positions])
+        _positions = arc_curve.walk_many(0, np.asarray(x_values) * scale_factor)
+        positions = PolyLine2D(arc_curve.point_many(_positions))
         if not self.has_center_cell(x_values):
             positions[0][0] = 0
         # rescale
@@ -119,7 +119,7 @@ class ArcCurve(object):
         diff = [0, -positions[0][1]]
         self.curve.controlpoints = [p + diff for p in self.curve.controlpoints]
 
-        arc_curve = PolyLine2D([self.curve(i) for i in np.linspace(0.5, 1, self.num_interpolation_points)])
+        arc_curve = PolyLine2D(self.curve(np.linspace(0.5, 1, self.num_interpolation_points)))
         arc_curve_length = arc_curve.get_length()
         scale_factor = x_values[-1] / arc_curve_length
 
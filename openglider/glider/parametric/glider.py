@@ -148,6 +148,33 @@ class ParametricGlider(object):
             airfoil = first
         return Profile2D(airfoil.data)
 
+    def get_merge_profiles(self, factors, x_values=None):
+        """
+        Get merged profiles for many merge-factors at once:
+        all profiles are resampled to x_values once, the merged profiles are linear blends of those.
+        :param factors: merge factors (see get_merge_profile)
+        :param x_values: profile x-values (default: x-values of the first profile)
+        :return: list of Profile2D
+        """
+        if x_values is None:
+            x_values = self.profiles[0].x_values
+        x_values = np.asarray(x_values, dtype=float)
+
+        # (num_profiles, num_x)
+        profiles_y = np.array([profile.profilepoint(x_values)[:, 1] for profile in self.profiles])
+
+        factors = np.clip(np.asarray(factors, dtype=float), 0, len(self.profiles)-1)
+        i = np.minimum(np.floor(factors), max(len(self.profiles)-2, 0)).astype(int)
+        k = (factors - i)[:, np.newaxis]
+
+        if len(self.profiles) > 1:
+            merged_y = profiles_y[i] * (1 - k) + profiles_y[i + 1] * k
+        else:
+            merged_y = profiles_y[i]
+
+        x = np.abs(x_values)
+        return [Profile2D(np.array([x, y]).T) for y in merged_y]
+
     def get_panels(self, glider_3d=None):
         """
         Create Panels Objects and apply on gliders cells if provided, otherwise create a list of panels
@@ -264,11 +291,11 @@ class ParametricGlider(object):
     def get_aoa(self, interpolation_num=None):
         aoa_interpolation = self.aoa.interpolation(num=interpolation_num or self.num_interpolate)
 
-        return [aoa_interpolation(x) for x in self.shape.rib_x_values]
+        return list(aoa_interpolation(self.shape.rib_x_values))
 
     def apply_aoa(self, glider, interpolation_num=50):
         aoa_interpolation = self.aoa.interpolation(num=interpolation_num)
-        aoa_values = [aoa_interpolation(x) for x in self.shape.rib_x_values]
+        aoa_values = list(aoa_interpolation(self.shape.rib_x_values))
 
         if self.shape.has_center_cell:
             aoa_values.insert(0, aoa_values[0])
@@ -278,11 +305,11 @@ class ParametricGlider(object):
 
     def get_profile_merge(self):
         profile_merge_curve = self.profile_merge_curve.interpolation(num=self.num_interpolate)
-        return [profile_merge_curve(abs(x)) for x in self.shape.rib_x_values]
+        return list(profile_merge_curve(np.abs(self.shape.rib_x_values)))
 
     def get_ballooning_merge(self):
         ballooning_merge_curve = self.ballooning_merge_curve.interpolation(num=self.num_interpolate)
-        return [ballooning_merge_curve(abs(x) for x in self.shape.cell_x_values)]
+        return list(ballooning_merge_curve(np.abs(self.shape.cell_x_values)))
 
     def apply_shape_and_arc(self, glider):
         x_values = self.shape.rib_x_values
@@ -345,16 +372,19 @@ class ParametricGlider(object):
         if "rib_material" in self.elements:
             rib_material = self.elements["rib_material"]
 
+        profile_factors = list(profile_merge_curve(np.abs(x_values)))
+        aoa_values = aoa_int(x_values)
+        zrot_values = zrot_int(x_values)
+        profiles = self.get_merge_profiles(profile_factors, profile_x_values)
+
         for rib_no, pos in enumerate(x_values):
             front, back = shape_ribs[rib_no]
             arc = arc_pos[rib_no]
             startpoint = np.array([-front[1] + offset_x, arc[0], arc[1]])
 
             chord = abs(front[1]-back[1])
-            factor = profile_merge_curve(abs(pos))
-            profile = self.get_merge_profile(factor)
+            profile = profiles[rib_no]
             profile.name = "Profile{}".format(rib_no)
-            profile.x_values = profile_x_values
 
             this_rib_holes = [RibHole(ribhole["pos"], ribhole["size"]) for ribhole in rib_holes if rib_no in ribhole["ribs"]]
             this_rigid_foils = [RigidFoil(rigid["start"], rigid["end"], rigid["distance"]) for rigid in rigids if rib_no in rigid["ribs"]]
@@ -365,14 +395,14 @@ class ParametricGlider(object):
                 chord=chord,
                 arcang=rib_angles[rib_no],
                 glide=self.glide,
-                aoa_absolute=aoa_int(pos),
-                zrot=zrot_int(pos),
+                aoa_absolute=aoa_values[rib_no],
+                zrot=zrot_values[rib_no],
                 holes=this_rib_holes,
                 rigidfoils=this_rigid_foils,
                 name="rib{}".format(rib_no),
                 material_code=rib_material
             ))
-            ribs[-1].aoa_relative = aoa_int(pos)
+            ribs[-1].aoa_relative = aoa_values[rib_no]
 
         if self.shape.has_center_cell:
             new_rib = ribs[0].copy()
@@ -383,9 +413,9 @@ class ParametricGlider(object):
             cell_centers.insert(0, 0.)
 
         glider.cells = []
+        ballooning_factors = ballooning_merge_curve(cell_centers)
         for cell_no, (rib1, rib2) in enumerate(zip(ribs[:-1], ribs[1:])):
-            ballooning_factor = ballooning_merge_curve(cell_centers[cell_no])
-            ballooning = self.merge_ballooning(ballooning_factor)
+            ballooning = self.merge_ballooning(ballooning_factors[cell_no])
             
             cell = Cell(rib1, rib2, ballooning, name="c{}".format(cell_no+1))
 
@@ -428,9 +458,9 @@ class ParametricGlider(object):
             ballooning.apply_splines()
         cell_centers = self.shape.cell_x_values
         ballooning_merge_curve = self.ballooning_merge_curve.interpolation(num=self.num_interpolate)
+        ballooning_factors = ballooning_merge_curve(cell_centers[:len(glider3d.cells)])
         for cell_no, cell in enumerate(glider3d.cells):
-            ballooning_factor = ballooning_merge_curve(cell_centers[cell_no])
-            ballooning = self.merge_ballooning(ballooning_factor)
+            ballooning = self.merge_ballooning(ballooning_factors[cell_no])
             cell.ballooning = ballooning
 
         return glider3d
@@ -85,7 +85,8 @@ class ParametricShape(object):
         interpolation = Interpolation([[p[1], p[0]] for p in data])
         start = self.has_center_cell / self.cell_num
         num = self.cell_num // 2 + 1
-        return [[interpolation(i), i] for i in np.linspace(start, 1, num)]
+        positions = np.linspace(start, 1, num)
+        return [[x, position] for x, position in zip(interpolation(positions), positions)]
 
     @property
     def fast_interpolation(self):
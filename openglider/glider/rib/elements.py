@@ -110,7 +110,7 @@ class FoilCurve(object):
         ]
         profile = rib.profile_2d
 
-        cp = [profile.align(point)*rib.chord for point in curve]
+        cp = profile.align(curve)*rib.chord
 
 
         return Bezier(cp).interpolation(numpoints)
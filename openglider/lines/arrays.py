@@ -0,0 +1,462 @@
+import logging
+
+import numpy as np
+
+from openglider.lines.elements import Line, SagMatrixStructure
+
+logger = logging.getLogger(__name__)
+
+
+def _to_float(value):
+    if value is None:
+        return np.nan
+    return float(value)
+
+
+def _normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1)[..., None]
+
+
+class LineSetArrays(object):
+    """
+    Array-backed (struct-of-arrays) state of a LineSet.
+
+    Node positions, forces and the line connectivity are stored in contiguous
+    arrays so geometry, projections, drag, weight and force propagation are
+    computed for all lines at once. The Line and Node objects stay the
+    reference: read() pulls their state, write() pushes the results back.
+    """
+    rho_air = Line.rho_air
+    state_attributes = ("positions", "node_forces", "forces", "init_lengths", "sag_par_1", "sag_par_2", "v_inf")
+
+    def __init__(self, lineset):
+        self.lineset = lineset
+        self.topology = topology = lineset.topology
+        self.lines = topology.lines
+        self.nodes = topology.nodes
+
+        node_index = {node: i for i, node in enumerate(self.nodes)}
+        # lines hash by their (cached) attributes -> use the id
+        line_index = {id(line): i for i, line in enumerate(self.lines)}
+
+        self.lower = np.array([node_index[line.lower_node] for line in self.lines], dtype=int)
+        self.upper = np.array([node_index[line.upper_node] for line in self.lines], dtype=int)
+        self.node_types = np.array([node.type for node in self.nodes], dtype=int)
+
+        # lower line of every line (-1 for a fixed lower node)
+        lower_line = []
+        for line in self.lines:
+            lower_lines = topology.get_lower_connected_lines(line.lower_node)
+            if line.lower_node.type == 0 or not lower_lines:
+                lower_line.append(-1)
+            else:
+                lower_line.append(line_index[id(lower_lines[0])])
+        self.lower_line = np.array(lower_line, dtype=int)
+
+        # (line, upper_line) pairs for lines with a free upper node
+        upper_pairs = []
+        for i, line in enumerate(self.lines):
+            if line.upper_node.type == 1:
+                for upper_line in topology.get_upper_connected_lines(line.upper_node):
+                    upper_pairs.append((i, line_index[id(upper_line)]))
+        self.upper_pairs = np.array(upper_pairs, dtype=int).reshape(-1, 2)
+
+        # (line, uppermost node) pairs
+        influence_pairs = []
+        for i, line in enumerate(self.lines):
+            for node in topology.get_influence_nodes(line.upper_node):
+                influence_pairs.append((i, node_index[node]))
+        self.influence_pairs = np.array(influence_pairs, dtype=int).reshape(-1, 2)
+
+        # line-levels starting at the lower attachment points
+        depth = {}
+        levels = []
+        for line in topology.lines_bottom_up:
+            level = depth.setdefault(id(line), 0)
+            for upper_line in topology.get_upper_connected_lines(line.upper_node):
+                depth[id(upper_line)] = level + 1
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(line_index[id(line)])
+        self.levels = [np.array(level, dtype=int) for level in levels]
+
+        self.line_types = None
+
+        self._sag_structure = None
+        self._sag_pattern = self._get_sag_pattern()
+
+        self.read()
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getstate__(self):
+        # the numeric state only (p.e. for a process pool)
+        state = self.__dict__.copy()
+        for key in ("lineset", "topology", "lines", "nodes"):
+            state[key] = None
+        return state
+
+    def get_state(self):
+        return {key: getattr(self, key).copy() for key in self.state_attributes}
+
+    def set_state(self, state):
+        for key in self.state_attributes:
+            setattr(self, key, state[key].copy())
+
+    def read(self):
+        """
+        pull the state of the lines and nodes into the arrays
+        """
+        self.read_line_types()
+
+        self.positions = np.array([
+            np.full(3, np.nan) if node.vec is None else np.array(node.vec, dtype=float)
+            for node in self.nodes]).reshape(-1, 3)
+        self.node_forces = np.zeros((len(self.nodes), 3))
+        for i, node in enumerate(self.nodes):
+            if node.type == 2:
+                self.node_forces[i] = np.array(node.force, dtype=float)
+
+        self.forces = np.array([_to_float(line.force) for line in self.lines])
+        self.init_lengths = np.array([_to_float(line.init_length) for line in self.lines])
+        self.sag_par_1 = np.array([_to_float(line.sag_par_1) for line in self.lines])
+        self.sag_par_2 = np.array([_to_float(line.sag_par_2) for line in self.lines])
+        self.v_inf = np.array(self.lineset.v_inf, dtype=float)
+
+    def read_line_types(self):
+        """
+        pull names and type-properties (drag, thickness, weight) of the lines if a line-type changed
+        """
+        line_types = [line.type for line in self.lines]
+        self.line_names = [line.name for line in self.lines]
+        if self.line_types is not None and all(
+                type_1 is type_2 for type_1, type_2 in zip(line_types, self.line_types)):
+            return
+
+        self.line_types = line_types
+        self.cw = np.array([line_type.cw for line_type in line_types])
+        self.thickness = np.array([line_type.thickness for line_type in line_types])
+        for line_type in set(line_type for line_type in line_types if line_type.weight is None):
+            logger.warning(f"predicting weight of linetype {line_type.name} by line-thickness.")
+
+        self.weight_per_length = np.array([
+            line_type.predict_weight() if line_type.weight is None else line_type.weight
+            for line_type in line_types])
+
+    def write(self):
+        """
+        push positions, forces and sag-parameters back to the lines and nodes
+        """
+        projected = self.get_projected_positions()
+        for i, node in enumerate(self.nodes):
+            if node.type == 1:
+                node.vec = self.positions[i].copy()
+            node.vec_proj = projected[i].copy()
+
+        for i, line in enumerate(self.lines):
+            force = self.forces[i]
+            line.force = None if np.isnan(force) else force
+            if np.isnan(self.sag_par_1[i]):
+                line.sag_par_1 = line.sag_par_2 = None
+            else:
+                line.sag_par_1 = self.sag_par_1[i]
+                line.sag_par_2 = self.sag_par_2[i]
+
+    # -----GEOMETRY-----#
+    def get_diff_vectors(self):
+        return _normalize(self.positions[self.upper] - self.positions[self.lower])
+
+    def get_lengths(self):
+        return np.linalg.norm(self.positions[self.upper] - self.positions[self.lower], axis=1)
+
+    def get_projected_positions(self, v_inf=None):
+        if v_inf is None:
+            v_inf = self.v_inf
+        return self.positions - np.outer(self.positions.dot(v_inf), v_inf) / v_inf.dot(v_inf)
+
+    def get_lengths_projected(self, projected=None):
+        if projected is None:
+            projected = self.get_projected_positions()
+        return np.linalg.norm(projected[self.lower] - projected[self.upper], axis=1)
+
+    def get_diff_vectors_projected(self, projected=None):
+        if projected is None:
+            projected = self.get_projected_positions()
+        return _normalize(projected[self.upper] - projected[self.lower])
+
+    def get_ortho_pressure(self):
+        """
+        drag per meter (projected): 1/2 * cw * d * v^2
+        """
+        return 1 / 2 * self.cw * self.thickness * self.rho_air * self.v_inf.dot(self.v_inf)
+
+    def get_forces_projected(self, lengths_projected=None):
+        if lengths_projected is None:
+            lengths_projected = self.get_lengths_projected()
+        return self.forces * lengths_projected / self.get_lengths()
+
+    def get_sag(self, x):
+        """
+        sag u(x) [m] of all lines, x: [0,1] (scalar or array)
+        """
+        x = np.asarray(x, dtype=float)
+        lengths_projected = self.get_lengths_projected()
+        forces_projected = self.get_forces_projected(lengths_projected)
+        xi = np.multiply.outer(lengths_projected, x)
+        ortho_pressure = self.get_ortho_pressure()
+
+        if x.ndim:
+            ortho_pressure = ortho_pressure[:, None]
+            forces_projected = forces_projected[:, None]
+            sag_par_1 = self.sag_par_1[:, None]
+            sag_par_2 = self.sag_par_2[:, None]
+        else:
+            sag_par_1 = self.sag_par_1
+            sag_par_2 = self.sag_par_2
+
+        return -xi ** 2 / 2 * ortho_pressure / forces_projected + xi * sag_par_1 + sag_par_2
+
+    def get_line_points(self, numpoints=10, sag=True):
+        """
+        points of all lines: (n_lines, numpoints, 3)
+        lines without sag-parameters are straight
+        """
+        x = np.linspace(0, 1, numpoints)
+        lower = self.positions[self.lower]
+        upper = self.positions[self.upper]
+        points = lower[:, None, :] * (1. - x)[None, :, None] + upper[:, None, :] * x[None, :, None]
+
+        if sag:
+            sag_values = self.get_sag(x)
+            sag_values[np.isnan(self.sag_par_1)] = 0
+            points += sag_values[:, :, None] * _normalize(self.v_inf)
+
+        return points
+
+    def get_lengths_with_sag(self, numpoints=100):
+        points = self.get_line_points(numpoints=numpoints)
+        return np.linalg.norm(np.diff(points, axis=1), axis=2).sum(axis=1)
+
+    def get_drag(self):
+        """
+        Get Total drag of the lineset
+        :return: Center of Pressure, Drag (1/2*cw*A*v^2)
+        """
+        drag = self.get_ortho_pressure() * self.get_lengths_projected()
+        drag_total = drag.sum()
+        center = self.get_line_points(numpoints=3)[:, 1]
+
+        return drag.dot(center) / drag_total, drag_total
+
+    def get_weight(self):
+        return self.weight_per_length.dot(self.get_lengths_with_sag())
+
+    def get_stretched_lengths(self, pre_load=50, sag=True):
+        """
+        line-lengths for production (see Line.get_stretched_length)
+        """
+        if sag:
+            lengths = self.get_lengths_with_sag()
+        else:
+            lengths = self.get_lengths()
+
+        factors = np.array([
+            line_type.get_stretch_factor(pre_load) / line_type.get_stretch_factor(force)
+            for line_type, force in zip(self.line_types, self.forces)])
+
+        return lengths * factors
+
+    def calc_geo(self):
+        """
+        compute the free nodes level by level starting at the lower attachment points
+        """
+        for level in self.levels:
+            lines = level[self.node_types[self.upper[level]] == 1]
+            if len(lines) == 0:
+                continue
+
+            lower_points = self.positions[self.lower[lines]]
+            tangential = self.get_tangential_comp(lines)
+            self.positions[self.upper[lines]] = lower_points + tangential * self.init_lengths[lines][:, None]
+
+    def get_tangential_comp(self, lines):
+        lower_points = self.positions[self.lower[lines]]
+        upper_points = self.positions[self.upper[lines]]
+        with np.errstate(invalid="ignore"):
+            # same as Line.has_geo: all coordinates known and non-zero
+            has_geo = np.all(lower_points != 0, axis=1) & np.all(upper_points != 0, axis=1)
+            has_geo &= np.all(np.isfinite(lower_points), axis=1) & np.all(np.isfinite(upper_points), axis=1)
+        has_force = ~np.isnan(self.forces[lines])
+
+        result = np.zeros((len(lines), 3))
+
+        corrected = has_geo & has_force
+        if np.any(corrected):
+            result[corrected] = self._get_corrected_direction(lines[corrected])
+
+        if not np.all(corrected):
+            result[~corrected] = self._get_force_direction(lines[~corrected], lower_points[~corrected])
+
+        return result
+
+    def _get_corrected_direction(self, lines):
+        """
+        shift the upper nodes by the residual force (see LineSet.get_tangential_comp)
+        """
+        diff = self.get_diff_vectors()
+        diff_length = np.linalg.norm(diff, axis=1)
+        line_forces = self.forces[:, None] * diff
+
+        residual = np.zeros_like(self.positions)
+        np.add.at(residual, self.lower, line_forces)
+        np.add.at(residual, self.upper, -line_forces)
+        residual_normed = _normalize(residual)
+
+        def correction_influence(line_indices, node_indices):
+            f = 1. - np.sum(residual_normed[node_indices] * diff[line_indices] / diff_length[line_indices, None], axis=1)
+            return f * self.forces[line_indices] / diff_length[line_indices]
+
+        # sum over all lines connected to the node
+        all_lines = np.arange(len(self))
+        influence = np.zeros(len(self.positions))
+        np.add.at(influence, self.lower, correction_influence(all_lines, self.lower))
+        np.add.at(influence, self.upper, correction_influence(all_lines, self.upper))
+
+        nodes = self.upper[lines]
+        s = correction_influence(lines, nodes) + influence[nodes]
+
+        return _normalize(diff[lines] + residual[nodes] / s[:, None] * 0.5)
+
+    def _get_force_direction(self, lines, lower_points):
+        """
+        direction of the lines from the forces of the uppermost nodes
+        """
+        line_position = np.full(len(self), -1)
+        line_position[lines] = np.arange(len(lines))
+
+        pairs = self.influence_pairs[line_position[self.influence_pairs[:, 0]] >= 0]
+        pair_lines = line_position[pairs[:, 0]]
+        direction = self.positions[pairs[:, 1]] - lower_points[pair_lines]
+        force = self.node_forces[pairs[:, 1]]
+
+        projection = np.sum(direction * force, axis=1)
+        singular = projection ** 2 < 0.00001
+        if np.any(singular):
+            logger.warning(f"singular force projection for {np.sum(singular)} nodes")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            force_projected = np.where(singular, 0.00001, np.sum(force * force, axis=1) / projection)
+
+        tangent = np.zeros((len(lines), 3))
+        np.add.at(tangent, pair_lines, _normalize(direction) * force_projected[:, None])
+
+        return _normalize(tangent)
+
+    def calc_forces(self):
+        """
+        propagate the forces from the uppermost nodes to the lower attachment points
+        """
+        diff = self.get_diff_vectors()
+        node_forces = np.zeros_like(self.positions)
+
+        for level in self.levels[::-1]:
+            is_upper = self.node_types[self.upper[level]] == 2
+
+            lines = level[is_upper]
+            force = self.node_forces[self.upper[lines]]
+            projection = np.sum(diff[lines] * force, axis=1)
+            singular = projection ** 2 < 0.00001
+            if np.any(singular):
+                logger.warning(f"singular force projection for {np.sum(singular)} lines")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.forces[lines] = np.where(singular, 10, np.abs(np.sum(force * force, axis=1) / projection))
+
+            lines = level[~is_upper]
+            self.forces[lines] = np.abs(np.sum(node_forces[self.upper[lines]] * diff[lines], axis=1))
+
+            np.add.at(node_forces, self.lower[level], self.forces[level, None] * diff[level])
+
+    # -----SAG-----#
+    def _get_sag_pattern(self):
+        """
+        rows and columns of the sag-system in the order of the values of _get_sag_values
+        """
+        lines = np.arange(len(self))
+        free_lower = lines[self.lower_line >= 0]
+        fixed_lower = lines[self.lower_line < 0]
+        lower_lines = self.lower_line[free_lower]
+        free_upper = lines[self.node_types[self.upper] == 1]
+        fixed_upper = lines[self.node_types[self.upper] != 1]
+
+        rows = [
+            2 * fixed_lower + 1,
+            2 * free_lower + 1, 2 * free_lower + 1, 2 * free_lower + 1,
+            2 * free_upper,
+            2 * self.upper_pairs[:, 0],
+            2 * fixed_upper, 2 * fixed_upper
+        ]
+        columns = [
+            2 * fixed_lower + 1,
+            2 * free_lower + 1, 2 * lower_lines + 1, 2 * lower_lines,
+            2 * free_upper,
+            2 * self.upper_pairs[:, 1],
+            2 * fixed_upper, 2 * fixed_upper + 1
+        ]
+
+        return np.concatenate(rows), np.concatenate(columns)
+
+    def calc_sag(self):
+        """
+        compute the sag parameters of all lines
+        """
+        projected = self.get_projected_positions()
+        lengths_projected = self.get_lengths_projected(projected)
+        diff_projected = self.get_diff_vectors_projected(projected)
+        forces_projected = self.get_forces_projected(lengths_projected)
+        ortho_pressure = self.get_ortho_pressure()
+
+        lines = np.arange(len(self))
+        free_lower = lines[self.lower_line >= 0]
+        fixed_lower = lines[self.lower_line < 0]
+        lower_lines = self.lower_line[free_lower]
+        free_upper = lines[self.node_types[self.upper] == 1]
+        fixed_upper = lines[self.node_types[self.upper] != 1]
+        pair_lines, pair_upper = self.upper_pairs.T
+
+        influence = forces_projected[pair_upper] * np.sum(diff_projected[pair_lines] * diff_projected[pair_upper], axis=1)
+        influence_sum = np.bincount(pair_lines, weights=influence, minlength=len(self))
+
+        values = np.concatenate([
+            np.ones(len(fixed_lower)),
+            np.ones(len(free_lower)), -np.ones(len(free_lower)), -lengths_projected[lower_lines],
+            np.ones(len(free_upper)),
+            -influence / influence_sum[pair_lines],
+            lengths_projected[fixed_upper], np.ones(len(fixed_upper))
+        ])
+
+        size = 2 * len(self)
+        rhs = np.zeros(size)
+        rhs[2 * free_lower + 1] = -ortho_pressure[lower_lines] * \
+            lengths_projected[lower_lines] ** 2 / forces_projected[lower_lines] / 2
+        rhs[2 * free_upper] = ortho_pressure[free_upper] * \
+            lengths_projected[free_upper] / forces_projected[free_upper]
+        rhs[2 * fixed_upper] = ortho_pressure[fixed_upper] * \
+            lengths_projected[fixed_upper] ** 2 / forces_projected[fixed_upper] / 2
+
+        if self._sag_structure is None:
+            self._sag_structure = SagMatrixStructure(size, *self._sag_pattern)
+
+        solution = self._sag_structure.solve(values, rhs)
+        self.sag_par_1 = solution[::2].copy()
+        self.sag_par_2 = solution[1::2].copy()
+
+    def recalc(self, calculate_sag=True, iterations=1):
+        for _ in range(iterations):
+            self.calc_geo()
+            self.calc_forces()
+            if calculate_sag:
+                self.calc_sag()
+            else:
+                self.sag_par_1[:] = np.nan
+                self.sag_par_2[:] = np.nan
@@ -20,32 +20,107 @@
 import logging
 import numpy as np
 import logging
+import scipy.sparse
+import scipy.sparse.linalg
+from scipy.sparse.csgraph import reverse_cuthill_mckee
 
 from openglider.lines import line_types
 from openglider.lines.functions import proj_force, proj_to_surface
-from openglider.utils.cache import cached_property, CachedObject
+from openglider.utils.cache import cached_property, CachedObject, new_version
 from openglider.vector import PolyLine
 from openglider.vector.functions import norm, normalize
 from openglider.mesh import Mesh, Vertex, Polygon
 
 logger = logging.getLogger(__name__)
 
+class SagMatrixStructure(object):
+    """
+    Sparsity pattern of the sag-system for a given line-topology.
+
+    The pattern, a bandwidth-reducing permutation and the mapping of the
+    inserted values to the compressed matrix are computed once and reused
+    as long as the topology (the inserted rows/columns) does not change.
+    Only the numeric values have to be refilled for every solve.
+    """
+    def __init__(self, size, rows, columns):
+        self.size = size
+        self.rows = np.array(rows, dtype=int)
+        self.columns = np.array(columns, dtype=int)
+
+        # coo -> csc sums duplicate entries, the dense matrix keeps the last one:
+        # only valid for tree-topologies, where every (row, column) is inserted once
+        entries, counts = np.unique(self.rows * size + self.columns, return_counts=True)
+        if np.any(counts > 1):
+            duplicates = entries[counts > 1]
+            raise ValueError("Duplicate entries in the sag-matrix (no tree-topology?): {}".format(
+                [(int(i // size), int(i % size)) for i in duplicates]))
+
+        pattern = scipy.sparse.coo_matrix(
+            (np.ones(len(self.rows)), (self.rows, self.columns)), shape=(size, size)).tocsr()
+        self.permutation = reverse_cuthill_mckee(pattern, symmetric_mode=False)
+        inverse = np.empty(size, dtype=int)
+        inverse[self.permutation] = np.arange(size)
+
+        # store the position of each inserted value in the permuted csc-matrix
+        positions = np.arange(1, len(self.rows) + 1, dtype=float)
+        matrix = scipy.sparse.coo_matrix(
+            (positions, (inverse[self.rows], inverse[self.columns])), shape=(size, size)).tocsc()
+        matrix.sort_indices()
+
+        self.indices = matrix.indices
+        self.indptr = matrix.indptr
+        self.data_index = matrix.data.astype(int) - 1
+
+    def matches(self, size, rows, columns):
+        return (size == self.size and
+                len(rows) == len(self.rows) and
+                np.array_equal(rows, self.rows) and
+                np.array_equal(columns, self.columns))
+
+    def solve(self, values, rhs):
+        data = np.asarray(values, dtype=float)[self.data_index]
+        matrix = scipy.sparse.csc_matrix((data, self.indices, self.indptr), shape=(self.size, self.size))
+        # the ordering is already applied -> no column permutation needed
+        lu = scipy.sparse.linalg.splu(matrix, permc_spec="NATURAL")
+
+        solution = np.zeros(self.size)
+        solution[self.permutation] = lu.solve(rhs[self.permutation])
+        return solution
+
+
 class SagMatrix():
-    def __init__(self, number_of_lines):
-        size = number_of_lines * 2
-        self.matrix = np.zeros([size, size])
+    def __init__(self, number_of_lines, structure=None):
+        self.size = size = number_of_lines * 2
+        self.rows = []
+        self.columns = []
+        self.values = []
         self.rhs = np.zeros(size)
         self.solution = np.zeros(size)
+        self.structure = structure
 
     def __str__(self):
         return str(self.matrix) + "\n" + str(self.rhs)
 
+    @property
+    def matrix(self):
+        """
+        dense representation of the system-matrix
+        """
+        matrix = np.zeros([self.size, self.size])
+        matrix[self.rows, self.columns] = self.values
+        return matrix
+
+    def _insert(self, row, column, value):
+        self.rows.append(row)
+        self.columns.append(column)
+        self.values.append(value)
+
     def insert_type_0_lower(self, line):
         """
         fixed lower node
         """
         i = line.number
-        self.matrix[2 * i + 1, 2 * i + 1] = 1.
+        self._insert(2 * i + 1, 2 * i + 1, 1.)
 
     def insert_type_1_lower(self, line, lower_line):
         """
@@ -53,9 +128,9 @@ class SagMatrix():
         """
         i = line.number
         j = lower_line.number
-        self.matrix[2 * i + 1, 2 * i + 1] = 1.
-        self.matrix[2 * i + 1, 2 * j + 1] = -1.
-        self.matrix[2 * i + 1, 2 * j] = -lower_line.length_projected
+        self._insert(2 * i + 1, 2 * i + 1, 1.)
+        self._insert(2 * i + 1, 2 * j + 1, -1.)
+        self._insert(2 * i + 1, 2 * j, -lower_line.length_projected)
         self.rhs[2 * i + 1] = -lower_line.ortho_pressure * \
             lower_line.length_projected ** 2 / lower_line.force_projected / 2
 
@@ -64,7 +139,7 @@ class SagMatrix():
         free upper node
         """
         i = line.number
-        self.matrix[2 * i, 2 * i] = 1
+        self._insert(2 * i, 2 * i, 1.)
         infl_list = []
         vec = line.diff_vector_projected
         for u in upper_lines:
@@ -73,7 +148,7 @@ class SagMatrix():
         sum_infl = sum(infl_list)
         for k in range(len(upper_lines)):
             j = upper_lines[k].number
-            self.matrix[2 * i, 2 * j] = -(infl_list[k] / sum_infl)
+            self._insert(2 * i, 2 * j, -(infl_list[k] / sum_infl))
         self.rhs[2 * i] = line.ortho_pressure * \
             line.length_projected / line.force_projected
 
@@ -82,13 +157,16 @@ class SagMatrix():
         Fixed upper node
         """
         i = line.number
-        self.matrix[2 * line.number, 2 * line.number] = line.length_projected
-        self.matrix[2 * line.number, 2 * line.number + 1] = 1.
+        self._insert(2 * i, 2 * i, line.length_projected)
+        self._insert(2 * i, 2 * i + 1, 1.)
         self.rhs[2 * i] = line.ortho_pressure * \
             line.length_projected ** 2 / line.force_projected / 2
 
     def solve_system(self):
-        self.solution = np.linalg.solve(self.matrix, self.rhs)
+        if self.structure is None or not self.structure.matches(self.size, self.rows, self.columns):
+            self.structure = SagMatrixStructure(self.size, self.rows, self.columns)
+
+        self.solution = self.structure.solve(self.values, self.rhs)
 
     def get_sag_parameters(self, line_nr):
         return [
@@ -98,6 +176,8 @@ class SagMatrix():
 
 class Line(CachedObject):
     rho_air = 1.2
+    # changes whenever the nodes of any line are exchanged (LineSet.topology is rebuilt then)
+    graph_version = new_version()
 
 
     def __init__(self, lower_node, upper_node, v_inf,
@@ -126,6 +206,24 @@ class Line(CachedObject):
 
         self.lineset = None      # the parent have to be set after initialization
 
+    @property
+    def lower_node(self):
+        return self._lower_node
+
+    @lower_node.setter
+    def lower_node(self, node):
+        self._lower_node = node
+        Line.graph_version = new_version()
+
+    @property
+    def upper_node(self):
+        return self._upper_node
+
+    @upper_node.setter
+    def upper_node(self, node):
+        self._upper_node = node
+        Line.graph_version = new_version()
+
     @property
     def color(self):
         return self._color or "default"
@@ -1,4 +1,5 @@
 import re
+import time
 import numpy as np
 import copy
 import logging
@@ -6,6 +7,9 @@ from openglider.lines import SagMatrix
 
 from openglider.lines.functions import proj_force
 from openglider.lines.elements import Node
+from openglider.lines.topology import LineTopology
+from openglider.lines.arrays import LineSetArrays
+from openglider.lines.loadcases import solve_load_cases
 from openglider.mesh import Mesh
 from openglider.vector.functions import norm, normalize
 from openglider.utils.table import Table
@@ -26,10 +30,13 @@ class LineSet(object):
         if v_inf is not None:
             v_inf = np.array(v_inf)
         self.v_inf = v_inf
+        self._topology = None
+        self._arrays = None
         self.lines = lines or []
-        for line in lines:
+        for line in self.lines:
             line.lineset = self
         self.mat = None
+        self._sag_structure = None
         self.glider = None
 
     def __repr__(self):
@@ -42,9 +49,46 @@ class LineSet(object):
                    self.total_length)
         
 
+    @property
+    def lines(self):
+        return self._lines
+
+    @lines.setter
+    def lines(self, lines):
+        self._lines = lines
+        self._topology = None
+
+    @property
+    def topology(self):
+        """
+        node -> line adjacency index, rebuilt when lines are added, replaced or get other nodes
+        """
+        if self._topology is None or not self._topology.is_valid(self._lines):
+            self._topology = LineTopology(self._lines)
+
+        return self._topology
+
+    def invalidate_topology(self):
+        """
+        force a rebuild of the adjacency index
+        """
+        self._topology = None
+
+    def get_arrays(self):
+        """
+        array-backed state of the lineset, synchronized with the lines and nodes
+        :return: LineSetArrays
+        """
+        if self._arrays is None or self._arrays.topology is not self.topology:
+            self._arrays = LineSetArrays(self)
+        else:
+            self._arrays.read()
+
+        return self._arrays
+
     @property
     def lowest_lines(self):
-        return [line for line in self.lines if line.lower_node.type == 0]
+        return list(self.topology.lowest_lines)
 
     @property
     def uppermost_lines(self):
@@ -52,11 +96,7 @@ class LineSet(object):
 
     @property
     def nodes(self):
-        nodes = set()
-        for line in self.lines:
-            nodes.add(line.upper_node)
-            nodes.add(line.lower_node)
-        return nodes
+        return set(self.topology.nodes)
 
     def scale(self, factor):
         for p in self.lower_attachment_points:
@@ -76,11 +116,11 @@ class LineSet(object):
 
     @property
     def attachment_points(self):
-        return [n for n in self.nodes if n.type == 2]
+        return [n for n in self.topology.nodes if n.type == 2]
 
     @property
     def lower_attachment_points(self):
-        return [n for n in self.nodes if n.type == 0]
+        return [n for n in self.topology.nodes if n.type == 0]
 
     def get_main_attachment_point(self):
         main_attachment_point = None
@@ -98,16 +138,8 @@ class LineSet(object):
         """
         floors: number of line-levels
         """
-        def recursive_count_floors(node):
-            if node.type == 2:
-                return 0
-
-            lines = self.get_upper_connected_lines(node)
-            nodes = [line.upper_node for line in lines]
-            depths = [recursive_count_floors(node) for node in nodes]
-            return max(depths) + 1
-
-        return {n: recursive_count_floors(n) for n in self.lower_attachment_points}
+        floors = self.topology.floors
+        return {n: floors[n] for n in self.lower_attachment_points}
 
     def get_lines_by_floor(self, target_floor: int=0, node: Node=None, en_style=True):
         """
@@ -165,10 +197,11 @@ class LineSet(object):
             mesh += line.get_mesh(numpoints)
         return mesh
 
-    def recalc(self, calculate_sag=True, iterations=1):
+    def recalc(self, calculate_sag=True, iterations=1, vectorized=False):
         """
         Recalculate Lineset Geometry.
         if LineSet.calculate_sag = True, drag induced sag will be calculated
+        if vectorized = True, all lines are computed at once using LineSetArrays
         :return: self
         """
         # for att in self.lower_attachment_points:
@@ -184,7 +217,13 @@ class LineSet(object):
         for point in self.attachment_points:
             point.get_position()
         self.calculate_sag = calculate_sag
-        
+
+        if vectorized:
+            arrays = self.get_arrays()
+            arrays.recalc(calculate_sag=calculate_sag, iterations=iterations)
+            arrays.write()
+            return self
+
         for i in range(iterations):
             self._calc_geo()
             if self.calculate_sag:
@@ -197,35 +236,41 @@ class LineSet(object):
 
     def _calc_geo(self, start=None):
         if start is None:
-            start = self.lowest_lines
-        for line in start:
+            lines = self.topology.lines_bottom_up
+        else:
+            lines = self.topology.get_lines_bottom_up(start)
+
+        for line in lines:
             logger.debug(f"upper line: {line.number}")
             if line.upper_node.type == 1:  # no gallery line
                 lower_point = line.lower_node.vec
                 tangential = self.get_tangential_comp(line, lower_point)
                 line.upper_node.vec = lower_point + tangential * line.init_length
 
-                self._calc_geo(self.get_upper_connected_lines(line.upper_node))
-
     def _calc_sag(self, start=None):
         if start is None:
             start = self.lowest_lines
         # 0 every line calculates its parameters
-        self.mat = SagMatrix(len(self.lines))
+        # the sparsity pattern is reused as long as the topology does not change
+        self.mat = SagMatrix(len(self.lines), structure=self._sag_structure)
 
         # calculate projections
         for n in self.nodes:
             n.calc_proj_vec(self.v_inf)
 
         self.calc_forces(start)
-        for line in start:
+        for line in self.topology.get_lines_bottom_up(start):
             self._calc_matrix_entries(line)
         self.mat.solve_system()
+        self._sag_structure = self.mat.structure
         for l in self.lines:
             l.sag_par_1, l.sag_par_2 = self.mat.get_sag_parameters(l.number)
 
     # -----CALCULATE SAG-----#
     def _calc_matrix_entries(self, line):
+        """
+        insert the entries of a single line (upper lines are not included)
+        """
         up = self.get_upper_connected_lines(line.upper_node)
         if line.lower_node.type == 0:
             self.mat.insert_type_0_lower(line)
@@ -237,18 +282,14 @@ class LineSet(object):
             self.mat.insert_type_1_upper(line, up)
         else:
             self.mat.insert_type_2_upper(line)
-        for u in up:
-            self._calc_matrix_entries(u)
 
     def calc_forces(self, start_lines):
-        for line_lower in start_lines:
+        # setting the force from top to down
+        for line_lower in self.topology.get_lines_top_down(start_lines):
             upper_node = line_lower.upper_node
             vec = line_lower.diff_vector
             if line_lower.upper_node.type != 2:  # not a gallery line
-                # recursive force-calculation
-                # setting the force from top to down
                 lines_upper = self.get_upper_connected_lines(upper_node)
-                self.calc_forces(lines_upper)
 
                 force = np.zeros(3)
                 for line in lines_upper:
@@ -268,7 +309,7 @@ class LineSet(object):
                     line_lower.force = norm(force_projected)
 
     def get_upper_connected_lines(self, node):
-        return [line for line in self.lines if line.lower_node is node]
+        return list(self.topology.get_upper_connected_lines(node))
 
     def get_upper_lines(self, node):
         """
@@ -277,13 +318,10 @@ class LineSet(object):
         :return:
         """
         lines = self.get_upper_connected_lines(node)
-        for line in lines[:]:  # copy to not mess up the loop
-            lines += self.get_upper_lines(line.upper_node)
-
-        return lines
+        return self.topology.get_lines_bottom_up(lines)
 
     def get_lower_connected_lines(self, node):
-        return [line for line in self.lines if line.upper_node is node]
+        return list(self.topology.get_lower_connected_lines(node))
 
     def get_connected_lines(self, node):
         return self.get_upper_connected_lines(node) + self.get_lower_connected_lines(node)
@@ -293,23 +331,10 @@ class LineSet(object):
         Get Total drag of the lineset
         :return: Center of Pressure, Drag (1/2*cw*A*v^2)
         """
-        drag_total = 0.
-        center = np.array([0.,0.,0.])
-
-        for line in self.lines:
-            drag_total += line.drag_total
-            center += line.get_line_point(0.5) * line.drag_total
-        
-        center /= drag_total
-
-        return center, drag_total
+        return self.get_arrays().get_drag()
 
     def get_weight(self):
-        weight = 0
-        for line in self.lines:
-            weight += line.get_weight()
-
-        return weight
+        return self.get_arrays().get_weight()
 
 
     def get_normalized_drag(self):
@@ -362,27 +387,58 @@ class LineSet(object):
         if node is None:
             raise ValueError("Must either provide a node or line")
 
-        if node.type == 2:
-            return [node]
-        else:
-            upper_lines = self.get_upper_connected_lines(node)
-            result = []
-            for upper_line in upper_lines:
-                result += self.get_upper_influence_nodes(line=upper_line)
-            return result
+        return list(self.topology.get_influence_nodes(node))
 
-    def iterate_target_length(self, steps=10, pre_load=50):
+    def solve_load_cases(self, load_cases, **kwargs):
+        """
+        compute forces, sag and stretched lengths for a list of LoadCases
+        (see openglider.lines.loadcases.solve_load_cases)
+        """
+        return solve_load_cases(self, load_cases, **kwargs)
+
+    def iterate_target_length(self, steps=10, pre_load=50, tolerance=1e-6):
         """
         iterative method to satisfy the target length
+
+        The previous solution (node positions, forces) is used as start value
+        and only the subtrees of lines with a changed length are recomputed.
+        :param steps: maximum number of steps
+        :param tolerance: maximum difference of stretched and target length [m]
+        :return: [{"step": i, "residual": max. difference, "lines": number of changed lines, "time": seconds}]
         """
+        telemetry = []
+        start = time.time()
         self.recalc()
-        for i in range(steps):
-            for l in self.lines:
-                if l.target_length is not None:
-                    diff = l.get_stretched_length(pre_load) - l.target_length
-                    l.init_length -= diff
+        lines = [line for line in self.lines if line.target_length is not None]
+
+        for step in range(steps + 1):
+            diffs = [line.get_stretched_length(pre_load) - line.target_length for line in lines]
+            changed = [line for line, diff in zip(lines, diffs) if abs(diff) > tolerance]
+
+            telemetry.append({
+                "step": step,
+                "residual": max([abs(diff) for diff in diffs], default=0.),
+                "lines": len(changed),
+                "time": time.time() - start
+            })
+            logger.debug("target length step {step}: residual {residual}, lines {lines}, {time}s".format(**telemetry[-1]))
+
+            if not changed or step == steps:
+                break
+
+            start = time.time()
+            for line, diff in zip(lines, diffs):
+                if abs(diff) > tolerance:
+                    line.init_length -= diff
                     #l.init_length = l.target_length * l.init_length / l.get_stretched_length(pre_load)
-            self.recalc()
+
+            self._calc_geo(changed)
+            if self.calculate_sag:
+                self._calc_sag()
+            else:
+                self.calc_forces(self.lowest_lines)
+
+        return telemetry
 
     def _set_line_indices(self):
         for i, line in enumerate(self.lines):
@@ -431,7 +487,16 @@ class LineSet(object):
         else:
             lines = self.get_upper_connected_lines(start_node)
 
-        return [(line, self.create_tree(line.upper_node)) for line in self.sort_lines(lines)]
+        tree = []
+        todo = [(lines, tree)]
+        while todo:
+            lines, branch = todo.pop()
+            for line in self.sort_lines(lines):
+                upper = []
+                branch.append((line, upper))
+                todo.append((self.get_upper_connected_lines(line.upper_node), upper))
+
+        return tree
 
     def _get_lines_table(self, callback, start_node=None):
         line_tree = self.create_tree(start_node=start_node)
@@ -0,0 +1,147 @@
+import concurrent.futures
+import logging
+import os
+
+import numpy as np
+
+from openglider.utils.table import Table
+
+logger = logging.getLogger(__name__)
+
+
+class LoadCase(object):
+    """
+    A single load scenario for a LineSet
+    """
+    def __init__(self, v_inf, force_factor=1., init_lengths=None, name=None):
+        """
+        :param v_inf: flow velocity [m/s] (3d vector)
+        :param force_factor: scale of all attachment point forces (p.e. pilot weight ratio)
+        :param init_lengths: {line_name: length} overrides (p.e. riser lengths for the accelerator)
+        :param name: case name
+        """
+        self.v_inf = np.array(v_inf, dtype=float)
+        self.force_factor = force_factor
+        self.init_lengths = init_lengths or {}
+        self.name = name
+
+    def __repr__(self):
+        return "<LoadCase {}: v_inf={}, force_factor={}>".format(self.name, self.v_inf.tolist(), self.force_factor)
+
+    @classmethod
+    def from_glide(cls, speed, glide, **kwargs):
+        """
+        Create a LoadCase from speed [m/s] and glide ratio (see ParametricGlider.v_inf)
+        """
+        angle = np.arctan(1/glide)
+        return cls(np.array([np.cos(angle), 0, np.sin(angle)]) * speed, **kwargs)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """
+        Create LoadCases from rows of [speed, glide, force_factor]
+        """
+        return [
+            cls.from_glide(speed, glide, force_factor=force_factor, name=str(case_no))
+            for case_no, (speed, glide, force_factor) in enumerate(matrix)
+        ]
+
+
+class LoadCaseResult(object):
+    """
+    per-line results of several load cases, values are arrays of shape (n_cases, n_lines)
+    """
+    columns = ("force", "sag_par_1", "sag_par_2", "stretched_length")
+
+    def __init__(self, load_cases, line_names, results):
+        self.load_cases = load_cases
+        self.line_names = line_names
+
+        for column_no, column in enumerate(self.columns):
+            setattr(self, column, np.array([result[column_no] for result in results]).reshape(-1, len(line_names)))
+
+    def __len__(self):
+        return len(self.load_cases)
+
+    def get_table(self):
+        """
+        tidy table: one row per case and line
+        """
+        table = Table()
+        header = ("case", "line") + self.columns
+        for column_no, name in enumerate(header):
+            table[0, column_no] = name
+
+        row = 1
+        for case_no, load_case in enumerate(self.load_cases):
+            case_name = load_case.name or str(case_no)
+            for line_no, line_name in enumerate(self.line_names):
+                table[row, 0] = case_name
+                table[row, 1] = line_name
+                for column_no, column in enumerate(self.columns):
+                    table[row, column_no + 2] = float(getattr(self, column)[case_no, line_no])
+                row += 1
+
+        return table
+
+
+def _solve(arrays, state, load_case, calculate_sag, iterations, pre_load):
+    arrays.set_state(state)
+    arrays.v_inf = load_case.v_inf.copy()
+    # line forces scale linearly -> warm start
+    arrays.node_forces *= load_case.force_factor
+    arrays.forces *= load_case.force_factor
+
+    for name, length in load_case.init_lengths.items():
+        arrays.init_lengths[arrays.line_names.index(name)] = length
+
+    arrays.recalc(calculate_sag=calculate_sag, iterations=iterations)
+
+    return (
+        arrays.forces.copy(),
+        arrays.sag_par_1.copy(),
+        arrays.sag_par_2.copy(),
+        arrays.get_stretched_lengths(pre_load, sag=calculate_sag)
+    )
+
+
+def _solve_batch(arrays, state, load_cases, calculate_sag, iterations, pre_load):
+    return [_solve(arrays, state, load_case, calculate_sag, iterations, pre_load) for load_case in load_cases]
+
+
+def solve_load_cases(lineset, load_cases, calculate_sag=True, iterations=1, pre_load=50, num_workers=1):
+    """
+    Compute line forces, sag-parameters and stretched lengths for many load cases.
+
+    The topology analysis of the lineset is done once and shared by all cases,
+    the lineset itself is not modified.
+    :param lineset: LineSet (with computed geometry)
+    :param load_cases: list of LoadCase
+    :param num_workers: number of processes (1: run in this process, None: cpu count)
+    :return: LoadCaseResult
+    """
+    arrays = lineset.get_arrays()
+    state = arrays.get_state()
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(load_cases))
+
+    if num_workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(num_workers) as executor:
+            batches = [load_cases[i::num_workers] for i in range(num_workers)]
+            futures = [
+                executor.submit(_solve_batch, arrays, state, batch, calculate_sag, iterations, pre_load)
+                for batch in batches
+            ]
+            batch_results = [future.result() for future in futures]
+
+        # restore the original order
+        results = [None] * len(load_cases)
+        for worker_no, batch_result in enumerate(batch_results):
+            results[worker_no::num_workers] = batch_result
+    else:
+        results = _solve_batch(arrays, state, load_cases, calculate_sag, iterations, pre_load)
+        arrays.set_state(state)
+
+    return LoadCaseResult(load_cases, arrays.line_names, results)
@@ -0,0 +1,153 @@
+import collections
+
+from openglider.lines.elements import Line
+
+
+class LineTopology(object):
+    """
+    node -> line adjacency of a LineSet.
+
+    Built once for a list of lines and reused for all graph-queries until
+    the lines of the LineSet change.
+    """
+    def __init__(self, lines):
+        self.lines = list(lines)
+        # nodes of the lines at build time (see Line.graph_version)
+        self.graph_version = Line.graph_version
+        self.nodes = []
+        self.upper_lines = {}  # node -> lines starting at the node
+        self.lower_lines = {}  # node -> lines ending at the node
+
+        for line in self.lines:
+            for node in (line.lower_node, line.upper_node):
+                if node not in self.upper_lines:
+                    self.nodes.append(node)
+                    self.upper_lines[node] = []
+                    self.lower_lines[node] = []
+
+            self.upper_lines[line.lower_node].append(line)
+            self.lower_lines[line.upper_node].append(line)
+
+        self.lowest_lines = [line for line in self.lines if line.lower_node.type == 0]
+        # every line is listed after its lower line
+        self.lines_bottom_up = self._walk_up(self.lowest_lines)
+        # every line is listed after all of its upper lines
+        self.lines_top_down = self.lines_bottom_up[::-1]
+
+        self._influence_nodes = None
+        self._floors = None
+        self._bottom_up_order = None
+
+    def is_valid(self, lines):
+        """
+        True if lines are the same lines (with the same nodes) as the index was built for
+        """
+        # list comparison checks the identity first (Line has no __eq__)
+        return self.graph_version == Line.graph_version and lines == self.lines
+
+    def get_upper_connected_lines(self, node):
+        return self.upper_lines.get(node, [])
+
+    def get_lower_connected_lines(self, node):
+        return self.lower_lines.get(node, [])
+
+    def get_influence_nodes(self, node):
+        if node not in self.influence_nodes:
+            return [node] if node.type == 2 else []
+
+        return self.influence_nodes[node]
+
+    def get_lines_bottom_up(self, start_lines):
+        """
+        start_lines and all lines above them, every line listed after its lower line
+        (also if a start line is above another one)
+        """
+        lines = self._walk_up(start_lines)
+        order = self._bottom_up_index
+        if all(id(line) in order for line in lines):
+            lines.sort(key=lambda line: order[id(line)])
+
+        return lines
+
+    @property
+    def _bottom_up_index(self):
+        if self._bottom_up_order is None:
+            self._bottom_up_order = {id(line): index for index, line in enumerate(self.lines_bottom_up)}
+
+        return self._bottom_up_order
+
+    def _walk_up(self, start_lines):
+        """
+        breadth-first walk from start_lines to the top
+        """
+        lines = []
+        visited = set()
+        queue = collections.deque(start_lines)
+        while queue:
+            line = queue.popleft()
+            # lines hash by their (cached) attributes -> use the id
+            if id(line) in visited:
+                continue
+            visited.add(id(line))
+            lines.append(line)
+            queue.extend(self.get_upper_connected_lines(line.upper_node))
+
+        return lines
+
+    def get_lines_top_down(self, start_lines):
+        return self.get_lines_bottom_up(start_lines)[::-1]
+
+    @property
+    def influence_nodes(self):
+        """
+        node -> uppermost nodes (type 2) connected to the node
+        """
+        if self._influence_nodes is None:
+            influence_nodes = {}
+            for node in self._nodes_top_down():
+                if node.type == 2:
+                    influence_nodes[node] = [node]
+                else:
+                    result = []
+                    for line in self.get_upper_connected_lines(node):
+                        result += influence_nodes[line.upper_node]
+                    influence_nodes[node] = result
+
+            self._influence_nodes = influence_nodes
+
+        return self._influence_nodes
+
+    @property
+    def floors(self):
+        """
+        node -> number of line-levels above the node
+        """
+        if self._floors is None:
+            floors = {}
+            for node in self._nodes_top_down():
+                if node.type == 2:
+                    floors[node] = 0
+                else:
+                    upper_lines = self.get_upper_connected_lines(node)
+                    floors[node] = max([floors[line.upper_node] for line in upper_lines]) + 1
+
+            self._floors = floors
+
+        return self._floors
+
+    def _nodes_top_down(self):
+        """
+        all nodes, every node listed after all the nodes above it
+        """
+        remaining = {node: len(self.get_upper_connected_lines(node)) for node in self.nodes}
+        queue = collections.deque(node for node in self.nodes if remaining[node] == 0)
+        nodes = []
+        while queue:
+            node = queue.popleft()
+            nodes.append(node)
+            for line in self.get_lower_connected_lines(node):
+                remaining[line.lower_node] -= 1
+                if remaining[line.lower_node] == 0:
+                    queue.append(line.lower_node)
+
+        return nodes
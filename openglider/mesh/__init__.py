@@ -1,2 +1,3 @@
 from openglider.mesh.mesh import Mesh, Vertex, Polygon
 from openglider.mesh.group import MeshGroup
+from openglider.mesh.arrays import MeshArrays
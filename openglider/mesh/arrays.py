@@ -0,0 +1,435 @@
+import copy
+import logging
+import numbers
+
+import numpy as np
+
+from openglider.mesh import export
+from openglider.mesh.mesh import Mesh, Polygon, Vertex, find_duplicates
+
+logger = logging.getLogger(__name__)
+
+
+def _get_attribute_columns(attribute_dicts):
+    """
+    list of attribute-dicts -> {name: column}
+    numeric attributes are stored as float arrays (missing: nan), others as object arrays (missing: None)
+    """
+    keys = []
+    for attributes in attribute_dicts:
+        for key in attributes:
+            if key not in keys:
+                keys.append(key)
+
+    columns = {}
+    for key in keys:
+        values = [attributes.get(key, None) for attributes in attribute_dicts]
+        if all(value is None or isinstance(value, numbers.Real) for value in values):
+            columns[key] = np.array([np.nan if value is None else value for value in values], dtype=float)
+        else:
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            columns[key] = column
+
+    return columns
+
+
+def _get_attribute_dicts(columns, length):
+    attribute_dicts = [{} for _ in range(length)]
+    for key, column in columns.items():
+        for attributes, value in zip(attribute_dicts, column):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            attributes[key] = value.item() if isinstance(value, np.generic) else value
+
+    return attribute_dicts
+
+
+def _join_columns(columns_list, lengths):
+    """
+    concatenate attribute columns of several meshes, filling missing columns
+    """
+    keys = []
+    for columns in columns_list:
+        for key in columns:
+            if key not in keys:
+                keys.append(key)
+
+    joined = {}
+    for key in keys:
+        parts = []
+        for columns, length in zip(columns_list, lengths):
+            if key in columns:
+                parts.append(columns[key])
+            else:
+                parts.append(np.full(length, np.nan))
+
+        if any(part.dtype == object for part in parts):
+            parts = [part.astype(object) for part in parts]
+            for part in parts:
+                part[[isinstance(value, float) and np.isnan(value) for value in part]] = None
+
+        joined[key] = np.concatenate(parts) if parts else np.array([])
+
+    return joined
+
+
+class MeshArrays(object):
+    """
+    Array-backed Mesh: contiguous buffers instead of Vertex/Polygon objects.
+
+        vertices: (num_vertices, 3) float64
+        indices: int32, node indices of all faces (concatenated)
+        offsets: int32, face i has the nodes indices[offsets[i]:offsets[i+1]]
+        groups: {name: (first_face, last_face + 1)}, faces of a group are contiguous
+        boundaries: {name: int32 vertex indices}
+        vertex_attributes / face_attributes: {name: column}
+    """
+    def __init__(self, vertices=None, indices=None, offsets=None, groups=None, boundaries=None,
+                 vertex_attributes=None, face_attributes=None, name=None):
+        if vertices is None:
+            vertices = np.zeros((0, 3))
+        if indices is None:
+            indices = np.zeros(0, dtype=np.int32)
+        if offsets is None:
+            offsets = np.zeros(1, dtype=np.int32)
+
+        self.vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+        self.groups = groups or {}
+        self.boundaries = boundaries or {}
+        self.vertex_attributes = vertex_attributes or {}
+        self.face_attributes = face_attributes or {}
+        self.name = name or "unnamed"
+
+    def __repr__(self):
+        return "MeshArrays {} ({} faces, {} vertices)".format(self.name, self.num_faces, self.num_vertices)
+
+    @property
+    def num_vertices(self):
+        return len(self.vertices)
+
+    @property
+    def num_faces(self):
+        return len(self.offsets) - 1
+
+    @property
+    def face_sizes(self):
+        return np.diff(self.offsets)
+
+    @property
+    def bounding_box(self):
+        return self.vertices.min(axis=0), self.vertices.max(axis=0)
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    @classmethod
+    def from_indexed(cls, vertices, polygons, boundaries=None, name=None, node_attributes=None):
+        """
+        Create from the same input as Mesh.from_indexed.
+        float64 vertex-arrays and int32 (num_faces, n)-arrays for the polygon groups are used without copying.
+        """
+        groups = {}
+        indices = []
+        sizes = []
+        face_attributes = []
+        num_faces = 0
+
+        for group_name, faces in polygons.items():
+            if isinstance(faces, np.ndarray) and faces.ndim == 2:
+                indices.append(faces.reshape(-1))
+                sizes.append(np.full(len(faces), faces.shape[1], dtype=np.int32))
+                face_attributes += [{}] * len(faces)
+            else:
+                indices.append(np.array([node for face in faces for node in face], dtype=np.int32))
+                sizes.append(np.array([len(face) for face in faces], dtype=np.int32))
+                face_attributes += [getattr(face, "attributes", {}) for face in faces]
+
+            groups[group_name] = (num_faces, num_faces + len(faces))
+            num_faces += len(faces)
+
+        if len(indices) == 1:
+            indices = np.asarray(indices[0], dtype=np.int32)
+        elif indices:
+            indices = np.concatenate(indices).astype(np.int32, copy=False)
+        else:
+            indices = None
+
+        offsets = np.zeros(num_faces + 1, dtype=np.int32)
+        if sizes:
+            np.cumsum(np.concatenate(sizes), out=offsets[1:])
+
+        boundaries = {
+            boundary_name: np.asarray(boundary, dtype=np.int32)
+            for boundary_name, boundary in (boundaries or {}).items()
+        }
+
+        vertex_attributes = {}
+        if node_attributes is not None:
+            vertex_attributes = _get_attribute_columns(list(node_attributes))
+
+        return cls(vertices, indices, offsets, groups, boundaries,
+                   vertex_attributes, _get_attribute_columns(face_attributes), name)
+
+    def get_faces(self, group_name):
+        """
+        faces of a group: (num_faces, n)-array (a view) if all faces have n nodes, else a list of arrays
+        """
+        start, stop = self.groups[group_name]
+        first, last = self.offsets[start], self.offsets[stop]
+        sizes = self.face_sizes[start:stop]
+
+        if len(sizes) and np.all(sizes == sizes[0]):
+            return self.indices[first:last].reshape(-1, sizes[0])
+
+        return np.split(self.indices[first:last], self.offsets[start+1:stop] - first)
+
+    def get_indexed(self):
+        """
+        Get [vertices, polygons, boundaries] with references by index (arrays, no copies)
+        """
+        polygons = {group_name: self.get_faces(group_name) for group_name in self.groups}
+
+        return self.vertices, polygons, self.boundaries
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        vertices, polygons, boundaries = mesh.get_indexed()
+        node_attributes = [vertex.attributes for vertex in vertices]
+        if not any(node_attributes):
+            node_attributes = None
+
+        return cls.from_indexed([list(vertex) for vertex in vertices], polygons, boundaries,
+                                name=mesh.name, node_attributes=node_attributes)
+
+    def get_mesh(self):
+        """
+        Convert to a (object-based) Mesh
+        """
+        vertices, polygons, boundaries = self.get_indexed()
+        face_attributes = _get_attribute_dicts(self.face_attributes, self.num_faces)
+
+        polygons_new = {}
+        for group_name, faces in polygons.items():
+            start, _ = self.groups[group_name]
+            polygons_new[group_name] = [
+                Polygon(face.tolist(), attributes=face_attributes[start + i])
+                for i, face in enumerate(faces)
+            ]
+
+        node_attributes = None
+        if self.vertex_attributes:
+            node_attributes = _get_attribute_dicts(self.vertex_attributes, self.num_vertices)
+
+        boundaries = {name: boundary.tolist() for name, boundary in boundaries.items()}
+
+        return Mesh.from_indexed(vertices.tolist(), polygons_new, boundaries, self.name, node_attributes)
+
+    @classmethod
+    def join(cls, meshes, name=None):
+        """
+        Concatenate meshes (one copy of all buffers); faces are grouped by name,
+        indices are offset by the number of preceding vertices.
+        """
+        meshes = list(meshes)
+        if not meshes:
+            return cls(name=name)
+
+        vertex_offsets = np.cumsum([0] + [mesh.num_vertices for mesh in meshes])
+
+        group_names = []
+        for mesh in meshes:
+            for group_name in mesh.groups:
+                if group_name not in group_names:
+                    group_names.append(group_name)
+
+        indices = []
+        sizes = []
+        face_order = []
+        groups = {}
+        num_faces = 0
+        face_offsets = np.cumsum([0] + [mesh.num_faces for mesh in meshes])
+
+        for group_name in group_names:
+            group_start = num_faces
+            for mesh_no, mesh in enumerate(meshes):
+                if group_name not in mesh.groups:
+                    continue
+                start, stop = mesh.groups[group_name]
+                first, last = mesh.offsets[start], mesh.offsets[stop]
+                indices.append(mesh.indices[first:last] + vertex_offsets[mesh_no])
+                sizes.append(np.diff(mesh.offsets[start:stop+1]))
+                face_order.append(np.arange(start, stop) + face_offsets[mesh_no])
+                num_faces += stop - start
+
+            groups[group_name] = (group_start, num_faces)
+
+        offsets = np.zeros(num_faces + 1, dtype=np.int32)
+        if sizes:
+            np.cumsum(np.concatenate(sizes), out=offsets[1:])
+        indices = np.concatenate(indices).astype(np.int32) if indices else None
+
+        boundaries = {}
+        for mesh_no, mesh in enumerate(meshes):
+            for boundary_name, boundary in mesh.boundaries.items():
+                boundaries.setdefault(boundary_name, [])
+                boundaries[boundary_name].append(boundary + vertex_offsets[mesh_no])
+        boundaries = {
+            boundary_name: np.concatenate(parts).astype(np.int32)
+            for boundary_name, parts in boundaries.items()
+        }
+
+        vertex_attributes = _join_columns([mesh.vertex_attributes for mesh in meshes],
+                                          [mesh.num_vertices for mesh in meshes])
+        face_attributes = _join_columns([mesh.face_attributes for mesh in meshes],
+                                        [mesh.num_faces for mesh in meshes])
+        if face_order:
+            face_order = np.concatenate(face_order)
+            face_attributes = {key: column[face_order] for key, column in face_attributes.items()}
+
+        vertices = np.concatenate([mesh.vertices for mesh in meshes])
+
+        return cls(vertices, indices, offsets, groups, boundaries, vertex_attributes, face_attributes,
+                   name or meshes[0].name)
+
+    def __iadd__(self, other):
+        joined = self.join([self, other], name=self.name)
+        self.__dict__.update(joined.__dict__)
+        return self
+
+    def __add__(self, other):
+        return self.join([self, other], name=self.name)
+
+    def mirror(self, axis="x"):
+        self.vertices[:, "xyz".index(axis)] *= -1
+
+        # reverse the node order of every face
+        sizes = self.face_sizes
+        face_no = np.repeat(np.arange(self.num_faces), sizes)
+        positions = np.arange(len(self.indices))
+        self.indices = self.indices[self.offsets[face_no] + self.offsets[face_no + 1] - 1 - positions]
+
+        return self
+
+    def triangularize(self):
+        """
+        Make triangles from quads ([0, 1, 2], [2, 3, 0])
+        """
+        sizes = self.face_sizes
+        quad = sizes == 4
+        nodes_per_face = np.where(quad, 6, sizes)
+
+        face_no = np.repeat(np.arange(self.num_faces), nodes_per_face)
+        local = np.arange(nodes_per_face.sum()) - np.repeat(np.cumsum(nodes_per_face) - nodes_per_face, nodes_per_face)
+        quad_pattern = np.array([0, 1, 2, 2, 3, 0])
+        local = np.where(quad[face_no], quad_pattern[np.minimum(local, 5)], local)
+        indices = self.indices[self.offsets[face_no] + local]
+
+        faces_count = np.where(quad, 2, 1)
+        new_sizes = np.repeat(np.where(quad, 3, sizes), faces_count)
+        offsets = np.zeros(len(new_sizes) + 1, dtype=np.int32)
+        np.cumsum(new_sizes, out=offsets[1:])
+
+        face_starts = np.concatenate([[0], np.cumsum(faces_count)])
+        groups = {
+            group_name: (int(face_starts[start]), int(face_starts[stop]))
+            for group_name, (start, stop) in self.groups.items()
+        }
+        face_attributes = {
+            key: np.repeat(column, faces_count) for key, column in self.face_attributes.items()
+        }
+
+        return self.__class__(self.vertices.copy(), indices, offsets, groups, copy.deepcopy(self.boundaries),
+                              copy.deepcopy(self.vertex_attributes), face_attributes, self.name)
+
+    def weld(self, boundaries=None, tolerance=None):
+        """
+        Merge vertices of the boundary groups that are closer than tolerance (default: Vertex.dmin),
+        duplicated vertices are removed from the buffer.
+        :param boundaries: list of boundary names to be joined (None->all)
+        :return: {boundary_name: number of merged vertices}
+        """
+        if tolerance is None:
+            tolerance = Vertex.dmin
+        if boundaries is None:
+            boundaries = list(self.boundaries)
+
+        candidates = [self.boundaries[name] for name in boundaries]
+        if candidates:
+            candidates = np.concatenate(candidates)
+            _, first = np.unique(candidates, return_index=True)
+            candidates = candidates[np.sort(first)]
+        else:
+            candidates = np.zeros(0, dtype=np.int32)
+
+        replacement = np.arange(self.num_vertices)
+        replacement[candidates] = candidates[find_duplicates(self.vertices[candidates], tolerance)]
+        is_duplicate = replacement != np.arange(self.num_vertices)
+
+        # merge attributes (the replacement takes the values of its duplicates)
+        for column in self.vertex_attributes.values():
+            for duplicate in np.flatnonzero(is_duplicate):
+                value = column[duplicate]
+                if not (value is None or (isinstance(value, float) and np.isnan(value))):
+                    column[replacement[duplicate]] = value
+
+        keep = ~is_duplicate
+        new_index = np.cumsum(keep) - 1
+        index_map = new_index[replacement].astype(np.int32)
+
+        merged = {}
+        for boundary_name, boundary in self.boundaries.items():
+            boundary_keep = keep[boundary]
+            merged[boundary_name] = int(len(boundary) - boundary_keep.sum())
+            self.boundaries[boundary_name] = index_map[boundary[boundary_keep]]
+            if merged[boundary_name]:
+                logger.info(f"deleted {merged[boundary_name]} duplicated Vertices for boundary group <{boundary_name}> ")
+
+        self.indices = index_map[self.indices]
+        self.vertices = self.vertices[keep]
+        self.vertex_attributes = {key: column[keep] for key, column in self.vertex_attributes.items()}
+
+        return merged
+
+    def delete_duplicates(self, boundaries=None):
+        """
+        :param boundaries: list of boundary names to be joined (None->all)
+        :return: MeshArrays (self)
+        """
+        self.weld(boundaries)
+        return self
+
+    def delete_unused_vertices(self):
+        """
+        Remove vertices that are not part of any face (also from the boundaries)
+        :return: number of removed vertices
+        """
+        keep = np.bincount(self.indices, minlength=self.num_vertices) > 0
+        index_map = (np.cumsum(keep) - 1).astype(np.int32)
+
+        for boundary_name, boundary in self.boundaries.items():
+            self.boundaries[boundary_name] = index_map[boundary[keep[boundary]]]
+
+        self.indices = index_map[self.indices]
+        self.vertices = self.vertices[keep]
+        self.vertex_attributes = {key: column[keep] for key, column in self.vertex_attributes.items()}
+
+        return int(len(keep) - keep.sum())
+
+    def export_obj(self, path=None, offset=0):
+        if path:
+            return export.export_obj(self, path, offset=offset)
+        else:
+            return "".join(export.iter_obj(self, offset=offset))
+
+    def export_ply(self, path, binary=False):
+        return export.export_ply(self, path, binary=binary)
+
+    def export_stl(self, path):
+        return export.export_stl(self, path)
+
+    def round(self, places):
+        np.round(self.vertices, places, out=self.vertices)
+        return self
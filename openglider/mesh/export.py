@@ -0,0 +1,208 @@
+"""
+Streaming mesh exporters: vertex- and face-blocks are formatted/packed from arrays
+in chunks and written through a buffered file, one mesh at a time.
+"""
+import itertools
+import logging
+import re
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2**14  # rows per formatted/packed block
+BUFFER_SIZE = 2**20
+
+
+def parse_color_code(string):
+    rex = re.compile(r".*#([0-9a-zA-Z]{6})")
+    color = [255, 255, 255]
+    match = rex.match(string)
+    if match:
+        color_str = match.group(1)
+        color[0] = int(color_str[:2], 16)
+        color[1] = int(color_str[2:4], 16)
+        color[2] = int(color_str[4:], 16)
+
+    return color
+
+
+def get_indexed(mesh):
+    """
+    vertices ((n, 3)-array) and polygons ({name: faces}) of a Mesh or MeshArrays
+    """
+    vertices, polygons, _ = mesh.get_indexed()
+    if not isinstance(vertices, np.ndarray):
+        vertices = np.array([list(vertex) for vertex in vertices], dtype=float).reshape(-1, 3)
+        polygons = {name: [list(face) for face in faces] for name, faces in polygons.items()}
+
+    return vertices, polygons
+
+
+def iter_face_blocks(faces):
+    """
+    split faces into (m, n)-arrays of consecutive faces with the same number of nodes
+    """
+    if isinstance(faces, np.ndarray) and faces.ndim == 2:
+        if len(faces):
+            yield faces
+        return
+
+    for _, block in itertools.groupby(faces, len):
+        yield np.array(list(block), dtype=np.int64)
+
+
+def _format_rows(row_format, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        block = rows[start:start+CHUNK_SIZE]
+        yield (row_format * len(block)) % tuple(block.ravel().tolist())
+
+
+def _as_list(meshes):
+    if hasattr(meshes, "get_indexed"):
+        return [meshes]
+    return meshes
+
+
+def iter_obj(meshes, offset=0, floatnum=6):
+    """
+    Generator of obj-text chunks for one or many meshes (p.e. a generator, one mesh at a time).
+    The vertex indices of every mesh are offset by the vertices of the preceding ones.
+    """
+    vertex_format = "v {0} {0} {0}\n".format("%.{}f".format(floatnum))
+
+    for mesh in _as_list(meshes):
+        vertices, polygons = get_indexed(mesh)
+
+        yield from _format_rows(vertex_format, vertices)
+
+        for polygon_group_name, faces in polygons.items():
+            yield "o {}\n".format(polygon_group_name)
+            for block in iter_face_blocks(faces):
+                # line or face
+                code = "l" if block.shape[1] == 2 else "f"
+                row_format = " ".join([code] + ["%d"] * block.shape[1]) + "\n"
+                yield from _format_rows(row_format, block + (offset + 1))
+
+        offset += len(vertices)
+
+
+def export_obj(meshes, path, offset=0, floatnum=6):
+    with open(path, "w", buffering=BUFFER_SIZE) as outfile:
+        for chunk in iter_obj(meshes, offset=offset, floatnum=floatnum):
+            outfile.write(chunk)
+
+    return path
+
+
+def export_ply(mesh, path, binary=False):
+    """
+    Export a mesh as ply (faces with more than 2 nodes), binary: with face colors from the group names
+    """
+    vertices, polygons = get_indexed(mesh)
+    faces = {
+        name: [block for block in iter_face_blocks(group) if block.shape[1] > 2]
+        for name, group in polygons.items()
+    }
+    num_faces = sum(len(block) for blocks in faces.values() for block in blocks)
+
+    header = [
+        "ply",
+        "format {} 1.0".format("binary_little_endian" if binary else "ascii"),
+        "comment exported using openglider",
+        "element vertex {}".format(len(vertices))
+    ]
+    header += ["property float32 {}".format(coord) for coord in ("x", "y", "z")]
+    header += [
+        "element face {}".format(num_faces),
+        "property list uchar uint vertex_indices"
+    ]
+    if binary:
+        header += ["property uchar {}".format(color) for color in ("red", "green", "blue")]
+    header.append("end_header\n")
+
+    if not binary:
+        with open(path, "w", buffering=BUFFER_SIZE) as outfile:
+            outfile.write("\n".join(header))
+            outfile.writelines(_format_rows("%.6f %.6f %.6f\n", vertices))
+
+            for polygon_group_name in polygons:
+                color_str = " {} {} {} 1".format(*parse_color_code(polygon_group_name))
+                outfile.write(" ".join([color_str]*3) + "\n")
+
+            for i, group_faces in enumerate(faces.values()):
+                for block in group_faces:
+                    row_format = " ".join(["%d"] * (block.shape[1] + 1) + [str(i)]) + "\n"
+                    rows = np.hstack([np.full((len(block), 1), block.shape[1]), block])
+                    outfile.writelines(_format_rows(row_format, rows))
+
+        return path
+
+    with open(path, "wb", buffering=BUFFER_SIZE) as outfile:
+        outfile.write("\n".join(header).encode("ascii"))
+
+        for start in range(0, len(vertices), CHUNK_SIZE):
+            outfile.write(vertices[start:start+CHUNK_SIZE].astype("<f4").tobytes())
+
+        for polygon_group_name, group_faces in faces.items():
+            color = parse_color_code(polygon_group_name)
+            for block in group_faces:
+                dtype = np.dtype([("count", "u1"), ("indices", "<u4", (block.shape[1], )), ("color", "u1", (3, ))])
+                for start in range(0, len(block), CHUNK_SIZE):
+                    part = block[start:start+CHUNK_SIZE]
+                    data = np.empty(len(part), dtype=dtype)
+                    data["count"] = block.shape[1]
+                    data["indices"] = part
+                    data["color"] = color
+                    outfile.write(data.tobytes())
+
+    return path
+
+
+def get_triangles(block):
+    """
+    (m, n)-faces -> (m*(n-2), 3) triangles (fan), quads: [0, 1, 2], [2, 3, 0]
+    """
+    num_nodes = block.shape[1]
+    if num_nodes < 3:
+        return np.zeros((0, 3), dtype=block.dtype)
+    if num_nodes == 4:
+        return np.concatenate([block[:, [0, 1, 2]], block[:, [2, 3, 0]]])
+
+    return np.concatenate([block[:, [0, i, i+1]] for i in range(1, num_nodes - 1)])
+
+
+_stl_dtype = np.dtype([("normal", "<f4", (3, )), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+
+
+def export_stl(meshes, path):
+    """
+    Export one or many meshes (p.e. a generator) as binary stl (triangles only, lines are skipped)
+    """
+    num_triangles = 0
+
+    with open(path, "wb", buffering=BUFFER_SIZE) as outfile:
+        outfile.write(b"exported using openglider".ljust(80, b" "))
+        outfile.write(np.uint32(0).tobytes())  # number of triangles (set at the end)
+
+        for mesh in _as_list(meshes):
+            vertices, polygons = get_indexed(mesh)
+            for faces in polygons.values():
+                for block in iter_face_blocks(faces):
+                    triangles = get_triangles(block)
+                    for start in range(0, len(triangles), CHUNK_SIZE):
+                        points = vertices[triangles[start:start+CHUNK_SIZE]]
+                        normals = np.cross(points[:, 1] - points[:, 0], points[:, 2] - points[:, 0])
+                        lengths = np.linalg.norm(normals, axis=1)
+                        normals[lengths > 0] /= lengths[lengths > 0][:, np.newaxis]
+
+                        data = np.zeros(len(points), dtype=_stl_dtype)
+                        data["normal"] = normals
+                        data["vertices"] = points
+                        outfile.write(data.tobytes())
+                        num_triangles += len(points)
+
+        outfile.seek(80)
+        outfile.write(np.uint32(num_triangles).tobytes())
+
+    return path
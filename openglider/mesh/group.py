@@ -1,4 +1,5 @@
 from openglider.mesh import Mesh
+from openglider.mesh.export import export_obj, iter_obj
 
 
 class MeshGroup(object):
@@ -39,14 +40,11 @@ class MeshGroup(object):
         return mesh
 
     def export_obj(self, filepath=None):
-        offset = 0
-        out = ""
-        for obj in self.objects:
-            out += obj.export_obj(offset=offset)
-            offset += len(obj.vertices)
-
+        """
+        Export all objects as obj, streamed object by object to filepath (returns filepath)
+        or returned as a string if no filepath is given
+        """
         if filepath is not None:
-            with open(filepath, "w") as outfile:
-                outfile.write(out)
+            return export_obj(self.objects, filepath)
 
-        return out
+        return "".join(iter_obj(self.objects))
@@ -4,6 +4,8 @@ import copy
 import logging
 
 import numpy as np
+import scipy.spatial
+
 import openglider.vector as vector
 USE_POLY_TRI = False
 logger = logging.getLogger(__name__)
@@ -166,26 +168,11 @@ class Mesh(object):
 
     @property
     def bounding_box(self):
-        vertices = np.array(self.vertices)
+        vertices = np.array([list(vertex) for vertex in self.vertices])
         upper = np.max(vertices, 0)
         lower = np.min(vertices, 0)
         return lower, upper
 
-    def create_subspaces(self, num_subspaces=None):
-        dmin = 10**-10
-        lower, upper = self.bounding_box
-        num_subspaces = num_subspaces or 5
-        space = np.linspcae(lower, upper, num_subspaces)
-        x0, y0, z0 = space[0]
-        subspaces = []
-        for i, x1 in enumerate(space.T[0,1:]):
-            for j, y1 in enumerate(space.T[1,1:]):
-                for k, z1 in enumerate(space.T[2,1:]):
-                    s = [[x0 - dmin, y0 - dmin, z0 - dmin],
-                         [x1 + dmin, y0 + dmin, z0 + dmin]]
-                    subspaces.append(s)
-        return subspaces
-
     @property
     def all_polygons(self):
         return sum(self.polygons.values(), [])
@@ -255,6 +242,13 @@ class Mesh(object):
 
         return cls(polys, boundaries_new, name)
 
+    def get_arrays(self):
+        """
+        Get an array-backed copy of the mesh (MeshArrays)
+        """
+        from openglider.mesh.arrays import MeshArrays
+        return MeshArrays.from_mesh(self)
+
     def __repr__(self):
         return "Mesh {} ({} faces, {} vertices)".format(self.name,
                                            len(self.all_polygons),
@@ -297,45 +291,19 @@ class Mesh(object):
     __from_json__ = from_indexed
 
     def export_obj(self, path=None, offset=0):
-        vertices, polygons, boundaries = self.get_indexed()
-        out = ""
-
-        for vertex in vertices:
-            out += "v {:.6f} {:.6f} {:.6f}\n".format(*vertex)
-
-        for polygon_group_name, polygons in polygons.items():
-            out += "o {}\n".format(polygon_group_name)
-            for obj in polygons:
-                if len(obj) == 2:
-                    # line
-                    code = "l"
-                else:
-                    # face
-                    code = "f"
-
-                out += " ".join([code] + [str(x+offset+1) for x in obj])
-                out += "\n"
-
+        """
+        Export as obj (streamed to path, or returned as a string if no path is given)
+        """
+        from openglider.mesh.export import export_obj, iter_obj
         if path:
-            with open(path, "w") as outfile:
-                outfile.write(out)
-            return path
+            return export_obj(self, path, offset=offset)
         else:
-            return out
+            return "".join(iter_obj(self, offset=offset))
 
     @staticmethod
     def parse_color_code(string):
-        import re
-        rex = re.compile(r".*#([0-9a-zA-Z]{6})")
-        color = [255, 255, 255]
-        match = rex.match(string)
-        if match:
-            color_str = match.group(1)
-            color[0] = int(color_str[:2], 16)
-            color[1] = int(color_str[2:4], 16)
-            color[2] = int(color_str[4:], 16)
-
-        return color
+        from openglider.mesh.export import parse_color_code
+        return parse_color_code(string)
 
     def export_dxf(self, path=None, version="AC1021"):
         import ezdxf
@@ -369,65 +337,13 @@ class Mesh(object):
             dwg.saveas(path)
         return dwg
 
-    def export_ply(self, path):
-        vertices, polygons, boundaries = self.get_indexed()
-
-        material_lines = []
-        panels_lines = []
-
-        for i, polygon_group_name in enumerate(polygons):
-            color = self.parse_color_code(polygon_group_name)
-
-            color_str = " {} {} {} 1".format(*color)
-
-            material_lines.append(" ".join([color_str]*3))
-
-            for obj in polygons[polygon_group_name]:
-                if len(obj) > 2:
-                    out_str = str(len(obj))
-                    for x in obj:
-                        out_str += " {}".format(x)
-                    out_str += " {}".format(i)
-                    panels_lines.append(out_str)
-
-        with open(path, "w") as outfile:
-            outfile.write("ply\n")
-            outfile.write("format ascii 1.0\n")
-            outfile.write("comment exported using openglider\n")
-
-            outfile.write("element vertex {}\n".format(len(vertices)))
-            for coord in ("x", "y", "z"):
-                outfile.write("property float32 {}\n".format(coord))
-
-
-            # outfile.write("element material {}\n".format(len(material_lines)))
-            # outfile.write("property ambient_red uchar\n")
-            # outfile.write("property ambient_green uchar\n")
-            # outfile.write("property ambient_blue uchar\n")
-            # outfile.write("property ambient_coeff float\n")
-            # outfile.write("property diffuse_red uchar\n")
-            # outfile.write("property diffuse_green uchar\n")
-            # outfile.write("property diffuse_blue uchar\n")
-            # outfile.write("property diffuce_coeff float\n")
-            # outfile.write("property specular_red uchar\n")
-            # outfile.write("property specular_green uchar\n")
-            # outfile.write("property specular_blue uchar\n")
-            # outfile.write("property specular_coeff float\n")
-
-            outfile.write("element face {}\n".format(len(panels_lines)))
-            outfile.write("property list uchar uint vertex_indices\n")
-            #outfile.write("property material_index int\n")
-
-            outfile.write("end_header\n")
+    def export_ply(self, path, binary=False):
+        from openglider.mesh.export import export_ply
+        return export_ply(self, path, binary=binary)
 
-            for vertex in vertices:
-                outfile.write("{:.6f} {:.6f} {:.6f}\n".format(*vertex))
-
-            for material_line in material_lines:
-                outfile.write(material_line + "\n")
-
-            for panel_line in panels_lines:
-                outfile.write(panel_line + "\n")
+    def export_stl(self, path):
+        from openglider.mesh.export import export_stl
+        return export_stl(self, path)
 
     def export_collada(self):
         # not yet working
@@ -485,31 +401,36 @@ class Mesh(object):
     # def __iadd__(self, other):
     #     self = self + other
     @staticmethod
-    def _find_duplicates(nodes):
-        duplicates = {}
-        for i, node1 in enumerate(nodes[:-1]):
-            if node1 not in duplicates:
-                for j, node2 in enumerate(nodes[i:]):
-                    if node1 is not node2 and node1.is_equal(node2):
-                        duplicates[node2] = node1
-        
-        return duplicates
+    def _find_duplicates(nodes, tolerance=None):
+        """
+        {duplicate: replacement} for nodes within tolerance (every coordinate) of an earlier node
+        """
+        unique_nodes = list({id(node): node for node in nodes}.values())
+        if tolerance is None:
+            tolerance = Vertex.dmin
 
-    def delete_duplicates(self, boundaries=None):
+        replacement = find_duplicates([list(node) for node in unique_nodes], tolerance)
+
+        return {
+            unique_nodes[i]: unique_nodes[replacement[i]]
+            for i in np.flatnonzero(replacement != np.arange(len(unique_nodes)))
+        }
+
+    def weld(self, boundaries=None, tolerance=None):
         """
+        Merge vertices of the boundary groups that are closer than tolerance (default: Vertex.dmin)
         :param boundaries: list of boundary names to be joined (None->all)
-        :return: Mesh (self)
+        :return: {boundary_name: number of merged vertices}
         """
-
         boundaries = boundaries or self.boundary_nodes.keys()
-        replace_dict = {}
         all_boundary_nodes = sum([self.boundary_nodes[name] for name in boundaries], [])
 
-        replace_dict = self._find_duplicates(all_boundary_nodes)
+        replace_dict = self._find_duplicates(all_boundary_nodes, tolerance)
 
         for node, replacement in replace_dict.items():
             replacement.attributes.update(node.attributes)
 
+        merged = {}
         for boundary_name, boundary_nodes in self.boundary_nodes.items():
             to_remove = []
             for i, node in enumerate(boundary_nodes):
@@ -518,6 +439,7 @@ class Mesh(object):
             for i in to_remove[::-1]:
                 boundary_nodes.pop(i)
 
+            merged[boundary_name] = len(to_remove)
             if to_remove:
                 count = len(to_remove)
                 logger.info(f"deleted {count} duplicated Vertices for boundary group <{boundary_name}> ")
@@ -541,6 +463,15 @@ class Mesh(object):
             for i, node in enumerate(self.boundary_nodes[boundary_name]):
                 if node not in vertices:
                     logger.warning(f"uiuiui, {node} in replace dict is not in vertices")
+
+        return merged
+
+    def delete_duplicates(self, boundaries=None):
+        """
+        :param boundaries: list of boundary names to be joined (None->all)
+        :return: Mesh (self)
+        """
+        self.weld(boundaries)
         return self
 
     def polygon_size(self):
@@ -575,6 +506,30 @@ class Mesh(object):
         return size_min, size_max, sum/count
 
 
+def find_duplicates(points, tolerance):
+    """
+    Find points within tolerance (in every coordinate) of an earlier point (kd-tree neighbour search).
+    Like a pairwise comparison in order: every point which is not a duplicate itself
+    replaces all following points in its range.
+    :return: array of replacement indices (the index itself for unique points)
+    """
+    points = np.asarray(points, dtype=float).reshape(len(points), -1)
+    replacement = np.arange(len(points))
+    if len(points) < 2:
+        return replacement
+
+    pairs = scipy.spatial.cKDTree(points).query_pairs(tolerance, p=np.inf, output_type="ndarray")
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    is_duplicate = np.zeros(len(points), dtype=bool)
+    for i, j in pairs:
+        if not is_duplicate[i]:
+            replacement[j] = i
+            is_duplicate[j] = True
+
+    return replacement
+
+
 def apply_z(vertices):
     v = vertices.T
     return np.array([v[0], np.zeros(len(v[0]), v[1])]).T
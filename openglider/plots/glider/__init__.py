@@ -1,10 +1,16 @@
 import collections
+import concurrent.futures
+import logging
 
-from openglider.vector.drawing import Layout
+from openglider.glider.glider import Glider
+from openglider.vector.drawing import Layout, PlotPart
+from openglider.plots.store import PatternStore, get_dependency_hash
 from openglider.plots.glider.cell import CellPlotMaker
 from openglider.plots.glider.ribs import RibPlot, SingleSkinRibPlot
 from openglider.plots.glider.config import PatternConfig, OtherPatternConfig
 
+logger = logging.getLogger(__name__)
+
 
 class PlotMaker(object):
     CellPlotMaker = CellPlotMaker
@@ -55,10 +61,14 @@ class PlotMaker(object):
 
         for cell in self.glider_3d.cells:
             pm = self._get_cellplotmaker(cell)
-            lower = pm.get_panels_lower()
-            upper = pm.get_panels_upper()
-            panels_lower.append(Layout.stack_column(lower, self.config.patterns_align_dist_y))
-            panels_upper.append(Layout.stack_column(upper, self.config.patterns_align_dist_y))
+            panels_lower.append(pm.get_panels_lower())
+            panels_upper.append(pm.get_panels_upper())
+
+        return self._stack_panels(panels_lower, panels_upper)
+
+    def _stack_panels(self, panels_lower, panels_upper):
+        panels_lower = [Layout.stack_column(lower, self.config.patterns_align_dist_y) for lower in panels_lower]
+        panels_upper = [Layout.stack_column(upper, self.config.patterns_align_dist_y) for upper in panels_upper]
 
         if self.config.layout_seperate_panels:
             layout_lower = Layout.stack_row(panels_lower, self.config.patterns_align_dist_x)
@@ -73,18 +83,12 @@ class PlotMaker(object):
         return self.panels
 
     def get_ribs(self, rotate=False):
-        from openglider.glider.rib.rib import SingleSkinRib
         self.ribs = []
         for rib in self.glider_3d.ribs:
-            if isinstance(rib, SingleSkinRib):
-                rib_plot = SingleSkinRibPlot(rib)
-            else:
-                rib_plot = self.RibPlot(rib, self.config)
-
-            rib_plot.flatten(self.glider_3d)
+            plotpart = _unwrap_rib((self.RibPlot, rib, self.glider_3d, self.config))
             if rotate:
-                rib_plot.plotpart.rotate(90, radians=False)
-            self.ribs.append(rib_plot.plotpart)
+                plotpart.rotate(90, radians=False)
+            self.ribs.append(plotpart)
 
     def get_dribs(self):
         self.dribs.clear()
@@ -160,6 +164,11 @@ class PlotMaker(object):
         return Layout.stack_column(all_layouts, 0.01, center_x=False)
 
     def unwrap(self):
+        if self.config.unwrap_processes and self.config.unwrap_processes > 1:
+            return self.unwrap_parallel(self.config.unwrap_processes)
+        if self.config.pattern_store:
+            return self._unwrap(map)
+
         self.get_panels()
         self.get_ribs()
         self.get_dribs()
@@ -167,6 +176,94 @@ class PlotMaker(object):
         self.get_rigidfoils()
         return self
 
+    def _get_cell_payload(self, cell):
+        """
+        Everything needed to unwrap a cell in another process (without the rest of the glider)
+        """
+        attachment_points = [
+            point for point in self.glider_3d.attachment_points
+            if getattr(point, "cell", None) is cell or getattr(point, "rib", None) in cell.ribs
+        ]
+        return self.CellPlotMaker, cell, attachment_points, self.config
+
+    def _get_rib_payload(self, rib, attachment_points=None):
+        """
+        Everything needed to unwrap a rib in another process (without the rest of the glider)
+        """
+        if attachment_points is None:
+            attachment_points = self.glider_3d.attachment_points
+
+        ribs = [rib, getattr(rib, "mirrored_rib", None)]
+        cells = [cell for cell in self.glider_3d.cells if rib in cell.ribs]
+        attachment_points = [point for point in attachment_points if getattr(point, "rib", None) in ribs]
+
+        return self.RibPlot, rib, RibGlider(cells, attachment_points), self.config
+
+    def _get_cell_dependencies(self, payload):
+        cellplotmaker, cell, attachment_points, config = payload
+        return {
+            "cell": get_dependency_hash(cell),
+            "attachment_points": get_dependency_hash(attachment_points),
+            "config": get_dependency_hash(cellplotmaker, config)
+        }
+
+    def _get_rib_dependencies(self, payload):
+        ribplot, rib, rib_glider, config = payload
+        return {
+            "rib": get_dependency_hash(rib),
+            "cells": get_dependency_hash(rib_glider.cells),
+            "attachment_points": get_dependency_hash(rib_glider.attachment_points),
+            "config": get_dependency_hash(ribplot, config)
+        }
+
+    def unwrap_parallel(self, processes=None):
+        """
+        Unwrap all cells and ribs on a process pool, same result as unwrap.
+        :param processes: number of worker processes (default: number of cpus)
+        """
+        logger.info(f"unwrap using {processes} processes")
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            return self._unwrap(executor.map)
+
+    def _unwrap(self, map_function):
+        """
+        Unwrap all cells and ribs through map_function (map or a pool's map),
+        reuse unchanged ones from config.pattern_store (if set).
+        """
+        store = None
+        if self.config.pattern_store:
+            store = PatternStore(self.config.pattern_store)
+
+        cells = self.glider_3d.cells
+        cell_payloads = [self._get_cell_payload(cell) for cell in cells]
+        attachment_points = self.glider_3d.attachment_points
+        rib_payloads = [self._get_rib_payload(rib, attachment_points) for rib in self.glider_3d.ribs]
+
+        self.ribs = _map_stored(_unwrap_rib, rib_payloads, self._get_rib_dependencies, store, map_function)
+        cell_results = _map_stored(_unwrap_cell, cell_payloads, self._get_cell_dependencies, store, map_function)
+
+        if store is not None:
+            logger.info(f"unwrapped {len(cells)} cells and {len(rib_payloads)} ribs, {store}")
+
+        self.dribs.clear()
+        self.straps.clear()
+        self.rigidfoils.clear()
+
+        for cell, result in zip(cells, cell_results):
+            # 3d-shaping amounts have been calculated in the worker
+            for panel, (amount_front, amount_back) in zip(cell.panels, result["amount_3d"]):
+                panel.cut_front["amount_3d"] = amount_front
+                panel.cut_back["amount_3d"] = amount_back
+
+            self.dribs[cell] = result["dribs"]
+            self.straps[cell] = result["straps"]
+            self.rigidfoils[cell] = result["rigidfoils"]
+
+        self._stack_panels([result["lower"] for result in cell_results],
+                           [result["upper"] for result in cell_results])
+
+        return self
+
     def get_all_parts(self):
         parts = []
         for cell in self.panels.values():
@@ -182,3 +279,82 @@ class PlotMaker(object):
     #def get_all_grouped(self):
     #    return self.get_all_parts().group_materials()
 
+
+class RibGlider(object):
+    """
+    The part of a glider a RibPlot needs: the cells and attachment points of one rib
+    """
+    get_rib_attachment_points = Glider.get_rib_attachment_points
+
+    def __init__(self, cells, attachment_points):
+        self.cells = cells
+        self.attachment_points = attachment_points
+
+
+def _map_stored(function, payloads, get_dependencies, store, map_function):
+    """
+    map_function(function, payloads), but only for payloads without a result in the store (if any).
+    Every PlotPart of a result records its dependency-hashes.
+    """
+    dependencies = [get_dependencies(payload) for payload in payloads]
+    keys = [get_dependency_hash(dependency) for dependency in dependencies]
+
+    if store is None:
+        results = [None] * len(payloads)
+    else:
+        results = [store.get(key) for key in keys]
+
+    missing = [index for index, result in enumerate(results) if result is None]
+
+    for index, result in zip(missing, map_function(function, [payloads[index] for index in missing])):
+        for part in _iter_parts(result):
+            part.dependencies = dependencies[index]
+        if store is not None:
+            store.set(keys[index], result)
+        results[index] = result
+
+    return results
+
+
+def _iter_parts(result):
+    if isinstance(result, PlotPart):
+        yield result
+    elif isinstance(result, dict):
+        for value in result.values():
+            yield from _iter_parts(value)
+    elif isinstance(result, (list, tuple)):
+        for value in result:
+            yield from _iter_parts(value)
+
+
+def _unwrap_cell(payload):
+    """
+    Unwrap all parts of a cell (process pool worker)
+    """
+    cellplotmaker, cell, attachment_points, config = payload
+    plotmaker = cellplotmaker(cell, attachment_points, config)
+
+    return {
+        "lower": plotmaker.get_panels_lower(),
+        "upper": plotmaker.get_panels_upper(),
+        "amount_3d": [(panel.cut_front.get("amount_3d"), panel.cut_back.get("amount_3d")) for panel in cell.panels],
+        "dribs": plotmaker.get_dribs(),
+        "straps": plotmaker.get_straps(),
+        "rigidfoils": plotmaker.get_rigidfoils()
+    }
+
+
+def _unwrap_rib(payload):
+    """
+    Unwrap a rib (process pool worker)
+    """
+    from openglider.glider.rib.rib import SingleSkinRib
+    ribplot, rib, rib_glider, config = payload
+
+    if isinstance(rib, SingleSkinRib):
+        rib_plot = SingleSkinRibPlot(rib)
+    else:
+        rib_plot = ribplot(rib, config)
+
+    rib_plot.flatten(rib_glider)
+    return rib_plot.plotpart
@@ -529,8 +529,8 @@ class CellPlotMaker:
 
             left_bal, right_bal = flattened_cell["ballooned"]
 
-            outer_left = left_bal.copy().add_stuff(-self.config.allowance_general)
-            outer_right = right_bal.copy().add_stuff(self.config.allowance_general)
+            allowance = self.config.allowance_general
+            outer_left, outer_right = PolyLine2D.add_stuff_many([left_bal, right_bal], [-allowance, allowance])
 
             outer_orig = [outer_left, outer_right]
             outer = [l.copy().check() for l in outer_orig]
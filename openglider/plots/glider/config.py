@@ -59,6 +59,9 @@ class PatternConfig(Config):
 
     layout_seperate_panels = True
 
+    unwrap_processes = 0  # > 1: unwrap cells and ribs on a process pool
+    pattern_store = None  # directory: reuse cells and ribs with unchanged geometry from earlier unwraps
+
 
 class OtherPatternConfig(PatternConfig):
     complete_glider = False
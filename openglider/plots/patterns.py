@@ -114,10 +114,12 @@ class PatternsNew(object):
 
         all_patterns.scale(1000)
 
-        all_patterns.export_svg(fn("plots_all.svg"))
-        all_patterns.export_dxf(fn("plots_all_dxf2000.dxf"))
-        all_patterns.export_dxf(fn("plots_all_dxf2007.dxf"), "AC1021")
-        all_patterns.export_ntv(fn("plots_all.ntv"))
+        all_patterns.export_all([
+            ("svg", fn("plots_all.svg")),
+            ("dxf", fn("plots_all_dxf2000.dxf")),
+            ("dxf", fn("plots_all_dxf2007.dxf"), "AC1021"),
+            ("ntv", fn("plots_all.ntv"))
+        ])
 
 
 
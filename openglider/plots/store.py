@@ -0,0 +1,119 @@
+"""
+On-disk store for unwrapped parts, keyed by a content hash of the geometry they were made of.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import types
+
+import numpy as np
+
+import openglider
+
+logger = logging.getLogger(__name__)
+
+# change when the unwrapped parts of the same input change (together with openglider.__version__)
+STORE_VERSION = 3
+# derived values / settings that do not change the patterns
+IGNORED_KEYS = {"amount_3d", "pattern_store", "unwrap_processes"}
+# significant digits / decimals of floats: rounding noise (p.e. from the line-solver) doesn't change the hash
+PRECISION = 10
+DECIMALS = 12
+
+
+def _describe(obj, parents=()):
+    """
+    json-able, process-independent description of an object (p.e. a cell, rib, config)
+    """
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if isinstance(obj, float):
+        return "{:.{}g}".format(round(obj, DECIMALS) + 0., PRECISION)
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _describe(obj.tolist())
+    if isinstance(obj, type):
+        return "{}.{}".format(obj.__module__, obj.__qualname__)
+    if isinstance(obj, (types.FunctionType, types.BuiltinFunctionType)):
+        return "{}.{}".format(getattr(obj, "__module__", None), obj.__qualname__)
+    if isinstance(obj, types.MethodType):
+        return _describe(obj.__func__, parents)
+
+    if id(obj) in parents:
+        return "<recursion>"
+    parents = parents + (id(obj), )
+
+    if isinstance(obj, dict):
+        return {str(key): _describe(value, parents) for key, value in obj.items() if key not in IGNORED_KEYS}
+    if isinstance(obj, (list, tuple)):
+        return [_describe(value, parents) for value in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_describe(value, parents) for value in obj), key=json.dumps)
+
+    if hasattr(obj, "__json__"):
+        data = obj.__json__()
+    elif hasattr(obj, "__dict__"):
+        data = vars(obj)
+    else:
+        return repr(obj)
+
+    return {"_type": _describe(obj.__class__), "data": _describe(data, parents)}
+
+
+def get_dependency_hash(*objects):
+    """
+    Hash (hex-string) of the content of some objects, stable across processes and sessions.
+    Salted with the openglider- and store-version: results of other versions are not reused.
+    """
+    salt = [openglider.__version__, STORE_VERSION]
+    description = json.dumps([salt, _describe(objects)], sort_keys=True)
+    return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+
+class PatternStore(object):
+    """
+    Pickled results in a directory, one file per dependency-hash
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return "<PatternStore {} ({} hits, {} misses)>".format(self.directory, self.hits, self.misses)
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, "{}.pickle".format(key))
+
+    def __contains__(self, key):
+        return os.path.exists(self._get_path(key))
+
+    def get(self, key, default=None):
+        try:
+            with open(self._get_path(key), "rb") as infile:
+                value = pickle.load(infile)
+        except FileNotFoundError:
+            self.misses += 1
+            return default
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning(f"invalid pattern store entry {key}: {e}")
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        # write to a temporary file first: a concurrent reader never sees half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as outfile:
+            pickle.dump(value, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._get_path(key))
+
+    def clear(self):
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".pickle"):
+                os.remove(os.path.join(self.directory, filename))
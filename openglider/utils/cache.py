@@ -1,13 +1,164 @@
 from __future__ import annotations
+import collections
 import copy
+import itertools
 import logging
+import os
+import threading
+import weakref
 from typing import TypeVar
 
 import numpy as np
 
 import openglider
 
+logger = logging.getLogger(__name__)
+
 cache_instances = []
+_version_counter = itertools.count()
+_missing = object()
+
+
+def new_version():
+    """
+    Get a new (process-unique, monotonic) version number
+    """
+    return os.getpid(), next(_version_counter)
+
+
+def get_nbytes(value):
+    """
+    Estimate the memory used by a cached value (numpy-arrays and containers of them)
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, HashedList):
+        return value.data.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(get_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(get_nbytes(item) for item in value.values())
+
+    return 0
+
+
+class CacheStatistics(object):
+    """
+    Hit/miss/eviction counters of a cached_property or cached_function
+    """
+    def __init__(self, name):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.caches = weakref.WeakSet()
+
+    def __repr__(self):
+        return "<CacheStatistics {}: hits={}, misses={}, evictions={}, entries={}, nbytes={}>".format(
+            self.name, self.hits, self.misses, self.evictions, self.entries, self.nbytes)
+
+    @property
+    def entries(self):
+        return sum(len(cache) for cache in self.caches)
+
+    @property
+    def nbytes(self):
+        return sum(cache.nbytes for cache in self.caches)
+
+    def reset(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": self.entries,
+            "nbytes": self.nbytes
+        }
+
+
+class LRUCache(object):
+    """
+    Least-recently-used cache, bounded by the number of entries and/or the (estimated) size in bytes.
+    None means unbounded.
+
+    get/set/pop are guarded by a lock, so one cache can be shared between threads (p.e. Layout.export_all).
+    """
+    def __init__(self, maxsize=None, maxbytes=None, statistics=None, on_evict=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.statistics = statistics or CacheStatistics("unnamed")
+        self.statistics.caches.add(self)
+        self.on_evict = on_evict
+
+        self.data = collections.OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
+        # reentrant: weakref-callbacks may pop entries while the lock is held
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __deepcopy__(self, memo):
+        # copies start empty but count into the same statistics
+        return LRUCache(self.maxsize, self.maxbytes, self.statistics, self.on_evict)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        with self.lock:
+            value = self.data.get(key, _missing)
+            if value is _missing:
+                self.statistics.misses += 1
+                return default
+
+            self.statistics.hits += 1
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = get_nbytes(value)
+
+        with self.lock:
+            self.pop(key)
+
+            self.data[key] = value
+            self.sizes[key] = size
+            self.nbytes += size
+
+            maxsize = self.maxsize
+            maxbytes = self.maxbytes
+            # keep at least the newest entry
+            while len(self.data) > 1 and (
+                    (maxsize is not None and len(self.data) > maxsize) or
+                    (maxbytes is not None and self.nbytes > maxbytes)):
+                self.evict()
+
+    def pop(self, key, default=None):
+        with self.lock:
+            if key not in self.data:
+                return default
+
+            self.nbytes -= self.sizes.pop(key)
+            return self.data.pop(key)
+
+    def evict(self):
+        with self.lock:
+            key = next(iter(self.data))
+            value = self.pop(key)
+            self.statistics.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.sizes.clear()
+            self.nbytes = 0
 
 
 class CachedObject(object):
@@ -17,15 +168,19 @@ class CachedObject(object):
     """
     name: str = "unnamed"
     hashlist = ()
-    cached_properties = []
 
     def __hash__(self):
         return hash_attributes(self, self.hashlist)
 
-    def __del__(self):
-        for prop in self.cached_properties:
-            if id(self) in prop.cache:
-                prop.cache.pop(id(self))
+    @property
+    def version(self):
+        """
+        Cheap change-tracking key: versions of the attributes in the hashlist
+        """
+        if self.hashlist:
+            return version_attributes(self, self.hashlist)
+
+        return hash(self)
 
     def __repr__(self):
         rep = super(CachedObject, self).__repr__()
@@ -34,7 +189,13 @@ class CachedObject(object):
         return rep
 
 
-def cached_property(*hashlist):
+def cached_property(*hashlist, maxsize=None, maxbytes=None):
+    """
+    Cache a property until one of the attributes in the hashlist changes.
+
+    Values of all instances are kept in one LRUCache per property, limited to
+    maxsize instances / maxbytes (default: config "cache_property_maxsize" / "cache_property_maxbytes").
+    """
     #@functools.wraps
     class CachedProperty(object):
         def __init__(self, fget=None, doc=None):
@@ -44,71 +205,129 @@ def cached_property(*hashlist):
             self.__module__ = fget.__module__
 
             self.hashlist = hashlist
+            self.statistics = CacheStatistics("{}.{}".format(fget.__module__, fget.__qualname__))
+            self.cache = LRUCache(statistics=self.statistics)
+            self.uncached_types = set()
 
             global cache_instances
             cache_instances.append(self)
 
         def __get__(self, parentclass, type=None):
+            if parentclass is None:
+                return self
             if not openglider.config["caching"]:
                 return self.function(parentclass)
             else:
-                if not hasattr(parentclass, "_cache"):
-                    parentclass._cache = {}
+                key = id(parentclass)
+                version = version_attributes(parentclass, self.hashlist)
+                entry = self.cache.get(key)
+
+                # Return cached or recalc if versions differ (or the id belongs to a dead object)
+                if entry is not None and entry[0]() is parentclass and entry[1] == version:
+                    return entry[2]
+
+                res = self.function(parentclass)
+                self.cache.maxsize = _get_limit(maxsize, "cache_property_maxsize")
+                self.cache.maxbytes = _get_limit(maxbytes, "cache_property_maxbytes")
+                try:
+                    ref = weakref.ref(parentclass, self._remove_callback(key))
+                except TypeError:  # no weak references possible -> don't cache
+                    cls = parentclass.__class__
+                    if cls not in self.uncached_types:
+                        self.uncached_types.add(cls)
+                        logger.warning("%s: %s does not support weak references, property not cached",
+                                       self.statistics.name, cls.__qualname__)
+                    return res
+
+                self.cache.set(key, (ref, version, res))
+
+                return res
+
+        def _remove_callback(self, key):
+            cache = self.cache
 
-                cache = parentclass._cache
-                dahash = hash_attributes(parentclass, self.hashlist)
-                # Return cached or recalc if hashes differ
-                if self not in cache or cache[self]['hash'] != dahash:
-                    res = self.function(parentclass)
-                    cache[self] = {
-                        "hash": dahash,
-                        "value": res
-                    }
+            def remove(ref):
+                with cache.lock:
+                    entry = cache.data.get(key)
+                    if entry is not None and entry[0] is ref:
+                        cache.pop(key)
 
-                return cache[self]["value"]
+            return remove
 
     return CachedProperty
 
-def cached_function(*hashlist):
+class FunctionCaches(dict):
+    """
+    The caches of the cached functions of an instance (not copied or pickled: a copy starts empty)
+    """
+    def __reduce__(self):
+        return self.__class__, ()
+
+
+def cached_function(*hashlist, maxsize=None, maxbytes=None):
+    """
+    Cache the results of a method for every set of arguments until one of the attributes in the hashlist changes.
+
+    Every instance gets an LRUCache, limited to maxsize results / maxbytes
+    (default: config "cache_maxsize" / "cache_maxbytes").
+    """
     class CachedFunction():
         def __init__(self, f_get, doc=None):
             self.function = f_get
             self.__doc__ = doc or f_get.__doc__
             self.__name__ = f_get.__name__
             self.__module__ = f_get.__module__
-        
+            self.statistics = CacheStatistics("{}.{}".format(f_get.__module__, f_get.__qualname__))
+
+            global cache_instances
+            cache_instances.append(self)
+
         def __get__(self, instance, parentclass):
+            if instance is None:
+                return self
+
             if not hasattr(instance, "cached_functions"):
-                setattr(instance, "cached_functions", {})
+                setattr(instance, "cached_functions", FunctionCaches())
             
             if self not in instance.cached_functions:
+                statistics = self.statistics
+
                 class BoundCache():
                     def __init__(self, parent, function):
                         self.parent = parent
                         self.function = function
-                        self.cache = {}
-                        self.hash = None
+                        self.cache = LRUCache(
+                            _get_limit(maxsize, "cache_maxsize"),
+                            _get_limit(maxbytes, "cache_maxbytes"),
+                            statistics
+                        )
+                        self.version = None
                         self.hashlist = hashlist
                     
                     def __repr__(self):
                         return f"<cached: {self.function}>"
                     
                     def __call__(self, *args, **kwargs):
-                        the_hash = hash_attributes(self.parent, self.hashlist)
-                        #logging.info(f"{self.parent} {the_hash} {self.hash} {args} {kwargs}")
+                        if not openglider.config["caching"]:
+                            return self.function(self.parent, *args, **kwargs)
+
+                        version = version_attributes(self.parent, self.hashlist)
+                        #logging.info(f"{self.parent} {version} {self.version} {args} {kwargs}")
 
-                        if the_hash != self.hash:
+                        if version != self.version:
                             self.cache.clear()
-                            self.hash = the_hash
+                            self.version = version
                         
-                        argument_hash = hash_list(*args, *kwargs.values())
+                        argument_hash = hash_list(*args, *kwargs.items())
                         logging.debug(f"{argument_hash}, {str(args)}, {str(kwargs)}")
 
-                        if argument_hash not in self.cache:
+                        result = self.cache.get(argument_hash, _missing)
+                        if result is _missing:
                             logging.debug(f"recalc, {self.function} {self.parent}")
-                            self.cache[argument_hash] = self.function(self.parent, *args, **kwargs)
+                            result = self.function(self.parent, *args, **kwargs)
+                            self.cache.set(argument_hash, result)
 
-                        return self.cache[argument_hash]
+                        return result
                 
                 instance.cached_functions[self] = BoundCache(instance, self.function)
             
@@ -119,9 +338,26 @@ def cached_function(*hashlist):
     return CachedFunction
 
 
+def _get_limit(value, config_key):
+    if value is None:
+        return openglider.config[config_key]
+    return value
+
+
 def clear_cache():
+    """
+    Clear all cached properties and functions
+    """
     for instance in cache_instances:
-        instance.cache.clear()
+        for cache in list(instance.statistics.caches):
+            cache.clear()
+
+
+def get_cache_statistics():
+    """
+    Hit/miss/eviction counts, number of entries and estimated memory usage of all caches
+    """
+    return [instance.statistics.as_dict() for instance in cache_instances]
 
 
 def recursive_getattr(obj, attr):
@@ -145,54 +381,45 @@ def c_mul(a, b):
     return eval(hex((int(a) * b) & 0xFFFFFFFF)[:-1])
 
 
-def hash_attributes(class_instance, hashlist):
+def get_version(el):
     """
-    http://effbot.org/zone/python-hash.htm
+    Cheap change-tracking key of a value:
+        - CachedObjects (HashedList,..) provide a version
+        - numpy arrays are hashed by their raw data
+        - lists/tuples/dicts give a tuple of the versions of their items
     """
-    value_lst = ()
-
-    for attribute in hashlist:
-        el = recursive_getattr(class_instance, attribute)
+    if isinstance(el, CachedObject):
+        return el.version
+    if isinstance(el, np.ndarray):
+        return hash((el.shape, el.dtype.str, el.tobytes()))
+
+    try:
+        return hash(el)
+    except TypeError:  # Lists p.e.
+        if isinstance(el, (list, tuple)):
+            return tuple(get_version(item) for item in el)
+        if isinstance(el, dict):
+            return tuple((key, get_version(value)) for key, value in el.items())
+        #logging.warning(f"bad cache: {el}")
+        return hash(str(el))
+
+
+def version_attributes(class_instance, hashlist):
+    """
+    Tuple of the versions of the (dotted) attributes
+    """
+    return tuple(get_version(recursive_getattr(class_instance, attribute)) for attribute in hashlist)
 
-        hash_func = getattr(el, "__hash__", None)
-        hash_func = None
-        if hash_func is not None:
-            thahash = el.__hash__()
-        else:
-            try:
-                thahash = hash(el)
-            except TypeError:  # Lists p.e.
-                #logging.warning(f"bad cache: {el} / {class_instance} / {attribute}, {type(el)}")
-                try:
-                    thahash = hash(frozenset(el))
-                except TypeError:
-                    thahash = hash(str(el))
-        
-        value_lst += (thahash,)
 
-    return hash(value_lst)
+def hash_attributes(class_instance, hashlist):
+    """
+    http://effbot.org/zone/python-hash.htm
+    """
+    return hash(version_attributes(class_instance, hashlist))
 
 
 def hash_list(*lst):
-    value_lst = ()
-    for el in lst:
-
-        hash_func = getattr(el, "__hash__", None)
-        if hash_func is not None:
-            thahash = el.__hash__()
-        else:
-            try:
-                thahash = hash(el)
-            except TypeError:  # Lists p.e.
-                #logging.warning(f"bad cache: {el}")
-                try:
-                    thahash = hash(frozenset(el))
-                except TypeError:
-                    thahash = hash(str(el))
-        
-        value_lst += (thahash, )
-
-    return hash(value_lst)
+    return hash(tuple(get_version(el) for el in lst))
 
 
 
@@ -205,7 +432,7 @@ class HashedList(CachedObject):
     name = "unnamed"
     def __init__(self, data, name=None):
         self._data = np.array([])
-        self._hash = None
+        self._version = new_version()
         self.data = data
         self.name = name or getattr(self, 'name', None)
 
@@ -219,13 +446,20 @@ class HashedList(CachedObject):
 
     def __setitem__(self, key, value):
         self.data[key] = np.array(value)
-        self._hash = None
+        self.update_version()
 
     def __hash__(self):
-        if self._hash is None:
-            self._hash = hash(str(self.data))
-            #self._hash = hash("{}/{}".format(id(self), time.time()))
-        return self._hash
+        return hash(self._version)
+
+    @property
+    def version(self):
+        return self._version
+
+    def update_version(self):
+        """
+        Mark the data as changed (needed after in-place changes of self.data)
+        """
+        self._version = new_version()
 
     def __len__(self):
         return len(self.data)
@@ -251,9 +485,10 @@ class HashedList(CachedObject):
             self._data = np.array(data)
             #self._data = np.array(data)
             #self._data = [np.array(vector) for vector in data]  # 1,5*execution time
-            self._hash = None
         else:
             self._data = np.array([])
 
+        self.update_version()
+
     def copy(self: T) -> T:
         return copy.deepcopy(self)
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Layout exporters working on a flattened layout: all lines in one point-buffer,
+formatted in blocks and written through a buffered file.
+Many exports of the same layout share one flattening (Layout.export_all).
+"""
+import concurrent.futures
+import logging
+import os
+
+import numpy as np
+import svgwrite
+import svgwrite.base
+import svgwrite.container
+import svgwrite.shapes
+
+from openglider.utils.css import normalize_class_names
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 2**20
+
+
+class FlatLayout(object):
+    """
+    The lines of all parts/layers of a layout in one (n, 2)-array:
+    line i -> points[offsets[i]:offsets[i+1]]
+    """
+    def __init__(self, layout):
+        lines = []
+        self.parts = []  # (name, material_code, [(layer_name, first_line, last_line), ...])
+        self.layers = {}  # layer_name -> (dxf-attributes, visible)
+
+        for part in layout.parts:
+            part_layers = []
+            for layer_name, layer in part.layers.items():
+                if layer_name not in self.layers:
+                    self.layers[layer_name] = (layer._get_dxf_attributes(), layer.visible)
+
+                start = len(lines)
+                lines += [np.asarray(getattr(line, "data", line), dtype=float).reshape(-1, 2) for line in layer]
+                part_layers.append((layer_name, start, len(lines)))
+
+            self.parts.append((part.name, part.material_code, part_layers))
+
+        self.offsets = np.cumsum([0] + [len(line) for line in lines])
+        if lines:
+            self.points = np.concatenate(lines)
+        else:
+            self.points = np.zeros((0, 2))
+
+        self.point_width = layout.point_width
+        self.layer_config = layout.layer_config
+        self.ntv_layer_config = layout.ntv_layer_config
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def get_line(self, index):
+        return self.points[self.offsets[index]:self.offsets[index+1]]
+
+    def get_lines(self, first, last):
+        for index in range(first, last):
+            yield self.get_line(index)
+
+    @property
+    def bbox(self):
+        """
+        min_x, min_y, max_x, max_y (same as Layout: inf for an empty layout)
+        """
+        if not len(self.points):
+            return float("Inf"), float("Inf"), float("-Inf"), float("-Inf")
+        min_x, min_y = self.points.min(axis=0)
+        max_x, max_y = self.points.max(axis=0)
+        return min_x, min_y, max_x, max_y
+
+    def format_lines(self, point_format, separator=" "):
+        """
+        format all lines (one string per line), points with point_format (p.e. "%.5f,%.5f")
+        """
+        values = self.points.ravel().tolist()
+        formats = {}
+        for start, stop in zip(self.offsets[:-1].tolist(), self.offsets[1:].tolist()):
+            num_points = stop - start
+            if num_points not in formats:
+                formats[num_points] = separator.join([point_format] * num_points)
+            yield formats[num_points] % tuple(values[2*start:2*stop])
+
+
+class _FormattedPolyline(svgwrite.shapes.Polyline):
+    """
+    svg-polyline with the points already formatted
+    """
+    def __init__(self, points, **extra):
+        super(_FormattedPolyline, self).__init__(**extra)
+        self.attribs["points"] = points
+
+    def get_xml(self):
+        return svgwrite.base.BaseElement.get_xml(self)
+
+
+def get_svg_drawing(flat, unit="mm", border=0.02):
+    min_x, min_y, max_x, max_y = flat.bbox
+    width, height = max_x - min_x, max_y - min_y
+    border_w, border_h = [2*border*x for x in (width, height)]
+    width, height = width+border_w, height+border_h
+
+    drawing = svgwrite.Drawing(size=[("{}"+unit).format(n) for n in (width, height)])
+    drawing.viewbox(min_x-border_w/2, -max_y-border_h/2, width, height)
+
+    group = svgwrite.container.Group()
+    group.scale(1, -1)  # svg coordinate system is x->right y->down
+
+    lines = list(flat.format_lines("%r,%r"))
+
+    for name, material_code, part_layers in flat.parts:
+        part_group = svgwrite.container.Group()
+        classes = ""
+        if material_code:
+            classes = " " + " ".join([normalize_class_names(material_code), material_code])
+
+        for layer_name, first, last in part_layers:
+            if layer_name in flat.layer_config:
+                layer_config = {
+                    key: value for key, value in flat.layer_config[layer_name].items()
+                    if key not in ("stroke-color", "visible")
+                }
+            else:
+                layer_config = {"stroke": "black", "fill": "none", "stroke-width": "1"}
+
+            part_layer_group = svgwrite.container.Group()
+            part_group.add(part_layer_group)
+
+            for line in lines[first:last]:
+                element = _FormattedPolyline(line, **layer_config)
+                element.attribs["class"] = layer_name + classes
+                part_layer_group.add(element)
+
+        group.add(part_group)
+
+    drawing.add(group)
+
+    return drawing
+
+
+def export_svg(flat, path, add_styles=False):
+    from openglider.vector.drawing.layout import Layout
+    drawing = get_svg_drawing(flat)
+
+    if add_styles:
+        Layout.add_svg_styles(drawing)
+
+    with open(path, "w", buffering=BUFFER_SIZE) as outfile:
+        drawing.write(outfile)
+
+    return path
+
+
+def export_dxf(flat, path, dxfversion="AC1015"):
+    import ezdxf
+    drawing = ezdxf.new(dxfversion=dxfversion)
+
+    min_x, min_y, max_x, max_y = flat.bbox
+    drawing.header["$EXTMAX"] = (max_x, max_y, 0)
+    drawing.header["$EXTMIN"] = (min_x, min_y, 0)
+    ms = drawing.modelspace()
+
+    for name, material_code, part_layers in flat.parts:
+        group = drawing.groups.new()
+        with group.edit_data() as part_group:
+            for layer_name, first, last in part_layers:
+                if layer_name not in drawing.layers:
+                    attributes, visible = flat.layers[layer_name]
+                    dwg_layer = drawing.layers.new(name=layer_name, dxfattribs=attributes)
+                    if not visible:
+                        dwg_layer.off()
+
+                dxfattribs = {"layer": layer_name}
+                for line in flat.get_lines(first, last):
+                    if len(line) == 1:
+                        if flat.point_width is None:
+                            dxf_obj = ms.add_point(line[0], dxfattribs=dxfattribs)
+                        else:
+                            x, y = line[0]
+                            dxf_obj = ms.add_lwpolyline([[x-flat.point_width/2, y], [x+flat.point_width/2, y]])
+                    else:
+                        dxf_obj = ms.add_lwpolyline(line.tolist(), dxfattribs=dxfattribs)
+                        if len(line) > 2 and all(line[-1] == line[0]):
+                            dxf_obj.closed = True
+                    part_group.append(dxf_obj)
+
+    drawing.saveas(path)
+    return drawing
+
+
+def export_ntv(flat, path):
+    filename = os.path.split(path)[-1]
+    lines = list(flat.format_lines("(%.5f,%.5f)"))
+
+    with open(path, "w", buffering=BUFFER_SIZE) as outfile:
+        # head
+        outfile.write("A {} {} 1 1 0 0 0 0\n".format(len(filename), filename))
+        for name, material_code, part_layers in flat.parts:
+            # part-header: 1A {name}, {position_x} {pos_y} {rot_degrees} {!derivePerimeter} {useAngle} {flipped}
+            name = name or "unnamed"
+            outfile.write("\n1A {} {} (0, 0) 0 0 0 0 0 0".format(len(name), name))
+
+            layers = {layer_name: (first, last) for layer_name, first, last in part_layers}
+            for plottype, layer_names in flat.ntv_layer_config.items():
+                for layer_name in layer_names:
+                    first, last = layers.get(layer_name, (0, 0))
+                    for index in range(first, last):
+                        # line-header type: (R->ignore, P->plot, C->cut
+                        num_points = flat.offsets[index+1] - flat.offsets[index]
+                        outfile.write("\n1A P 0 {} 0 0 0\nA {} {}".format(plottype, num_points, lines[index]))
+
+            # part-end
+            outfile.write("\n0\n")
+
+        # end
+        outfile.write("\n0")
+
+    return path
+
+
+exporters = {
+    "svg": export_svg,
+    "dxf": export_dxf,
+    "ntv": export_ntv
+}
+
+
+def _export(args):
+    flat, file_format, path, options = args
+    exporters[file_format](flat, path, *options)
+    return path
+
+
+def export_all(flat, exports, processes=0):
+    """
+    Run many exports of one flattened layout concurrently
+    :param exports: [(format, path, *options), ...] p.e. ("dxf", "plots.dxf", "AC1021")
+    :param processes: > 0: use a process pool, otherwise threads (sharing the buffer)
+    """
+    jobs = [(flat, file_format, path, options) for file_format, path, *options in exports]
+    for _, file_format, _, _ in jobs:
+        if file_format not in exporters:
+            raise ValueError("unknown export format: {}".format(file_format))
+
+    if processes and processes > 0:
+        executor = concurrent.futures.ProcessPoolExecutor(processes)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(len(jobs) or None)
+
+    logger.info(f"export {len(jobs)} files")
+    with executor:
+        return list(executor.map(_export, jobs))
@@ -1,12 +1,11 @@
-import os
 import math
 from typing import List, Union
 
 import numpy as np
-import svgwrite
 import svgwrite.container
-import svgwrite.shapes
 
+from openglider.vector.drawing import export
+from openglider.vector.drawing.export import FlatLayout
 from openglider.vector.drawing.part import PlotPart
 from openglider.utils.css import get_material_color, normalize_class_names
 from openglider.vector import PolyLine2D
@@ -412,62 +411,8 @@ class Layout(object):
         #return blocks
         return dwg
 
-    def get_svg_group(self, config=None):
-        _config = self.layer_config.copy()
-        if config is not None:
-            _config.update(config)
-        config = _config
-
-        group = svgwrite.container.Group()
-        group.scale(1, -1)  # svg coordinate system is x->right y->down
-
-        for part in self.parts:
-            part_group = svgwrite.container.Group()
-            part_layer_groups = {}
-
-            for layer_name in part.layers:
-                # todo: simplify
-                if layer_name in config:
-                    layer_config = config[layer_name]
-                    for key in ("stroke-color", "visible"):
-                        if key in layer_config:
-                            layer_config.pop(key)
-                else:
-                    layer_config = {"stroke": "black", "fill": "none", "stroke-width": "1"}
-
-                lines = part.layers[layer_name]
-
-                if layer_name not in part_layer_groups:
-                    part_layer_group = svgwrite.container.Group()
-                    #group.elementname = layer_name
-                    part_group.add(part_layer_group)
-                    part_layer_groups[layer_name] = part_layer_group
-                else:
-                    part_layer_group = part_layer_groups[layer_name]
-
-                for line in lines:
-                    element = svgwrite.shapes.Polyline(line, **layer_config)
-                    classes = [layer_name]
-                    if part.material_code:
-                        classes.append(normalize_class_names(part.material_code))
-                        classes.append(part.material_code)
-                    element.attribs["class"] = " ".join(classes)
-                    part_layer_group.add(element)
-
-            group.add(part_group)
-
-        return group
-
     def get_svg_drawing(self, unit="mm", border=0.02):
-        border_w, border_h = [2*border*x for x in (self.width, self.height)]
-        width, height = self.width+border_w, self.height+border_h
-
-        drawing = svgwrite.Drawing(size=[("{}"+unit).format(n) for n in (width, height)])
-        drawing.viewbox(self.min_x-border_w/2, -self.max_y-border_h/2, width, height)
-        group = self.get_svg_group()
-        drawing.add(group)
-
-        return drawing
+        return export.get_svg_drawing(self.flatten(), unit=unit, border=border)
 
     @staticmethod
     def add_svg_styles(drawing):
@@ -517,49 +462,17 @@ class Layout(object):
 
         return drawing.tostring()
 
-    def export_svg(self, path, add_styles=False):
-        drawing = self.get_svg_drawing()
-
-        if add_styles:
-            self.add_svg_styles(drawing)
+    def flatten(self) -> FlatLayout:
+        """
+        All lines in one point-buffer (for the exporters)
+        """
+        return FlatLayout(self)
 
-        with open(path, "w") as outfile:
-            drawing.write(outfile)
+    def export_svg(self, path, add_styles=False):
+        return export.export_svg(self.flatten(), path, add_styles=add_styles)
 
     def export_dxf(self, path, dxfversion="AC1015"):
-        import ezdxf
-        drawing = ezdxf.new(dxfversion=dxfversion)
-
-        drawing.header["$EXTMAX"] = (self.max_x, self.max_y, 0)
-        drawing.header["$EXTMIN"] = (self.min_x, self.min_y, 0)
-        ms = drawing.modelspace()
-
-        for part in self.parts:
-            group = drawing.groups.new()
-            with group.edit_data() as part_group:
-                for layer_name, layer in part.layers.items():
-                    if layer_name not in drawing.layers:
-                        attributes = layer._get_dxf_attributes()
-                        dwg_layer = drawing.layers.new(name=layer_name, dxfattribs=attributes)
-                        if not layer.visible:
-                            dwg_layer.off()
-
-                    for elem in layer:
-                        dxfattribs = {"layer": layer_name}
-                        if len(elem) == 1:
-                            if self.point_width is None:
-                                dxf_obj = ms.add_point(elem[0], dxfattribs=dxfattribs)
-                            else:
-                                x, y = elem[0]
-                                dxf_obj = ms.add_lwpolyline([[x-self.point_width/2, y], [x+self.point_width/2, y]])
-                        else:
-                            dxf_obj = ms.add_lwpolyline(elem, dxfattribs=dxfattribs)
-                            if len(elem) > 2 and all(elem[-1] == elem[0]):
-                                dxf_obj.closed = True
-                        part_group.append(dxf_obj)
-
-        drawing.saveas(path)
-        return drawing
+        return export.export_dxf(self.flatten(), path, dxfversion=dxfversion)
 
     ntv_layer_config = {
         "C": ["cuts"],
@@ -568,45 +481,16 @@ class Layout(object):
     }
 
     def export_ntv(self, path):
-        filename = os.path.split(path)[-1]
-
-        def format_line(line):
-            a = "\nA {} ".format(len(line))
-            b = " ".join(["({:.5f},{:.5f})".format(p[0], p[1]) for p in line])
-            return a+b
-
-        with open(path, "w") as outfile:
-            # head
-            outfile.write("A {} {} 1 1 0 0 0 0\n".format(len(filename), filename))
-            for part in self.parts:
-                # part-header: 1A {name}, {position_x} {pos_y} {rot_degrees} {!derivePerimeter} {useAngle} {flipped}
-                part_header = "\n1A {len_name} {name} ({pos_x}, {pos_y}) {rotation_deg} 0 0 0 0 0"
-                name = part.name or "unnamed"
-                args = {"len_name": len(name),
-                        "name": name,
-                        "pos_x": 0,
-                        "pos_y": 0,
-                        "rotation_deg": 0}
-                outfile.write(part_header.format(**args))
-
-                # part-boundary
-                part_boundary = "\n{boundary_len} {line}"
-                #outfile.write()
-
-                for plottype in self.ntv_layer_config:
-                    for layer_origin in self.ntv_layer_config[plottype]:
-                        for line in part.layers[layer_origin]:
-                            # line-header type: (R->ignore, P->plot, C->cut
-                            outfile.write("\n1A P 0 {} 0 0 0".format(plottype))
-                            outfile.write(format_line(line))
-
-
-                # part-end
-                outfile.write("\n0\n")
-
-
-            # end
-            outfile.write("\n0")
+        return export.export_ntv(self.flatten(), path)
+
+    def export_all(self, exports, processes=0):
+        """
+        Flatten once and write all files concurrently
+        :param exports: [(format, path, *options), ...] p.e. [("svg", "a.svg"), ("dxf", "a.dxf", "AC1021")]
+        :param processes: > 0: use a process pool, otherwise threads
+        :return: list of paths
+        """
+        return export.export_all(self.flatten(), exports, processes=processes)
 
     def scale_a4(self):
         width = max(self.width, self.height)
@@ -125,6 +125,8 @@ class PlotPart(object):
 
         self.name = name
         self.material_code = material_code
+        # hashes of the geometry this part was unwrapped from (see openglider.plots.store)
+        self.dependencies = {}
 
     def __json__(self):
         new = {
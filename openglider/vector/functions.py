@@ -82,6 +82,23 @@ def cut(p1, p2, p3, p4):
     return p1 + k * (p2 - p1), k, l
 
 
+def cut_many(p1, p2, p3, p4):
+    """
+    Vectorized 2D-Linear Cut (broadcasts over arrays of points) using the closed-form determinants
+    Returns (points, k, l), k and l are nan for parallel lines
+    """
+    p1, p2, p3, p4 = (np.asarray(p, dtype=float) for p in (p1, p2, p3, p4))
+    d1 = p2 - p1
+    d2 = p3 - p4
+    rhs = p3 - p1
+    det = d1[..., 0] * d2[..., 1] - d1[..., 1] * d2[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(det != 0, (rhs[..., 0] * d2[..., 1] - rhs[..., 1] * d2[..., 0]) / det, np.nan)
+        l = np.where(det != 0, (d1[..., 0] * rhs[..., 1] - d1[..., 1] * rhs[..., 0]) / det, np.nan)
+
+    return p1 + k[..., np.newaxis] * d1, k, l
+
+
 def set_dimension(array, dim=3):
     array = np.array(array)
     if len(array.shape) == 1:
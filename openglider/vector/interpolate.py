@@ -1,3 +1,6 @@
+import numpy as np
+
+from openglider.utils.cache import cached_property
 from openglider.vector import PolyLine2D
 
 
@@ -7,6 +10,42 @@ class Interpolation(PolyLine2D):
         self.extrapolate = extrapolate
 
     def __call__(self, xval):
+        """
+        Get the interpolated y-value for a x-value or an array of x-values
+        (linear extrapolation with the first/last segment if self.extrapolate)
+        """
+        if not self._sorted:
+            if np.ndim(xval):
+                return np.array([self._get_value(x) for x in np.ravel(xval)]).reshape(np.shape(xval))
+            return self._get_value(xval)
+
+        x_values = self.data[:, 0]
+        y_values = self.data[:, 1]
+        xval = np.asarray(xval, dtype=float)
+
+        # first point right of xval -> segment [index-1, index]
+        index = np.searchsorted(x_values, xval, side="right")
+        if not self.extrapolate:
+            inside = (index > 0) & (index < len(x_values)) & (x_values[(index - 1).clip(0)] < xval)
+            if not np.all(inside):
+                raise ValueError("Value out of range: {}".format(xval))
+
+        index = index.clip(1, len(x_values) - 1)
+        x_0 = x_values[index - 1]
+        y_0 = y_values[index - 1]
+
+        return (y_0 + (xval - x_0) / (x_values[index] - x_0) * (y_values[index] - y_0))[()]
+
+    @cached_property('self')
+    def _sorted(self):
+        """
+        increasing x-values -> binary search for the segment
+        """
+        if len(self.data) < 2:
+            return False
+        return bool(np.all(self.data[1:, 0] >= self.data[:-1, 0]))
+
+    def _get_value(self, xval):
         last_point = self.data[0]
         for index, point in enumerate(self.data):
             if index == 0:
@@ -2,7 +2,7 @@ import numpy as np
 
 from openglider.utils import sign
 from openglider.utils.cache import cached_property, HashedList
-from openglider.vector.functions import norm, normalize, rangefrom, \
+from openglider.vector.functions import norm, normalize, rangefrom, cut_many, \
                                         rotation_2d, cut, radius_from_3points, \
                                         curvature_from_3points
 from openglider.utils.table import Table
@@ -67,6 +67,18 @@ class PolyLine(HashedList):
         """List.point(x) is the same as List[x]"""
         return self[x]
 
+    def point_many(self, ik):
+        """
+        Vectorized version of List[ik] for an array of (float) indices
+        """
+        ik = np.asarray(ik, dtype=float)
+        length = len(self.data)
+        floor = np.floor(ik)
+        i = np.where(ik < 0, 0, np.minimum(floor, length - 2)).astype(int)
+        k = np.where(ik < 0, ik, ik - floor + np.maximum(0, floor - length + 2))
+
+        return self.data[i] + k[..., np.newaxis] * (self.data[i + 1] - self.data[i])
+
     def last(self):
         return self[len(self) - 1]
 
@@ -98,15 +110,41 @@ class PolyLine(HashedList):
 
     def check(self):
         # remove zero-length segments
-        index = 0
-        while index < len(self)-1:
-            if norm(self[index+1] - self[index]) < 0.0000001:
-                self.data = np.concatenate([self[:index], self[index+1:]])
-            else:
-                index += 1
+        if len(self.data) > 1:
+            keep = np.ones(len(self.data), dtype=bool)
+            keep[:-1] = np.linalg.norm(self.data[1:] - self.data[:-1], axis=1) >= 0.0000001
+            self.data = self.data[keep]
 
         return self
 
+    @cached_property('self')
+    def cumulative_lengths(self) -> np.ndarray:
+        """
+        Arc-length at every point (0 at the first point)
+        """
+        return np.concatenate([[0.], np.cumsum(self.get_segment_lengthes())])
+
+    def get_arc_length(self, ik):
+        """
+        Arc-length position of (float) indices (linear extrapolation with the first/last segment)
+        """
+        lengths = self.cumulative_lengths
+        ik = np.asarray(ik, dtype=float)
+        i = np.clip(np.floor(ik), 0, len(lengths) - 2).astype(int)
+        return lengths[i] + (ik - i) * (lengths[i + 1] - lengths[i])
+
+    def get_ik(self, arc_length):
+        """
+        (float) indices of arc-length positions, inverse of get_arc_length
+        """
+        lengths = self.cumulative_lengths
+        arc_length = np.asarray(arc_length, dtype=float)
+        i = np.searchsorted(lengths, arc_length, side="right").clip(1, len(lengths) - 1) - 1
+        segment_lengths = lengths[i + 1] - lengths[i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k = np.where(segment_lengths > 0, (arc_length - lengths[i]) / segment_lengths, 0.)
+        return i + k
+
     def walk(self, start, length):
         """
         Move from a starting point for a given length in direction of the line
@@ -114,37 +152,22 @@ class PolyLine(HashedList):
         """
         if length == 0:
             return start
-        direction = sign(length)
-        length = abs(length)
-        next_value = start - start % 1 + (direction > 0)
-        difference = norm(self[start] - self[next_value])
-        length -= difference
-        #
-        while length > 0:
-            if (next_value > len(self) and direction > 0) or (next_value < 0 and direction < 0):
-                break
-            start = next_value
-            next_value += direction
-            difference = norm(self[next_value] - self[start])
-            length -= difference
-            # Length is smaller than zero
-        length = length
-        return next_value + direction * length * abs(next_value - start) / difference
+        return self.walk_many(start, length)[()]
+
+    def walk_many(self, starts, lengths):
+        """
+        Vectorized walk for arrays of starting points and/or lengths
+        """
+        return self.get_ik(self.get_arc_length(starts) + np.asarray(lengths, dtype=float))
 
     def resample(self, num_points):
         """
         redistribute line segments to be of "same" length.
         That means to start from 0 and then move length/(num_points-1)
         """
-        length = self.get_length()
-        ik = 0
-        distance = length/(num_points-1)
-        data = [self[0]]
-        for i in range(1, num_points-1):
-            ik = self.walk(ik, distance)
-            data.append(self[ik])
-
-        data.append(self[len(self)-1])
+        distance = self.get_length()/(num_points-1)
+        ik = self.get_ik(np.arange(1, num_points-1) * distance)
+        data = np.concatenate([self.data[:1], self.point_many(ik), self.data[-1:]])
 
         return self.__class__(data)
 
@@ -154,25 +177,30 @@ class PolyLine(HashedList):
         """
         if second is None:
             second = len(self) - 1
-        direction = sign(float(second - first))
-        length = 0
-        next_value = int(first - first % 1 + (direction > 0))
-        # Just to fasten up
-        if next_value > len(self) and direction < 0:
-            next_value = len(self)
-        elif next_value < 0 < direction:
-            next_value = 0
-        while next_value * direction < second * direction:
-            length += norm(self[next_value] - self[first])
-            first = next_value
-            next_value += direction
-            # Fasten up as well
-            if (next_value > len(self) and direction > 0) or (next_value < 0 and direction < 0):
-                break
-        return length + norm(self[second] - self[first])
+        return self.get_length_many(first, second)[()]
+
+    def get_length_many(self, first, second):
+        """
+        Vectorized get_length for arrays of start/end indices
+        """
+        return np.abs(self.get_arc_length(second) - self.get_arc_length(first))
+
+    def get_segment_lengthes(self, start=None, stop=None) -> np.ndarray:
+        """
+        Lengths of the segments (of List[start:stop] if start or stop are given)
+        """
+        if start is None and stop is None:
+            return np.linalg.norm(self.get_segments(), axis=1)
 
-    def get_segment_lengthes(self) -> np.ndarray:
-        return np.linalg.norm(self.get_segments(), axis=1)
+        positions = self.get_positions(start, stop)
+        points = self.point_many(positions)
+        # same as List[start:stop]: integer positions are taken as they are
+        for index in (0, -1):
+            if isinstance(positions[index], int) and 0 <= positions[index] < len(self):
+                points[index] = self.data[positions[index]]
+        points[1:-1] = self.data[positions[1:-1]]
+
+        return np.linalg.norm(points[1:] - points[:-1], axis=1)
 
     def get_segments(self):
         return self.data[1:] - self.data[:-1]
@@ -249,6 +277,13 @@ class PolyLine(HashedList):
 
 
 
+def _dot_rows(a, b):
+    """
+    row-wise dot products (same rounding as ndarray.dot for single vectors)
+    """
+    return np.matmul(a[:, np.newaxis, :], b[:, :, np.newaxis])[:, 0, 0]
+
+
 class PolyLine2D(PolyLine):
     def __add__(self, other):  # this is python default behaviour for lists
         if other.__class__ is self.__class__:
@@ -269,6 +304,36 @@ class PolyLine2D(PolyLine):
             return PolyLine2D(res.data)
         return res
 
+    def _get_segment_order(self, startpoint):
+        """
+        segment indices surrounding a startpoint (same order as rangefrom)
+        """
+        indices = np.arange(max(len(self) - 1, 0))
+        key = np.where(indices >= startpoint, 2 * (indices - startpoint) - 1, 2 * (startpoint - indices))
+        return indices[np.argsort(key, kind="stable")]
+
+    def _is_good_cut(self, indices, k):
+        return ((0 <= k) & (k < 1)) | ((k == 1) & (indices == len(self) - 1))
+
+    def get_cuts(self, p1, p2, startpoint=0, extrapolate=False, cut_only_positive=False):
+        """
+        All cuts with the line p1p2 at once (see cut)
+
+        return ik (line), ik (p1->p2) arrays
+        """
+        indices = self._get_segment_order(int(startpoint))
+        _, k, l = cut_many(self.data[indices], self.data[indices + 1], p1, p2)
+
+        good_cut = self._is_good_cut(indices, k)
+        if extrapolate:
+            extrapolated_front = (indices == 0) & (k <= 0)
+            extrapolated_back = (indices == len(self) - 2) & (k > 0)
+            good_cut |= extrapolated_front | extrapolated_back
+        if cut_only_positive:
+            good_cut &= l >= 0
+
+        return indices[good_cut] + k[good_cut], l[good_cut]
+
     def cut(self, p1, p2, startpoint=0, extrapolate=False, cut_only_positive=False):
         """
         Iterate over all cuts with the line p1p2
@@ -278,48 +343,81 @@ class PolyLine2D(PolyLine):
         """
         # TODO: we have some float issues, check if we were slightly above 1 before and are slightly
         # below 0 now -> on the point
-        startpoint = int(startpoint)
-        for i in rangefrom(len(self)-1, startpoint):
-            try:
-                # (x,y), i, k
-                pos, ik1, ik2 = cut(self[i], self[i+1], p1, p2)
-                good_cut = 0 <= ik1 < 1 or (ik1 == 1 and i == len(self)-1)
-                extrapolated_front = i == 0 and ik1 <= 0
-                extrapolated_back = i == len(self)-2 and ik1 > 0
-                extrapolated_cut = extrapolated_front or extrapolated_back
-
-                if good_cut or extrapolate and extrapolated_cut:
-                    if cut_only_positive and ik2 < 0:
-                        continue
-                    yield i+ik1, ik2
-            except np.linalg.LinAlgError:
-                continue
+        for ik1, ik2 in zip(*self.get_cuts(p1, p2, startpoint, extrapolate, cut_only_positive)):
+            yield ik1, ik2
 
     def cut_with_polyline(self, pl, startpoint=0):
-        for i, (p1, p2) in enumerate(zip(pl[:-1], pl[1:])):
-            l = norm(p2-p1)
-            for ik1, k2 in self.cut(p1, p2, startpoint, cut_only_positive=True):
-                ik2 = i + (norm(self[ik1] - p1) / l)
-                yield ik1, ik2
+        """
+        Iterate over all cuts with the segments of another line (ordered by the segments of pl)
+
+        yield ik (line), ik (pl)
+        """
+        points = np.asarray(getattr(pl, "data", pl), dtype=float)
+        indices = self._get_segment_order(int(startpoint))
+
+        # (segments of pl, segments of self)
+        _, k, l = cut_many(self.data[indices], self.data[indices + 1],
+                           points[:-1, np.newaxis], points[1:, np.newaxis])
+        good_cut = self._is_good_cut(indices, k) & (0 <= l) & (l <= 1)
 
-    def check(self):  # TODO: IMPROVE (len = len(self.data), len-=,...)
+        for segment, position in zip(*np.nonzero(good_cut)):
+            yield indices[position] + k[segment, position], segment + l[segment, position]
+
+    def get_self_cuts(self, bbox=None, chunk_size=256):
+        """
+        Crossings of non-neighbouring segments i, j > i+1 (ordered by i, j)
+        :param bbox: only cut segments with overlapping bounding boxes (default: for long lines)
+        :return: i, j, points
+        """
+        start = self.data[:-1]
+        end = self.data[1:]
+        num_segments = len(start)
+
+        if bbox is None:
+            bbox = num_segments > 500
+
+        if bbox:
+            lower = np.minimum(start, end)
+            upper = np.maximum(start, end)
+            pairs_i = []
+            pairs_j = []
+            for first in range(0, num_segments, chunk_size):
+                rows = slice(first, first + chunk_size)
+                overlap = np.all((lower <= upper[rows, np.newaxis]) & (upper >= lower[rows, np.newaxis]), axis=2)
+                i, j = np.nonzero(overlap)
+                i += first
+                pairs_i.append(i[j > i + 1])
+                pairs_j.append(j[j > i + 1])
+            i = np.concatenate(pairs_i) if pairs_i else np.zeros(0, dtype=int)
+            j = np.concatenate(pairs_j) if pairs_j else np.zeros(0, dtype=int)
+        else:
+            i, j = np.triu_indices(num_segments, 2)
+
+        points, k, l = cut_many(start[i], end[i], start[j], end[j])
+        crossing = (0 < k) & (k < 1) & (0 < l) & (l < 1)
+
+        return i[crossing], j[crossing], points[crossing]
+
+    def check(self):
         """
         Check for mistakes in the array, such as for the moment: self-cuttings,..
         """
         super(PolyLine2D, self).check()
-        for i in range(len(self.data) - 3):
-            if i > len(self.data) - 4:
+
+        # replace the loop between the first crossing segments (i, j) with the crossing point
+        # and continue with segment i (the last segment is never checked)
+        cursor_i, cursor_j = 0, 0
+        while True:
+            num_points = len(self.data)
+            i, j, points = self.get_self_cuts()
+            valid = (i <= num_points - 4) & (j <= num_points - 3)
+            valid &= (i > cursor_i) | ((i == cursor_i) & (j >= cursor_j))
+            if not np.any(valid):
                 break
-            for j in range(i + 2, len(self.data) - 2):
-                if j > len(self.data) - 3:
-                    break
-                try:
-                    temp = cut(self.data[i], self.data[i + 1], self.data[j], self.data[j + 1])
-                    if 0 < temp[1] < 1. and 0 < temp[2] < 1.:
-                        #self.data = self.data[:i] + [temp[0]] + self.data[j + 1:]
-                        self.data = np.concatenate([self.data[:i], [temp[0]], self.data[j+1:]])
-                except np.linalg.linalg.LinAlgError:
-                    continue
+
+            index = np.argmax(valid)
+            cursor_i, cursor_j = i[index], i[index] + 2
+            self.data = np.concatenate([self.data[:i[index]+1], [points[index]], self.data[j[index]+1:]])
 
         return self
 
@@ -389,45 +487,92 @@ class PolyLine2D(PolyLine):
 
         return self
 
+    @cached_property('self')
+    def miter_vectors(self):
+        """
+        Offset-directions for every point of a shifted line (see add_stuff):
+        new_point = data[index] + vector * amount / divisor
+        :return: indices, vectors, divisors
+        """
+        # cos(vectorangle(a,b)) = (a1 b1+a2 b2)/Sqrt[(a1^2+a2^2) (b1^2+b2^2)]
+        segment_normals = self.norm_segment_vectors
+        n1 = segment_normals[:-1]
+        n2 = segment_normals[1:]
+
+        data = self.data
+        d1 = data[1:-1] - data[:-2]
+        d2 = data[2:] - data[1:-1]
+        d1_squared = _dot_rows(d1, d1)
+        d2_squared = _dot_rows(d2, d2)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cosphi = _dot_rows(d1, d2) / np.sqrt(d1_squared * d2_squared)
+
+        coresize = 1e-8
+        straight = (cosphi > 0.9999) | (np.sqrt(d1_squared) < coresize) | (np.sqrt(d2_squared) < coresize)
+        reverse = ~straight & (cosphi < -0.9999)  # this is true if the direction changes 180 degree
+        corner = ~straight & ~reverse
+
+        vectors = n1.copy()
+        divisors = np.ones(len(cosphi))
+
+        if np.any(straight):
+            vectors[straight] = np.array(self.normvectors)[1:-1][straight]
+            divisors[straight] = cosphi[straight]
+
+        if np.any(corner):
+            n1 = n1[corner]
+            d1 = d1[corner] / np.sqrt(d1_squared[corner])[:, np.newaxis]
+            sign = -1. + 2. * (_dot_rows(d2[corner], n1) > 0)
+            phi = np.arccos(_dot_rows(n1, n2[corner]))
+            vectors[corner] = n1 - sign[:, np.newaxis] * d1 * np.tan(phi / 2)[:, np.newaxis]
+
+        # reversed direction: two points (one for each segment)
+        indices = np.repeat(np.arange(1, len(data) - 1), 1 + reverse)
+        second = np.zeros(len(indices), dtype=bool)
+        second[np.cumsum(1 + reverse)[reverse] - 1] = True
+        all_vectors = np.empty((len(indices), 2))
+        all_vectors[~second] = vectors
+        all_vectors[second] = n2[reverse]
+        all_divisors = np.ones(len(indices))
+        all_divisors[~second] = divisors
+
+        indices = np.concatenate([[0], indices, [len(data) - 1]])
+        all_vectors = np.concatenate([segment_normals[:1], all_vectors, segment_normals[-1:]])
+        all_divisors = np.concatenate([[1.], all_divisors, [1.]])
+
+        return indices, all_vectors, all_divisors
+
     def add_stuff(self, amount):
         """
         Shift the whole line for a given amount (->Sewing allowance)
         """
-        # cos(vectorangle(a,b)) = (a1 b1+a2 b2)/Sqrt[(a1^2+a2^2) (b1^2+b2^2)]
-        newlist = []
-        second = self.data[0]
-        third = self.data[1]
-        newlist.append(second + self.norm_segment_vectors[0] * amount)
-        for i in range(1, len(self.data) - 1):
-            first = second
-            second = third
-            third = self.data[i + 1]
-            d1 = second - first
-            d2 = third - second
-            cosphi = d1.dot(d2) / np.sqrt(d1.dot(d1) * d2.dot(d2))
-            coresize = 1e-8
-            if cosphi > 0.9999 or norm(d1) < coresize or norm(d2) < coresize:
-                newlist.append(second + self.normvectors[i] * amount / cosphi)
-            elif cosphi < -0.9999: # this is true if the direction changes 180 degree
-                n1 = self.norm_segment_vectors[i-1]
-                n2 = self.norm_segment_vectors[i]
-                newlist.append(second + self.norm_segment_vectors[i-1] * amount)
-                newlist.append(second + self.norm_segment_vectors[i] * amount)
-            else:
-                n1 = self.norm_segment_vectors[i-1]
-                n2 = self.norm_segment_vectors[i]
-                sign = -1. + 2. * (d2.dot(n1) > 0)
-                phi = np.arccos(n1.dot(n2))
-                d1 = normalize(d1)
-                ext_vec = n1 - sign * d1 * np.tan(phi / 2)
-                newlist.append(second + ext_vec * amount)
-
-                # newlist.append(cut(a, b, c, d)[0])
-        newlist.append(third + self.norm_segment_vectors[-1] * amount)
-        self.data = newlist
+        indices, vectors, divisors = self.miter_vectors
+        self.data = self.data[indices] + vectors * amount / divisors[:, np.newaxis]
 
         return self
 
+    @classmethod
+    def add_stuff_many(cls, lines, amounts):
+        """
+        Shifted copies of many lines at once (see add_stuff)
+        :param amounts: one amount for all lines or one per line
+        """
+        amounts = np.broadcast_to(np.asarray(amounts, dtype=float), (len(lines), ))
+        miters = [line.miter_vectors for line in lines]
+        if not miters:
+            return []
+
+        counts = [len(indices) for indices, _, _ in miters]
+        points = np.concatenate([line.data[indices] for line, (indices, _, _) in zip(lines, miters)])
+        vectors = np.concatenate([vectors for _, vectors, _ in miters])
+        divisors = np.concatenate([divisors for _, _, divisors in miters])
+        amounts = np.repeat(amounts, counts)
+
+        shifted = points + vectors * amounts[:, np.newaxis] / divisors[:, np.newaxis]
+
+        return [cls(data, name=line.name) for line, data in zip(lines, np.split(shifted, np.cumsum(counts)[:-1]))]
+
     def mirror(self, p1, p2):
         """
         Mirror against a line through p1 and p2
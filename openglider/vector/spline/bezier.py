@@ -21,13 +21,34 @@ from __future__ import division
 
 import numpy as np
 
-from openglider.utils.cache import HashedList
+from openglider.utils.cache import HashedList, LRUCache, CacheStatistics
 from openglider.vector import norm, Interpolation
 from openglider.vector.transformation import Reflection
 from openglider.utils import dualmethod
 
 
+_basis_matrix_cache = LRUCache(maxsize=256, statistics=CacheStatistics("spline basis matrices"))
+
+
+def get_basis_matrix(basefactory, numpoints, values):
+    """
+    Shared, memoized basis matrix (len(values) x numpoints) of a basefactory
+    """
+    values = np.asarray(values, dtype=float)
+    key = (basefactory.cache_key, numpoints, values.shape, values.tobytes())
+    matrix = _basis_matrix_cache.get(key)
+
+    if matrix is None:
+        matrix = basefactory.get_matrix(numpoints, values)
+        matrix.flags.writeable = False
+        _basis_matrix_cache.set(key, matrix)
+
+    return matrix
+
+
 class _BernsteinFactory():
+    cache_key = ("bernstein", )
+
     def __init__(self):
         self.bases = {}
 
@@ -41,6 +62,15 @@ class _BernsteinFactory():
 
         return self.bases[degree]
 
+    def get_matrix(self, degree, values):
+        """
+        Evaluate all basis functions for an array of values -> (len(values), degree)
+        """
+        x = np.asarray(values, dtype=float)[:, np.newaxis]
+        n = np.arange(degree)
+        factors = np.array([choose(degree - 1, i) for i in n])
+        return factors * (x ** n) * ((1 - x) ** (degree - 1 - n))
+
     def __json__(self):
         return {}
 
@@ -91,14 +121,18 @@ class Bezier(HashedList):
         return spline
 
     def __call__(self, value):
-        dim = len(self.data[0])
-        assert 0 <= value <= 1, "value must be in the range (0,1), not {}".format(value)
+        """
+        Evaluate the curve for a value (or an array of values) in the range (0,1)
+        """
+        value = np.asarray(value, dtype=float)
+        assert np.all((0 <= value) & (value <= 1)), "value must be in the range (0,1), not {}".format(value)
 
-        val = np.zeros(dim)
-        base = self.basefactory(len(self.data))
-        for i, point in enumerate(self.data):
-            val += point * base[i](value)
-        return val
+        if value.ndim == 0:
+            matrix = self.basefactory.get_matrix(len(self.data), value[np.newaxis])
+            return matrix.dot(self.data)[0]
+
+        result = get_basis_matrix(self.basefactory, len(self.data), value.ravel()).dot(self.data)
+        return result.reshape(value.shape + result.shape[1:])
 
     @property
     def numpoints(self):
@@ -110,11 +144,11 @@ class Bezier(HashedList):
     @numpoints.setter
     def numpoints(self, num_ctrl, num_points=50):
         if not num_ctrl == self.numpoints:
-            data = [self(i) for i in np.linspace(0, 1, num_points)]
+            data = self(np.linspace(0, 1, num_points))
             self.fit(data, num_ctrl)
 
     def change_base(self, base, num_points=50):
-        data = [self(i) for i in np.linspace(0, 1, num_points)]
+        data = self(np.linspace(0, 1, num_points))
         self.basefactory = base
         self._matrix = None
         self.fit(data, self.numpoints)
@@ -133,18 +167,13 @@ class Bezier(HashedList):
         Fit to a given set of points with a certain number of spline-points (default=3)
         if start (/ end) is True, the first (/ last) point of the Curve is included
         """
-        base = self.basefactory(numpoints)
-        matrix = np.matrix(
-            [[base[column](row * 1. / (len(points) - 1))
-                for column in range(len(base))]
-                    for row in range(len(points))])
+        values = np.arange(len(points)) * 1. / (len(points) - 1)
+        matrix = get_basis_matrix(self.basefactory, numpoints, values)
 
         if not start and not end:
-            matrix = np.linalg.pinv(matrix)
-            out = np.array(matrix * points)
-            return out
+            return np.linalg.pinv(matrix).dot(points)
         else:
-            A1 = np.array(matrix)
+            A1 = matrix
             A2 = []
             points2 = []
             points1 = np.array(points)
@@ -171,7 +200,7 @@ class Bezier(HashedList):
                 rhs1 = np.array(A1.T.dot(point))
                 rhs2 = np.array((A1.T.dot(A2)).dot(points2[dim])).T
                 solution.append(np.array(A1_inv.dot(rhs1 - rhs2)))
-            solution = np.matrix(solution).T.tolist()
+            solution = np.array(solution).T.tolist()
             if start:
                 solution.insert(0, points[0])
             if end:
@@ -194,11 +223,8 @@ class Bezier(HashedList):
         num_ctrl_pts = len(constraint)
 
         # create the base matrix:
-        base = self.basefactory(num_ctrl_pts)
-        matrix = np.array(
-            [[base[column](row * 1. / (len(points) - 1))
-                for column in range(len(base))]
-                    for row in range(len(points))])
+        values = np.arange(len(points)) * 1. / (len(points) - 1)
+        matrix = get_basis_matrix(self.basefactory, num_ctrl_pts, values)
 
         # create the b vector for each dim
         b = np.array(list(zip(*points)))
@@ -252,16 +278,8 @@ class Bezier(HashedList):
         self.controlpoints = [p*[x,y] for p in self.controlpoints]
 
     def get_matrix(self, num=50):
-        num_points = len(self._data)
-        if self._matrix is not None and self._matrix.shape == (num, num_points):
-            return self._matrix
-        else:
-            self._matrix = np.ndarray([num, num_points])
-            functions = self.basefactory(num_points)
-            for row, value in enumerate(np.linspace(0, 1 , num)):
-                for col, foo in enumerate(functions):
-                    self._matrix[row, col] = foo(value)
-            return self._matrix
+        self._matrix = get_basis_matrix(self.basefactory, len(self._data), np.linspace(0, 1, num))
+        return self._matrix
 
     def get_sequence(self, num=None):
         if num is None:
@@ -309,8 +327,8 @@ class SymmetricBezier(Bezier):
     @numpoints.setter
     def numpoints(self, num_ctrl, num_points=50):
         if not num_ctrl == self.numpoints:
-            data = [self(i) for i in np.linspace(0, 1, num_points)]
-            self.fit(np.array(data), num_ctrl)
+            data = self(np.linspace(0, 1, num_points))
+            self.fit(data, num_ctrl)
 
     @dualmethod
     def fit(cls, data, numpoints=3, start=True, end=True):
@@ -1,3 +1,5 @@
+import numpy as np
+
 from openglider.vector.spline.bezier import Bezier, SymmetricBezier
 from openglider.utils import dualmethod
 
@@ -14,6 +16,44 @@ class BSplineBase():
 
         return self.bases[numpoints]
 
+    @property
+    def cache_key(self):
+        return "bspline", self.degree
+
+    def get_matrix(self, numpoints, values):
+        """
+        Evaluate all basis functions for an array of values -> (len(values), numpoints)
+        (Cox-de Boor recursion, evaluated bottom-up for all basis functions at once)
+        """
+        t = np.asarray(values, dtype=float)
+        knots = self.make_knot_vector(self.degree, numpoints)
+
+        basis = [((knots[i+1] >= t) & (t > knots[i])).astype(float) for i in range(len(knots) - 1)]
+        for degree in range(1, self.degree + 1):
+            basis_lower = basis
+            basis = []
+            for i in range(len(knots) - 1 - degree):
+                out = np.zeros(t.shape)
+                t_this = knots[i]
+                t_next = knots[i+1]
+                t_precog = knots[i+degree]
+                t_horizon = knots[i+degree+1]
+
+                bottom = (t_precog-t_this)
+                if bottom != 0:
+                    out = (t-t_this)/bottom * basis_lower[i]
+
+                bottom = (t_horizon-t_next)
+                if bottom != 0:
+                    out = out + (t_horizon-t)/bottom * basis_lower[i+1]
+
+                if i == 0:
+                    out = np.where(t == 0, 1., out)
+
+                basis.append(out)
+
+        return np.array(basis).T
+
     def __json__(self):
         return {"degree": self.degree}
 
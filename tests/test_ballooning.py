@@ -17,6 +17,7 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with OpenGlider.  If not, see <http://www.gnu.org/licenses/>.
+import math
 import unittest
 import random
 
@@ -52,6 +53,21 @@ class TestBallooningBezier(unittest.TestCase):
         for x in x_values:
             self.assertAlmostEqual(b1[x]+b2[x], mixed[x], places=2)
 
+    def test_arcsinc(self):
+        values = [random.random() for _ in range(100)]
+        phi = ballooning.Ballooning.arcsinc(values)
+        for value, phi_value in zip(values, phi):
+            self.assertAlmostEqual(phi_value, ballooning.Ballooning.arcsinc(value))
+            self.assertAlmostEqual(math.sin(phi_value) / phi_value, value, places=5)
+
+    def test_phi_array(self):
+        x_values = [2*random.random()-1 for _ in range(100)]
+        phi = self.ballooning(x_values)
+        tension = self.ballooning.get_tension_factor(x_values)
+        for x, phi_value, tension_value in zip(x_values, phi, tension):
+            self.assertAlmostEqual(phi_value, self.ballooning(x))
+            self.assertAlmostEqual(tension_value, self.ballooning.get_tension_factor(x))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -21,8 +21,11 @@ from __future__ import division
 
 import unittest
 import random
+import warnings
 
-from openglider.vector.spline import Bezier
+import numpy as np
+
+from openglider.vector.spline import Bezier, BSplineBase
 
 
 class TestBezier(unittest.TestCase):
@@ -35,6 +38,27 @@ class TestBezier(unittest.TestCase):
         self.assertAlmostEqual(self.bezier(val)[0], self.bezier(val)[0])
         self.assertAlmostEqual(self.bezier(val)[1], self.bezier(val)[1])
 
+    def test_get_values(self):
+        values = np.linspace(0, 1, 20)
+        points = self.bezier(values)
+        for val, point in zip(values, points):
+            self.assertAlmostEqual(self.bezier(val)[0], point[0])
+            self.assertAlmostEqual(self.bezier(val)[1], point[1])
+
+    def test_get_values_2d(self):
+        values = np.linspace(0, 1, 12).reshape(3, 4)
+        points = self.bezier(values)
+        self.assertEqual(points.shape, (3, 4, 2))
+        self.assertTrue(np.allclose(points.reshape(12, 2), self.bezier(values.ravel())))
+
+    def test_basis_matrix(self):
+        values = np.linspace(0, 1, 20)
+        for basefactory in (self.bezier.basefactory, BSplineBase(2), BSplineBase(3)):
+            matrix = basefactory.get_matrix(8, values)
+            for row, val in zip(matrix, values):
+                for value, function in zip(row, basefactory(8)):
+                    self.assertAlmostEqual(value, function(val))
+
     def test_fit(self):
         num = len(self.bezier.controlpoints)
         to_fit = self.bezier.get_sequence()
@@ -43,6 +67,13 @@ class TestBezier(unittest.TestCase):
             self.assertAlmostEqual(p1[0], p2[0], 0)
             self.assertAlmostEqual(p1[1], p2[1], 0)
 
+    def test_fit_no_matrix(self):
+        to_fit = self.bezier.get_sequence()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", PendingDeprecationWarning)
+            Bezier.fit(to_fit, numpoints=5)
+            Bezier.fit(to_fit, numpoints=5, start=False, end=False)
+
     def test_length(self):
         self.bezier.controlpoints = [[0, 0], [2, 0]]
         self.assertAlmostEqual(self.bezier.get_length(10), 2.)
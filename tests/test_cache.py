@@ -0,0 +1,111 @@
+import concurrent.futures
+import unittest
+
+import numpy as np
+
+from openglider.utils.cache import (CachedObject, LRUCache, cached_function, cached_property, clear_cache,
+                                    get_cache_statistics)
+
+
+class Cached(CachedObject):
+    hashlist = ("value", )
+
+    def __init__(self, value):
+        self.value = value
+
+    @cached_property("value")
+    def squared(self):
+        return np.ones(10) * self.value**2
+
+    @cached_function("value", maxsize=2)
+    def multiplied(self, factor):
+        return np.ones(10) * self.value * factor
+
+
+class Slotted(object):
+    __slots__ = ("value", )
+    hashlist = ("value", )
+
+    def __init__(self, value):
+        self.value = value
+
+    @cached_property("value")
+    def squared(self):
+        return self.value**2
+
+
+class TestCache(unittest.TestCase):
+    def test_property(self):
+        obj = Cached(2)
+        squared = obj.squared
+        self.assertIs(squared, obj.squared)
+        self.assertEqual(squared[0], 4)
+
+        obj.value = 3
+        self.assertEqual(obj.squared[0], 9)
+
+        other = Cached(4)
+        self.assertEqual(other.squared[0], 16)
+        self.assertEqual(obj.squared[0], 9)
+
+    def test_property_release(self):
+        statistics = Cached.squared.statistics
+        entries = statistics.entries
+        obj = Cached(2)
+        obj.squared
+        self.assertEqual(statistics.entries, entries + 1)
+        del obj
+        self.assertEqual(statistics.entries, entries)
+
+    def test_property_no_weakref(self):
+        with self.assertLogs("openglider.utils.cache", "WARNING") as logs:
+            self.assertEqual(Slotted(2).squared, 4)
+            self.assertEqual(Slotted(3).squared, 9)
+        # warned once per class
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Slotted", logs.output[0])
+
+    def test_lru_threads(self):
+        cache = LRUCache(maxsize=8)
+
+        def fill(offset):
+            for i in range(2000):
+                cache.set((offset, i % 16), np.ones(4))
+                cache.get((offset, (i + 1) % 16))
+                cache.pop((offset, (i + 2) % 16))
+
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            list(executor.map(fill, range(4)))
+
+        self.assertLessEqual(len(cache), 8)
+        self.assertEqual(cache.nbytes, len(cache) * np.ones(4).nbytes)
+        self.assertEqual(set(cache.sizes), set(cache.data))
+
+    def test_function_eviction(self):
+        statistics = Cached.multiplied.statistics
+        statistics.reset()
+        obj = Cached(2)
+
+        for factor in range(5):
+            self.assertEqual(obj.multiplied(factor)[0], 2 * factor)
+
+        self.assertEqual(len(obj.multiplied.cache), 2)
+        self.assertEqual(obj.multiplied.cache.nbytes, 2 * np.ones(10).nbytes)
+        self.assertEqual(statistics.evictions, 3)
+
+        obj.multiplied(4)
+        self.assertEqual(statistics.hits, 1)
+        self.assertEqual(statistics.misses, 5)
+
+    def test_statistics(self):
+        obj = Cached(2)
+        obj.multiplied(1)
+        names = [stats["name"] for stats in get_cache_statistics()]
+        self.assertIn(Cached.multiplied.statistics.name, names)
+
+        clear_cache()
+        self.assertEqual(len(obj.multiplied.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
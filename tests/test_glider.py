@@ -17,11 +17,15 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with OpenGlider.  If not, see <http://www.gnu.org/licenses/>.
+import math
 import random
 import unittest
 
+import numpy as np
+
 from common import *
 import openglider.glider
+from openglider.glider.cell.elements import integrate_3d_shaping
 
 
 class GliderTestClass(TestCase):
@@ -67,10 +71,112 @@ class TestGlider(GliderTestClass):
     def copy_complete(self):
         self.glider.copy_complete()
 
+    def test_iterate_target_length(self):
+        telemetry = self.glider.lineset.iterate_target_length(tolerance=1e-6)
+        self.assertLessEqual(telemetry[-1]["residual"], 1e-6)
+        for line in self.glider.lineset.lines:
+            if line.target_length is not None:
+                self.assertAlmostEqual(line.get_stretched_length(), line.target_length, 5)
+
     def test_mean_rib(self):
         for cell in self.glider.cells:
             cell.mean_rib(10)
 
+    def test_return_ribs(self):
+        num_midribs = random.randint(0, 5)
+        ribs = self.glider.return_ribs(num_midribs)
+        self.assertEqual(len(ribs), len(self.glider.cells) * (num_midribs + 1) + 1)
+
+        for i, cell in enumerate(self.glider.cells):
+            for k in range(num_midribs + 1):
+                y = k / (num_midribs + 1)
+                rib = ribs[i * (num_midribs + 1) + k]
+                for point_1, point_2 in zip(cell.midrib(y).data, rib):
+                    for coord_1, coord_2 in zip(point_1, point_2):
+                        self.assertAlmostEqual(coord_1, coord_2)
+
+    def test_midrib_with_numpy(self):
+        # the numpy-path always gives the ballooned midrib (as used for miniribs)
+        cell = random.choice(self.glider.cells)
+        y = random.random()
+        ballooned = cell.basic_cell.midribs([y])[0]
+        for kwargs in ({}, {"ballooning": False}, {"arc_argument": False}):
+            self.assertTrue(np.allclose(cell.basic_cell.midrib(y, **kwargs).data, ballooned))
+
+        unballooned = cell.basic_cell.midribs([y], ballooning=False)[0]
+        self.assertTrue(np.allclose(cell.basic_cell.midrib(y, ballooning=False, with_numpy=False).data, unballooned))
+
+    def test_midribs(self):
+        cell = random.choice(self.glider.cells)
+        y_values = [0, random.random(), random.random(), 1]
+        for kwargs in ({}, {"arc_argument": False}, {"close_trailing_edge": True}, {"ballooning": False}):
+            midribs = cell.midribs(y_values, **kwargs)
+            self.assertIs(midribs, cell.midribs(y_values, **kwargs))
+            self.assertEqual(midribs.shape, (4, len(cell.prof1.data), 3))
+
+            for y, rib in zip(y_values, midribs):
+                for point_1, point_2 in zip(cell.midrib(y, **kwargs).data, rib):
+                    for coord_1, coord_2 in zip(point_1, point_2):
+                        self.assertAlmostEqual(coord_1, coord_2)
+
+        midribs = cell.midribs(y_values, close_trailing_edge=True)
+        for y, rib in zip(y_values, midribs):
+            for index in (0, -1):
+                point = cell.prof1.data[index] + y * (cell.prof2.data[index] - cell.prof1.data[index])
+                for coord_1, coord_2 in zip(point, rib[index]):
+                    self.assertAlmostEqual(coord_1, coord_2)
+
+    def test_flattened_cell(self):
+        cell = random.choice(self.glider.cells)
+        numribs = random.randint(3, 20)
+        flattened = cell.get_flattened_cell(numribs)
+        self.assertEqual(flattened["inner_grid"].shape, (numribs + 2, len(cell.prof1.data), 2))
+
+        left, right = flattened["ballooned"]
+        for line, inner in ((left, flattened["inner"][0]), (right, flattened["inner"][-1])):
+            for point_1, point_2 in zip(line, inner):
+                for coord_1, coord_2 in zip(point_1, point_2):
+                    self.assertAlmostEqual(coord_1, coord_2)
+
+        # the ballooned lines have the length of the ribs (up to the discretization)
+        for line, profile in ((left, cell.prof1), (right, cell.prof2)):
+            length = profile.get_length()
+            self.assertAlmostEqual(line.get_length(), length, delta=length * 1e-3)
+
+    def test_integrate_3d_shaping(self):
+        sigma = 0.04
+        lengths_3d = [[random.random() * 0.1 for _ in range(random.randint(0, 10))] for _ in range(5)]
+        lengths_2d = [[length * random.random() for length in lengths] for lengths in lengths_3d]
+        front, back, total = integrate_3d_shaping(lengths_2d, lengths_3d, sigma)
+
+        for i, (line_2d, line_3d) in enumerate(zip(lengths_2d, lengths_3d)):
+            amount = distance = 0
+            for l2d, l3d in zip(line_2d[::-1], line_3d[::-1]):
+                x = math.erf((distance + l3d) / (sigma*math.sqrt(2))) - math.erf(distance / (sigma*math.sqrt(2)))
+                amount += (l3d - l2d) / l3d * x
+                distance += l3d
+
+            self.assertAlmostEqual(back[i], amount * math.sqrt(math.pi/2) * sigma)
+            self.assertAlmostEqual(total[i], sum(line_3d) - sum(line_2d))
+
+    def test_calculate_3d_shaping(self):
+        cell = random.choice(self.glider.cells)
+        for panel in cell.panels:
+            panel.cut_front["type"] = "cut_3d"
+        cell.calculate_3d_shaping(numribs=5)
+
+        for panel in cell.panels:
+            self.assertEqual(len(panel.cut_front["amount_3d"]), 7)
+            self.assertGreaterEqual(min(panel.cut_front["amount_3d"]), 0)
+
+    def test_hull_indices(self):
+        num_midribs = random.randint(0, 5)
+        vertices, polygons, boundary = self.glider._get_mesh_hull_indexed(num_midribs)
+        numpoints = len(self.glider.ribs[0].profile_3d.data)
+        self.assertEqual(len(vertices), (len(self.glider.cells) * (num_midribs + 1) + 1) * numpoints)
+        self.assertEqual(polygons["hull"].max(), len(vertices) - 2)
+        self.assertEqual(len(boundary["ribs"]), len(self.glider.cells) * (numpoints - 1))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
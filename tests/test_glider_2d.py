@@ -2,6 +2,9 @@ import unittest
 
 import tempfile
 import os
+
+import numpy as np
+
 from common import *
 from openglider import jsonify
 from openglider.glider import ParametricGlider
@@ -20,6 +23,15 @@ class GliderTestCase2D(TestCase):
         glider = self.glider2d.get_glider_3d()
         self.assertAlmostEqual(glider.span, 2*self.glider2d.shape.span, 2)
 
+    def test_merge_profiles(self):
+        factors = [0, 0.3, len(self.glider2d.profiles) - 1]
+        x_values = self.glider2d.profiles[0].x_values
+        profiles = self.glider2d.get_merge_profiles(factors, x_values)
+        for factor, profile in zip(factors, profiles):
+            profile_single = self.glider2d.get_merge_profile(factor)
+            profile_single.x_values = x_values
+            self.assertTrue(np.allclose(profile.data, profile_single.data))
+
     def test_export(self):
         exp = jsonify.dumps(self.glider2d)
         imp = jsonify.loads(exp)['data']
@@ -80,6 +80,18 @@ class TestGlider(TestCase):
         all.export_dxf(dxfile)
         all.export_ntv(ntvfile)
 
+        # one flattening, all files at once
+        ntvfile_2 = self.tempfile("kite_plots_2.ntv")
+        paths = all.export_all([("svg", self.tempfile("kite_plots_2.svg")), ("dxf", dxfile, "AC1021"), ("ntv", ntvfile_2)])
+        self.assertEqual(paths[-1], ntvfile_2)
+        with open(ntvfile) as file_1, open(ntvfile_2) as file_2:
+            # same content except for the filename in the head
+            self.assertEqual(file_1.readlines()[1:], file_2.readlines()[1:])
+
+        # the layout drawing is built by the same exporter
+        with open(path) as svgfile:
+            self.assertEqual(svgfile.read().splitlines()[-1], all.get_svg_drawing().tostring())
+
     def test_export_glider_json(self):
         with open(self.tempfile('kite_3d.json'), "w+") as tmp:
             jsonify.dump(self.glider, tmp)
@@ -1,8 +1,14 @@
+import copy
 import unittest
 import os
 
+import numpy as np
+
 from openglider.lines.import_text import import_lines
 from openglider.lines import LineSet
+from openglider.lines.elements import SagMatrixStructure
+from openglider.lines.loadcases import LoadCase
+from openglider.lines.line_types import LineType
 
 
 test_dir = os.path.dirname(os.path.abspath(__file__))
@@ -21,6 +27,8 @@ class TestLines(unittest.TestCase):
 
         thalines._calc_sag()
 
+        return thalines
+
     def test_case_1(self):
         self.runcase(test_dir+"/lines/TEST_INPUT_FILE_1.txt")
 
@@ -33,6 +41,113 @@ class TestLines(unittest.TestCase):
     def test_case_4(self):
         self.runcase(test_dir+"/lines/TEST_INPUT_FILE_4.txt")
 
+    def test_sparse_sag_solver(self):
+        lineset = self.runcase(test_dir+"/lines/TEST_INPUT_FILE_4.txt")
+        dense_solution = np.linalg.solve(lineset.mat.matrix, lineset.mat.rhs)
+        self.assertTrue(np.allclose(dense_solution, lineset.mat.solution))
+
+        structure = lineset.mat.structure
+        lineset._calc_sag()
+        self.assertIs(lineset.mat.structure, structure)
+
+    def test_sag_structure_duplicates(self):
+        # a repeated (row, column) would be summed by the sparse and overwritten by the dense matrix
+        with self.assertRaises(ValueError):
+            SagMatrixStructure(2, [0, 1, 1], [0, 1, 1])
+
+    def test_topology(self):
+        lineset = self.runcase(test_dir+"/lines/TEST_INPUT_FILE_4.txt")
+        topology = lineset.topology
+        order = topology.lines_bottom_up
+        self.assertEqual(len(order), len(lineset.lines))
+        for line in order:
+            for upper_line in lineset.get_upper_connected_lines(line.upper_node):
+                self.assertLess(order.index(line), order.index(upper_line))
+
+        lineset.lines += []
+        self.assertIsNot(lineset.topology, topology)
+
+    def test_topology_changed_nodes(self):
+        lineset = self.runcase(test_dir+"/lines/TEST_INPUT_FILE_4.txt")
+        line = lineset.lowest_lines[0]
+        upper_lines = lineset.get_upper_connected_lines(line.upper_node)
+        self.assertTrue(upper_lines)
+
+        # swap the nodes
+        topology = lineset.topology
+        line.lower_node, line.upper_node = line.upper_node, line.lower_node
+        self.assertIsNot(lineset.topology, topology)
+        self.assertNotIn(line, lineset.lowest_lines)
+        self.assertIn(line, lineset.get_upper_connected_lines(line.lower_node))
+        line.lower_node, line.upper_node = line.upper_node, line.lower_node
+        self.assertIn(line, lineset.lowest_lines)
+
+        # replace a line (same number of lines)
+        topology = lineset.topology
+        new_line = copy.copy(line)
+        lineset.lines[lineset.lines.index(line)] = new_line
+        self.assertIsNot(lineset.topology, topology)
+        self.assertIn(new_line, lineset.lowest_lines)
+        self.assertNotIn(line, lineset.lowest_lines)
+
+    def test_target_length_geometry(self):
+        lineset = LineSet(import_lines(test_dir+"/lines/TEST_INPUT_FILE_1.txt")["LINES"][2], [10, 0, 1])
+        # upper lines listed before their lower lines
+        lineset.lines = lineset.lines[::-1]
+        lineset.recalc()
+        for line in lineset.lines:
+            line.init_length = line.length_no_sag
+        lineset.recalc()
+        for line in lineset.lines:
+            line.target_length = line.get_stretched_length() * 1.1
+
+        lineset.iterate_target_length(steps=1)
+        for line in lineset.lines:
+            if line.upper_node.type == 1:
+                self.assertAlmostEqual(line.length_no_sag, line.init_length)
+
+    def test_vectorized_recalc(self):
+        for i in range(1, 5):
+            path = test_dir + "/lines/TEST_INPUT_FILE_{}.txt".format(i)
+            lineset = LineSet(import_lines(path)["LINES"][2], [10, 0, 1])
+            lineset_vectorized = lineset.copy()
+
+            lineset.recalc(iterations=3)
+            lineset_vectorized.recalc(iterations=3, vectorized=True)
+
+            for line_1, line_2 in zip(lineset.lines, lineset_vectorized.lines):
+                self.assertAlmostEqual(line_1.force, line_2.force)
+                self.assertAlmostEqual(line_1.sag_par_1, line_2.sag_par_1)
+                self.assertAlmostEqual(line_1.sag_par_2, line_2.sag_par_2)
+                self.assertTrue(np.allclose(line_1.upper_node.vec, line_2.upper_node.vec))
+
+    def test_arrays_line_type(self):
+        lineset = self.runcase(test_dir+"/lines/TEST_INPUT_FILE_4.txt")
+        weight = lineset.get_weight()
+
+        line_type = LineType.get("liros.dfl350")
+        for line in lineset.lines:
+            line.type = line_type
+        weight_per_length = line_type.weight if line_type.weight is not None else line_type.predict_weight()
+        expected = weight_per_length * sum(line.length_with_sag for line in lineset.lines)
+
+        self.assertNotAlmostEqual(weight, expected)
+        self.assertAlmostEqual(lineset.get_weight(), expected)
+
+    def test_load_cases(self):
+        lineset = LineSet(import_lines(test_dir+"/lines/TEST_INPUT_FILE_4.txt")["LINES"][2], [10, 0, 1])
+        lineset.recalc()
+        load_cases = [LoadCase([10, 0, 1]), LoadCase([12, 0, 1], force_factor=1.2)]
+        result = lineset.solve_load_cases(load_cases)
+
+        self.assertEqual(result.force.shape, (2, len(lineset.lines)))
+        for line_no, line in enumerate(lineset.lines):
+            self.assertAlmostEqual(result.force[0, line_no], line.force)
+            self.assertAlmostEqual(result.force[1, line_no], line.force * 1.2)
+
+        table = result.get_table()
+        self.assertEqual(table.num_rows, 2 * len(lineset.lines) + 1)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -1,11 +1,15 @@
+import os
+import tempfile
 import unittest
 
+import numpy as np
 
 from common import *
 
-from openglider.mesh import Mesh, Vertex, Polygon
+from openglider.mesh import Mesh, MeshArrays, Vertex, Polygon, export
 import openglider
 from openglider.utils.distribution import Distribution
+from openglider.glider.in_out import export_3d
 
 
 class TestMesh(TestCase):
@@ -28,6 +32,84 @@ class TestMesh(TestCase):
             matches = [vertex.is_equal(p) for p in m3.vertices]
             self.assertTrue(any(matches))
 
+    def test_mesh_arrays(self):
+        vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]], dtype=float)
+        quads = np.array([[0, 1, 3, 2]], dtype=np.int32)
+        mesh = MeshArrays.from_indexed(vertices, {"a": quads})
+        self.assertTrue(np.shares_memory(mesh.vertices, vertices))
+        self.assertTrue(np.shares_memory(mesh.get_faces("a"), quads))
+
+        mesh = MeshArrays.from_indexed(vertices, {"a": quads, "b": [[0, 1], [1, 2, 3]]}, {"j": [0, 1]})
+
+        mesh += mesh.copy()
+        self.assertEqual(mesh.num_vertices, 8)
+        self.assertEqual(mesh.groups, {"a": (0, 2), "b": (2, 6)})
+        self.assertEqual(mesh.get_faces("a").tolist(), [[0, 1, 3, 2], [4, 5, 7, 6]])
+        self.assertEqual(mesh.boundaries["j"].tolist(), [0, 1, 4, 5])
+
+        triangles = mesh.triangularize()
+        self.assertEqual(triangles.get_faces("a").tolist(), [[0, 1, 3], [3, 2, 0], [4, 5, 7], [7, 6, 4]])
+
+    def test_glider_mesh_arrays(self):
+        mesh = self.glider.get_mesh(midribs=1)
+        mesh_arrays = self.glider.get_mesh_arrays(midribs=1)
+        vertices, polygons, boundaries = mesh.get_indexed()
+        self.assertEqual(set(polygons), set(mesh_arrays.groups))
+        for name, faces in polygons.items():
+            self.assertEqual(len(faces), len(mesh_arrays.get_faces(name)))
+
+        mesh_2 = mesh_arrays.get_mesh()
+        self.assertEqual(len(mesh_2.vertices), len(vertices))
+
+    def test_weld(self):
+        mesh = self.glider.get_mesh(midribs=1)
+        mesh_arrays = self.glider.get_mesh_arrays(midribs=1)
+        merged = mesh.weld()
+        self.assertGreater(sum(merged.values()), 0)
+        self.assertEqual(merged, mesh_arrays.weld())
+        self.assertEqual(len(mesh.vertices), len(np.unique(mesh_arrays.indices)))
+
+    def test_export(self):
+        path = os.path.join(tempfile.gettempdir(), "mesh")
+        mesh = self.glider.get_mesh_hull(num_midribs=1)
+        mesh_arrays = MeshArrays.from_mesh(mesh)
+
+        mesh.export_obj(path + ".obj")
+        with open(path + ".obj") as infile:
+            self.assertEqual(infile.read().count("\nf "), len(mesh.polygons["hull"]))
+        self.assertEqual(mesh_arrays.export_obj(), "".join(export.iter_obj([mesh_arrays])))
+
+        # same default format for Mesh and MeshArrays
+        mesh.export_ply(path + ".ply")
+        with open(path + ".ply", "rb") as infile:
+            ply = infile.read()
+        mesh_arrays.export_ply(path + ".ply")
+        with open(path + ".ply", "rb") as infile:
+            self.assertEqual(infile.read(), ply)
+        self.assertTrue(ply.startswith(b"ply\nformat ascii 1.0"))
+
+        mesh_arrays.export_ply(path + ".ply", binary=True)
+        with open(path + ".ply", "rb") as infile:
+            self.assertTrue(infile.read().startswith(b"ply\nformat binary_little_endian 1.0"))
+
+        mesh_arrays.export_stl(path + ".stl")
+        self.assertEqual(os.path.getsize(path + ".stl"), 84 + 50 * 2 * mesh_arrays.num_faces)
+
+    def test_export_glider_obj(self):
+        path = os.path.join(tempfile.gettempdir(), "glider.obj")
+        export_3d.export_obj(self.glider, path, midribs=1)
+        vertices = 0
+        referenced = set()
+        with open(path) as infile:
+            for line in infile:
+                if line.startswith("v "):
+                    vertices += 1
+                elif line.startswith(("f ", "l ")):
+                    referenced.update(int(node.split("/")[0]) for node in line.split()[1:])
+
+        # no unused vertices
+        self.assertEqual(referenced, set(range(1, vertices + 1)))
+
     def test_glider_mesh(self):
         dist = Distribution.from_nose_cos_distribution(30, 0.2)
         dist.add_glider_fixed_nodes(self.glider)
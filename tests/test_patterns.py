@@ -1,10 +1,12 @@
 import unittest
+import unittest.mock
 
 import tempfile
 import os
 import openglider
 import openglider.plots
 import openglider.plots.glider
+from openglider.plots.store import get_dependency_hash
 from common import TestCase
 
 
@@ -16,6 +18,67 @@ class TestPlots(TestCase):
         self.glider_3d = self.glider_2d.get_glider_3d()
         self.plotmaker = openglider.plots.PlotMaker(self.glider_3d)
 
+    def test_unwrap_parallel(self):
+        config = {"midribs": 10}
+        serial = openglider.plots.PlotMaker(self.glider_3d, config).unwrap()
+        config["unwrap_processes"] = 2
+        parallel = openglider.plots.PlotMaker(self.glider_2d.get_glider_3d(), config).unwrap()
+
+        self.assertEqual([part.name for part in serial.panels.parts], [part.name for part in parallel.panels.parts])
+        self.assertEqual(len(serial.ribs), len(parallel.ribs))
+        self.assertEqual([len(dribs) for dribs in serial.dribs.values()], [len(dribs) for dribs in parallel.dribs.values()])
+
+        for part_1, part_2 in zip(serial.panels.parts, parallel.panels.parts):
+            for point_1, point_2 in zip(part_1.bbox, part_2.bbox):
+                for coord_1, coord_2 in zip(point_1, point_2):
+                    self.assertAlmostEqual(coord_1, coord_2)
+
+    def test_rib_payload(self):
+        # only the cells and attachment points of the rib are sent to a worker
+        for rib in self.glider_3d.ribs:
+            ribplot, payload_rib, rib_glider, config = self.plotmaker._get_rib_payload(rib)
+            self.assertIs(payload_rib, rib)
+            self.assertEqual(rib_glider.cells, [cell for cell in self.glider_3d.cells if rib in cell.ribs])
+            self.assertEqual(rib_glider.get_rib_attachment_points(rib), self.glider_3d.get_rib_attachment_points(rib))
+
+            rib_plot = ribplot(rib, config)
+            rib_plot.flatten(self.glider_3d)
+            part = openglider.plots.glider._unwrap_rib((ribplot, rib, rib_glider, config))
+            self.assertEqual(part.bbox, rib_plot.plotpart.bbox)
+
+    def test_unwrap_stored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = {"midribs": 10, "pattern_store": directory}
+            first = openglider.plots.PlotMaker(self.glider_3d, config).unwrap()
+            num_parts = len(self.glider_3d.cells) + len(self.glider_3d.ribs)
+            self.assertEqual(len(os.listdir(directory)), num_parts)
+
+            glider_3d = self.glider_2d.get_glider_3d()
+            second = openglider.plots.PlotMaker(glider_3d, config).unwrap()
+            self.assertEqual(len(os.listdir(directory)), num_parts)
+            self.assertEqual([part.name for part in first.panels.parts], [part.name for part in second.panels.parts])
+            for part_1, part_2 in zip(first.panels.parts, second.panels.parts):
+                self.assertEqual(part_1.dependencies, part_2.dependencies)
+                self.assertEqual(part_1.bbox, part_2.bbox)
+
+            # only the changed cell and its two ribs are unwrapped again
+            glider_3d.cells[2].panels[0].cut_back["left"] -= 0.01
+            third = openglider.plots.PlotMaker(glider_3d, config).unwrap()
+            self.assertEqual(len(os.listdir(directory)), num_parts + 3)
+
+            changed = {
+                part_3.dependencies["cell"] for part_1, part_3 in zip(first.panels.parts, third.panels.parts)
+                if part_1.dependencies != part_3.dependencies
+            }
+            self.assertEqual(len(changed), 1)
+
+            # no results of other versions
+            key = get_dependency_hash(glider_3d.cells[0])
+            with unittest.mock.patch.object(openglider.plots.store, "STORE_VERSION", -1):
+                self.assertNotEqual(get_dependency_hash(glider_3d.cells[0]), key)
+            with unittest.mock.patch.object(openglider, "__version__", "0"):
+                self.assertNotEqual(get_dependency_hash(glider_3d.cells[0]), key)
+
     @unittest.skip("not working")
     def test_patterns_panels(self):
         self.plotmaker.get_panels()
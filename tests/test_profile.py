@@ -45,6 +45,22 @@ class TestProfile(unittest.TestCase):
         x = random.random() * random.randint(-1, 1)
         self.assertAlmostEqual(abs(x), self.prof.profilepoint(x)[0])
 
+    def test_profilepoint_array(self):
+        x_values = np.linspace(-1, 1, 51)
+        points = self.prof.profilepoint(x_values, 0.5)
+        ik = self.prof(x_values)
+        for x, ik_value, point in zip(x_values, ik, points):
+            self.assertAlmostEqual(self.prof(x), ik_value)
+            for coord_1, coord_2 in zip(self.prof.profilepoint(x, 0.5), point):
+                self.assertAlmostEqual(coord_1, coord_2)
+
+    def test_align_array(self):
+        points = [[random.random(), 2*random.random()-1] for _ in range(20)]
+        aligned = self.prof.align(points)
+        for point, point_aligned in zip(points, aligned):
+            for coord_1, coord_2 in zip(self.prof.align(point), point_aligned):
+                self.assertAlmostEqual(coord_1, coord_2)
+
     def test_multiplication(self):
         factor = random.random()
         other = self.prof * factor
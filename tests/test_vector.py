@@ -18,8 +18,9 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenGlider.  If not, see <http://www.gnu.org/licenses/>.
 import numpy as np
-from openglider.vector.functions import norm, normalize, rotation_3d
+from openglider.vector.functions import norm, normalize, rotation_3d, cut
 from openglider.vector.polyline import PolyLine, PolyLine2D
+from openglider.vector.interpolate import Interpolation
 
 
 __author__ = 'simon'
@@ -93,6 +94,31 @@ class TestVector3D(unittest.TestCase):
                                    "\nresult: i2=" + str(new) + " leng2=" + str(leng2) +
                                    " dist=" + str(norm(thalist[start] - thalist[new])))
 
+    def test_walk_many(self):
+        for thalist in self.vectors[:10]:
+            starts = np.array([random.random() * 1.2 - 0.1 for _ in range(20)]) * self.numpoints
+            lengths = np.array([random.random() * 100 - 50 for _ in range(20)])
+            new = thalist.walk_many(starts, lengths)
+            for start, leng, ik in zip(starts, lengths, new):
+                self.assertAlmostEqual(thalist.walk(start, leng), ik)
+
+            lengths_2 = thalist.get_length_many(starts, new)
+            for leng, leng2 in zip(lengths, lengths_2):
+                self.assertAlmostEqual(abs(leng), leng2, 7)
+
+    def test_resample(self):
+        for thalist in self.vectors[:10]:
+            resampled = thalist.resample(30)
+            self.assertEqual(len(resampled), 30)
+
+            # equidistant along the original line
+            length = thalist.get_length()
+            for i, point in enumerate(resampled.data):
+                ik = thalist.walk(0, i * length / 29)
+                self.assertAlmostEqual(thalist.get_length(0, ik), i * length / 29)
+                for p1, p2 in zip(point, thalist[ik]):
+                    self.assertAlmostEqual(p1, p2)
+
 
 class TestVector2D(TestVector3D):
     def setUp(self, dim=2):
@@ -116,6 +142,33 @@ class TestVector2D(TestVector3D):
             amount = random.random()
             thalist.add_stuff(amount)
 
+    def test_shift_many(self):
+        amounts = np.random.rand(len(self.vectors)) - 0.5
+        shifted = PolyLine2D.add_stuff_many(self.vectors, amounts)
+        for thalist, amount, line in zip(self.vectors, amounts, shifted):
+            self.assertTrue(np.array_equal(thalist.copy().add_stuff(amount).data, line.data))
+
+    def test_shift_reverse(self):
+        # 180 degree turn -> one point for each segment
+        line = PolyLine2D([[0, 0], [1, 0], [0.5, 0]])
+        line.add_stuff(0.1)
+        self.assertEqual(len(line), 4)
+        self.assertTrue(np.allclose(line.data[1:3], [[1, -0.1], [1, 0.1]]))
+
+    def test_version(self):
+        for thalist in self.vectors:
+            version = thalist.version
+            normv = thalist.normvectors
+            self.assertIs(normv, thalist.normvectors)
+
+            thalist[1] = thalist[1] + [1, 1]
+            self.assertNotEqual(version, thalist.version)
+            self.assertIsNot(normv, thalist.normvectors)
+
+            version = thalist.version
+            thalist.data = thalist.data[::-1]
+            self.assertNotEqual(version, thalist.version)
+
     def test_Cut(self):
         for thalist in self.vectors:
             i = random.randint(1, len(thalist)-3)
@@ -129,6 +182,55 @@ class TestVector2D(TestVector3D):
             neu = thalist.cut(p1, p2, i - 1)
             #self.assertAlmostEqual(i, neu[1])
 
+    def test_cut_segments(self):
+        for thalist in self.vectors:
+            p1, p2 = np.random.rand(2, 2) * 10
+            for ik1, ik2 in thalist.cut(p1, p2, len(thalist) // 2):
+                i = min(int(ik1), len(thalist) - 2)
+                point, k, l = cut(thalist.data[i], thalist.data[i+1], p1, p2)
+                self.assertAlmostEqual(ik1, i + k)
+                self.assertAlmostEqual(ik2, l)
+                for x1, x2 in zip(point, thalist[ik1]):
+                    self.assertAlmostEqual(x1, x2)
+
+    def test_cut_with_polyline(self):
+        line = PolyLine2D([[0, 0], [1, 0], [2, 0], [3, 0]])
+        other = PolyLine2D([[0.5, 1], [0.5, -1], [2.5, -1], [2.5, 1]])
+        cuts = list(line.cut_with_polyline(other))
+        self.assertEqual(len(cuts), 2)
+        for (ik1, ik2), (x1, x2) in zip(cuts, [(0.5, 0.5), (2.5, 2.5)]):
+            self.assertAlmostEqual(ik1, x1)
+            self.assertAlmostEqual(ik2, x2)
+
+        # no cuts with the extension of a segment
+        other = PolyLine2D([[0.5, 2], [0.5, 1], [2.5, 1]])
+        self.assertEqual(list(line.cut_with_polyline(other)), [])
+
+    def test_check_selfcut(self):
+        # the first and fourth segment cross: the loop in between is removed,
+        # the start of the first segment is kept
+        line = PolyLine2D([[0, 0], [2, 0], [2, 1], [1, 1], [1, -1], [1, -2], [1, -3]])
+        line.check()
+        self.assertEqual(len(line), 5)
+        self.assertTrue(np.allclose(line.data, [[0, 0], [1, 0], [1, -1], [1, -2], [1, -3]]))
+
+        # two loops
+        line = PolyLine2D([[0, 0], [2, 0], [2, 1], [1, 1], [1, -1], [3, -1], [3, -2], [2, -2], [2, 0.5], [2, 3]])
+        line.check()
+        for point in ([0, 0], [1, 0], [2, -1]):
+            self.assertTrue(any(np.allclose(point, p) for p in line.data))
+        self.assertEqual(len(line.get_self_cuts()[0]), 0)
+
+        # long line (bounding-box prefilter) gives the same cuts
+        zigzag = PolyLine2D(np.random.rand(600, 2))
+        for cuts_bbox, cuts in zip(zigzag.get_self_cuts(bbox=True), zigzag.get_self_cuts(bbox=False)):
+            self.assertTrue(np.array_equal(cuts_bbox, cuts))
+
+    def test_check_duplicates(self):
+        line = PolyLine2D([[0, 0], [1, 0], [1, 0], [2, 0]])
+        line.check()
+        self.assertEqual(len(line), 3)
+
 class TestVectorFunctions3D(unittest.TestCase):
     def setUp(self):
         self.vectors = [
@@ -162,6 +264,35 @@ class TestVectorFunctions3D(unittest.TestCase):
 
 
 
+class TestInterpolation(unittest.TestCase):
+    def setUp(self):
+        x_values = np.cumsum([random.random() for _ in range(50)])
+        self.interpolation = Interpolation([[x, random.random()] for x in x_values])
+        self.x_values = np.linspace(x_values[0] - 1, x_values[-1] + 1, 200)
+
+    def test_array(self):
+        values = self.interpolation(self.x_values)
+        for x, value in zip(self.x_values, values):
+            self.assertEqual(value, self.interpolation._get_value(x))
+            self.assertEqual(value, self.interpolation(x))
+
+    def test_unsorted(self):
+        data = self.interpolation.data.copy()
+        data[[10, 11]] = data[[11, 10]]
+        interpolation = Interpolation(data)
+        values = interpolation(self.x_values)
+        for x, value in zip(self.x_values, values):
+            self.assertEqual(value, interpolation._get_value(x))
+
+    def test_extrapolate(self):
+        self.interpolation.extrapolate = False
+        x_values = self.interpolation.data[:, 0]
+        inside = (x_values[:-1] + x_values[1:]) / 2
+        for x, value in zip(inside, self.interpolation(inside)):
+            self.assertEqual(value, self.interpolation._get_value(x))
+        with self.assertRaises(ValueError):
+            self.interpolation(self.x_values)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file